@@ -0,0 +1,205 @@
+# core/billing.py
+# Motor de facturación vectorizado. Los registros de horas de un periodo llegan
+# en lotes (cursor del servidor) y cada lote se reduce con NumPy a horas por
+# (proyecto, actividad, día) antes de sumarse al acumulado, así que la memoria
+# depende del número de combinaciones distintas y no del de registros. Después
+# se resuelve la tarifa de cada combinación (la más específica vigente ese día)
+# y se agrupa en líneas de factura por (cliente, proyecto, actividad, tarifa).
+# Las cantidades van en enteros: centésimas de hora y céntimos.
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+ACTIVITY_BITS = 16
+DAY_BITS = 16
+DATE_BITS = 21  # días desde 1970 hasta ~7700
+MAX_DAY = (1 << DATE_BITS) - 1
+NO_RATE = -1
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def epoch_days(value: date) -> int:
+    return int((np.datetime64(value, "D") - EPOCH).astype(np.int64))
+
+
+def cents(value) -> int:
+    return int((Decimal(value) * 100).to_integral_value())
+
+
+class BillingAccumulator:
+    """Centésimas de hora y número de registros por (proyecto, actividad, día del periodo)."""
+
+    def __init__(self, period_start: date):
+        self.period_start = np.datetime64(period_start, "D")
+        self.activity_codes = {}  # activity_type -> código (desde 1; 0 = cualquier actividad)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.centihours = np.empty(0, dtype=np.int64)
+        self.entries = np.empty(0, dtype=np.int64)
+
+    def activity_code(self, activity_type: str) -> int:
+        code = self.activity_codes.get(activity_type)
+        if code is None:
+            code = self.activity_codes[activity_type] = len(self.activity_codes) + 1
+            if code >= 1 << ACTIVITY_BITS:
+                raise ValueError("Too many distinct activity types to bill")
+        return code
+
+    def add(self, rows):
+        """Suma un lote de filas (project_id, activity_type, día del periodo desde 0, centésimas de hora)."""
+        if not rows:
+            return
+        project_ids, activity_types, days, centihours = zip(*rows)
+        for name in set(activity_types).difference(self.activity_codes):
+            self.activity_code(name)
+        activities = np.fromiter(map(self.activity_codes.__getitem__, activity_types), dtype=np.int64, count=len(rows))
+        keys = ((np.array(project_ids, dtype=np.int64) << ACTIVITY_BITS | activities) << DAY_BITS) | np.array(days, dtype=np.int64)
+        self._merge(keys, np.array(centihours, dtype=np.int64), np.ones(len(keys), dtype=np.int64))
+
+    def _merge(self, keys, centihours, entries):
+        keys = np.concatenate([self.keys, keys])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.centihours = _sum_by(inverse, np.concatenate([self.centihours, centihours]), len(self.keys))
+        self.entries = _sum_by(inverse, np.concatenate([self.entries, entries]), len(self.keys))
+
+    def columns(self):
+        """(project_ids, códigos de actividad, días desde 1970) de cada combinación acumulada."""
+        days = self.keys & ((1 << DAY_BITS) - 1)
+        activities = (self.keys >> DAY_BITS) & ((1 << ACTIVITY_BITS) - 1)
+        projects = self.keys >> (DAY_BITS + ACTIVITY_BITS)
+        return projects, activities, days + int((self.period_start - EPOCH).astype(np.int64))
+
+
+def _sum_by(groups, values, size):
+    # bincount suma en float64: exacto para enteros por debajo de 2**53
+    return np.rint(np.bincount(groups, weights=values, minlength=size)).astype(np.int64)
+
+
+# (a quién se aplica, si es de una actividad concreta): de la tarifa más específica a la general
+RATE_LEVELS = (("project", True), ("project", False), ("client", True), ("client", False), (None, True), (None, False))
+
+
+def _card_level(card):
+    client_id, project_id, activity_type = card[:3]
+    owner = "project" if project_id is not None else "client" if client_id is not None else None
+    return owner, activity_type is not None
+
+
+def _card_owner(card):
+    client_id, project_id = card[:2]
+    return project_id if project_id is not None else client_id if client_id is not None else 0
+
+
+def _lookup(group_keys, keys):
+    """Posición de cada clave en group_keys (ordenado, no vacío) y si está."""
+    positions = np.searchsorted(group_keys, keys)
+    positions[positions == len(group_keys)] = 0
+    return positions, group_keys[positions] == keys
+
+
+def _validity_segments(card_keys, valid_from, valid_to, amounts):
+    """Tramos de días sin solape por clave de tarifa, cada uno con la tarifa que gana en él.
+
+    En cada día gana, entre las vigentes, la de valid_from más reciente (a igualdad,
+    la creada después): una tarifa puntual que expira devuelve el tramo a la anterior.
+    Devuelve (clave, primer día, último día, céntimos) ordenados por (clave, primer día).
+    """
+    valid_from, valid_to, amounts = valid_from.tolist(), valid_to.tolist(), amounts.tolist()
+    by_key = {}
+    for position, key in enumerate(card_keys.tolist()):
+        by_key.setdefault(key, []).append(position)
+    segments = []
+    for key, positions in by_key.items():
+        # Los tramos empiezan donde empieza una tarifa o donde acaba (día siguiente)
+        starts = sorted({valid_from[i] for i in positions} | {valid_to[i] + 1 for i in positions if valid_to[i] < MAX_DAY})
+        for start, next_start in zip(starts, starts[1:] + [MAX_DAY + 1]):
+            valid = [i for i in positions if valid_from[i] <= start <= valid_to[i]]
+            if valid:
+                winner = max(valid, key=lambda i: (valid_from[i], i))
+                segments.append((key, start, next_start - 1, amounts[winner]))
+    segments.sort()
+    return tuple(np.array(column, dtype=np.int64) for column in zip(*segments)) or (np.empty(0, dtype=np.int64),) * 4
+
+
+def resolve_rates(rate_cards, activity_codes, projects, clients, activities, days):
+    """Tarifa en céntimos de cada combinación (NO_RATE si no hay ninguna vigente).
+
+    rate_cards: [(client_id, project_id, activity_type, céntimos, valid_from, valid_to)]
+    en orden de creación. Se prueba de la tarifa más específica a la general. Dentro de un nivel gana
+    la vigente ese día con el valid_from más reciente (a igualdad, la creada después);
+    si ninguna del nivel está vigente, se pasa al siguiente.
+    """
+    rates = np.full(len(projects), NO_RATE, dtype=np.int64)
+    row_owners = {"project": projects, "client": clients, None: 0}
+    for owner, by_activity in RATE_LEVELS:
+        # Tarifas de una actividad que no aparece en el periodo no pueden aplicar
+        cards = [card for card in rate_cards
+                 if _card_level(card) == (owner, by_activity) and (card[2] is None or card[2] in activity_codes)]
+        pending = rates == NO_RATE
+        if not cards or not pending.any():
+            continue
+        card_keys = np.array([_card_owner(card) << ACTIVITY_BITS | activity_codes.get(card[2], 0) for card in cards], dtype=np.int64)
+        valid_from = np.array([min(epoch_days(card[4]), MAX_DAY) if card[4] else 0 for card in cards], dtype=np.int64)
+        valid_to = np.array([min(epoch_days(card[5]), MAX_DAY) if card[5] else MAX_DAY for card in cards], dtype=np.int64)
+        amounts = np.array([card[3] for card in cards], dtype=np.int64)
+        segment_keys, segment_start, segment_end, segment_amounts = _validity_segments(card_keys, valid_from, valid_to, amounts)
+        if not len(segment_keys):
+            continue
+        # Clave densa de la tarifa + primer día del tramo en un único int64 ordenado:
+        # el tramo aplicable es el último que empieza no después del día
+        group_keys, segment_groups = np.unique(segment_keys, return_inverse=True)
+        segment_index = segment_groups << DATE_BITS | segment_start
+        row_keys = np.asarray(row_owners[owner], dtype=np.int64) << ACTIVITY_BITS
+        if by_activity:
+            row_keys = row_keys | activities
+        row_groups, found = _lookup(group_keys, np.broadcast_to(row_keys, projects.shape))
+        candidate = np.searchsorted(segment_index, row_groups << DATE_BITS | days, side="right") - 1
+        candidate[candidate < 0] = 0
+        applies = (pending & found & (segment_groups[candidate] == row_groups) & (segment_start[candidate] <= days)
+                   & (segment_end[candidate] >= days))
+        rates[applies] = segment_amounts[candidate[applies]]
+    return rates
+
+
+def client_index(projects):
+    """Array con el client_id de cada project_id (índice = project_id) a partir de [(project_id, client_id)]."""
+    pairs = np.array(projects, dtype=np.int64).reshape(-1, 2)
+    client_of = np.zeros(pairs[:, 0].max() + 1 if len(pairs) else 1, dtype=np.int64)
+    client_of[pairs[:, 0]] = pairs[:, 1]
+    return client_of
+
+
+def billing_lines(accumulator: BillingAccumulator, client_of, rate_cards):
+    """Líneas de factura a partir del acumulado.
+
+    client_of: array con el client_id de cada project_id (índice = project_id).
+    Devuelve (líneas, sin tarifa); cada línea es (client_id, project_id, actividad,
+    registros, centésimas de hora, tarifa en céntimos, importe en céntimos) y las
+    combinaciones sin tarifa se resumen como (project_id, actividad, centésimas).
+    """
+    names = {code: name for name, code in accumulator.activity_codes.items()}
+    if not len(accumulator.keys):
+        return [], []
+    projects, activities, days = accumulator.columns()
+    clients = client_of[projects]
+    rates = resolve_rates(rate_cards, accumulator.activity_codes, projects, clients, activities, days)
+
+    rated = rates != NO_RATE
+    unrated = []
+    if not rated.all():
+        keys, inverse = np.unique(np.stack([projects[~rated], activities[~rated]]), axis=1, return_inverse=True)
+        hours = _sum_by(inverse.ravel(), accumulator.centihours[~rated], keys.shape[1])
+        unrated = [(int(project), names[int(activity)], int(centi)) for (project, activity), centi in zip(keys.T, hours)]
+
+    keys, inverse = np.unique(np.stack([clients[rated], projects[rated], activities[rated], rates[rated]]), axis=1,
+                              return_inverse=True)
+    inverse = inverse.ravel()
+    centihours = _sum_by(inverse, accumulator.centihours[rated], keys.shape[1])
+    entries = _sum_by(inverse, accumulator.entries[rated], keys.shape[1])
+    # Importe de cada línea redondeado a céntimos (mitad hacia arriba): horas * tarifa
+    amounts = (centihours * keys[3] + 50) // 100
+    lines = [
+        (int(client), int(project), names[int(activity)], int(count), int(centi), int(rate), int(amount))
+        for (client, project, activity, rate), count, centi, amount in zip(keys.T, entries, centihours, amounts)
+    ]
+    return lines, unrated
@@ -0,0 +1,378 @@
+# core/cache.py
+# Caché en memoria acotada (LRU) con expiración por entrada (TTL) y
+# "single-flight": peticiones concurrentes por la misma clave esperan a una
+# única carga en lugar de repetirla.
+# EntityCache la usa para filas de referencia (clientes, proyectos, usuarios) con
+# escritura directa: los CRUD guardan la fila devuelta por RETURNING y avisan al
+# resto de workers por un broker de invalidaciones intercambiable.
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=60.0, name="cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        # Debe llamarse con el lock tomado
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def peek(self, key, default=None):
+        # Como get, pero sin contar en las estadísticas
+        with self._lock:
+            value = self._lookup(key)
+            return default if value is _MISSING else value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key, loader, ttl=None, refresh=False, cache_none=True):
+        """Devuelve el valor cacheado o lo carga una sola vez aunque haya llamadas concurrentes.
+
+        Con refresh=True se ignora el valor cacheado y se vuelve a cargar.
+        """
+        with self._lock:
+            if not refresh:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            if value is not None or cache_none:
+                self._store(key, value, ttl)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LocalBroker:
+    """Broker en proceso: reparte cada mensaje a los demás suscriptores del mismo proceso.
+
+    Es el valor por defecto (un solo worker) y sirve para simular varios workers
+    con varias EntityCache sobre el mismo broker.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        for callback in list(self._subscribers):
+            callback(message)
+
+    def close(self):
+        self._subscribers.clear()
+
+
+class UnixSocketBroker:
+    """Broker entre procesos de una misma máquina sin servicios externos.
+
+    Cada worker escucha en un socket de datagramas dentro de `directory` y
+    publica enviando el mensaje a todos los demás sockets del directorio. Un
+    mensaje perdido (worker caído, buffer lleno) solo deja el dato obsoleto hasta
+    que vence su TTL.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._subscribers = []
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        threading.Thread(target=self._listen, name="cache-invalidations", daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                data = self._receiver.recv(65536)
+            except OSError:
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            for callback in list(self._subscribers):
+                callback(message)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        data = json.dumps(message).encode("utf-8")
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or path == self.path:
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket de un worker que ya no existe
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as exc:
+                logger.warning("Cache invalidation to %s dropped: %s", path, exc)
+
+    def close(self):
+        self._receiver.close()
+        self._sender.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def make_broker(url):
+    """Broker según la URL: vacía o local:// en proceso, unix:///directorio entre workers."""
+    parsed = urlparse(url or "local://")
+    if parsed.scheme == "local":
+        return LocalBroker()
+    if parsed.scheme == "unix":
+        return UnixSocketBroker(parsed.path)
+    raise ValueError(f"Unsupported cache broker '{url}'")
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def default_broker():
+    # Se crea en el primer uso: los scripts que solo importan los CRUD no abren sockets
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            from app.core.config import CACHE_BROKER_URL
+            _broker = make_broker(CACHE_BROKER_URL)
+        return _broker
+
+
+def close_default_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is not None:
+            _broker.close()
+            _broker = None
+
+
+class EntityCache:
+    """Caché de filas de un modelo por clave primaria y por columnas únicas (alias).
+
+    Guarda los valores de las columnas, no la instancia ORM: en cada acierto se
+    crea una instancia nueva, separada de la sesión, y nadie comparte objetos
+    entre sesiones. Sus relaciones vienen vacías, como con noload("*"); quien
+    necesite las filas relacionadas las pide con ?expand=, que no usa la caché.
+    Las columnas de `exclude` (credenciales...) no se guardan: en una instancia
+    cacheada leerlas falla (DetachedInstanceError) en vez de dar un valor viejo.
+    """
+
+    def __init__(self, model, broker=None, maxsize=4096, ttl=300.0, aliases=(), name=None, exclude=()):
+        self.model = model
+        self.name = name or model.__tablename__
+        self.aliases = aliases
+        self.enabled = ttl > 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, name=self.name)
+        # Desde la tabla y no desde el mapper: inspect() aquí configuraría los
+        # mappers antes de que se importen todos los modelos
+        self._columns = [column.key for column in model.__table__.columns if column.key not in exclude]
+        self._pk = model.__table__.primary_key.columns.values()[0].key
+        self._origin = uuid.uuid4().hex
+        self._broker = broker
+        self._subscribed = False
+        self._subscribe_lock = threading.Lock()
+        # Contador de escrituras: una lectura que se cruza con una escritura no cachea lo leído
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        # Basta con suscribirse al guardar la primera fila: antes no hay nada que invalidar
+        if not self._subscribed:
+            broker = self._broker or default_broker()
+            with self._subscribe_lock:
+                if not self._subscribed:
+                    broker.subscribe(self._on_message)
+                    self._broker = broker
+                    self._subscribed = True
+        return self._broker
+
+    def _snapshot(self, obj):
+        state = inspect(obj)
+        if state.unloaded & set(self._columns):
+            # Carga parcial (?fields=): no se puede cachear como fila completa
+            return None
+        return {key: state.dict[key] for key in self._columns}
+
+    def _attach(self, values):
+        obj = self.model(**values)
+        make_transient_to_detached(obj)
+        for relationship in inspect(self.model).relationships:
+            set_committed_value(obj, relationship.key, [] if relationship.uselist else None)
+        return obj
+
+    def _count(self, hit):
+        with self._cache._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, pk, loader):
+        """Fila por clave primaria; `loader` la lee de la base de datos si no está cacheada."""
+        values = self._cache.peek(pk) if self.enabled else None
+        self._count(values is not None)
+        if values is not None:
+            return self._attach(values)
+        return self._load(loader)
+
+    def get_by(self, alias, value, loader):
+        """Fila por una columna única (username, email...)."""
+        pk = self._cache.peek((alias, value)) if self.enabled else None
+        values = self._cache.peek(pk) if pk is not None else None
+        # El alias apunta a la clave primaria; si la fila cambió de valor ya no vale
+        hit = values is not None and values[alias] == value
+        self._count(hit)
+        if hit:
+            return self._attach(values)
+        return self._load(loader)
+
+    def _load(self, loader):
+        writes = self._writes
+        obj = loader()
+        if obj is not None and writes == self._writes:
+            self._store(obj)
+        return obj
+
+    def _store(self, obj):
+        values = self._snapshot(obj) if self.enabled else None
+        if values is None:
+            return
+        pk = values[self._pk]
+        self._connect()
+        self._cache.set(pk, values)
+        for alias in self.aliases:
+            if values[alias] is not None:
+                self._cache.set((alias, values[alias]), pk)
+
+    def put(self, obj):
+        """Escritura directa tras crear/actualizar: guarda la fila y avisa a los demás workers."""
+        self._writes += 1
+        self._store(obj)
+        self._publish(getattr(obj, self._pk))
+
+    def invalidate(self, pk):
+        self._writes += 1
+        self._cache.delete(pk)
+        self._publish(pk)
+
+    def _publish(self, pk):
+        if not self.enabled:
+            return
+        try:
+            self._connect().publish({"cache": self.name, "key": pk, "origin": self._origin})
+        except Exception:
+            # La invalidación remota nunca debe tumbar la escritura; el TTL acota el daño
+            logger.exception("Could not publish invalidation for %s %s", self.name, pk)
+
+    def _on_message(self, message):
+        if message.get("cache") == self.name and message.get("origin") != self._origin:
+            self._writes += 1
+            self._cache.delete(message.get("key"))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        lookups = self.hits + self.misses
+        stats.update(hits=self.hits, misses=self.misses, hit_ratio=round(self.hits / lookups, 4) if lookups else 0.0)
+        return stats
@@ -0,0 +1,69 @@
+# core/compression.py
+# Compresión de respuestas según lo que acepte el cliente: brotli si lo admite y
+# el paquete está instalado, si no gzip. Las respuestas pequeñas salen
+# sin comprimir y las de streaming (exportaciones) se comprimen por trozos.
+# Va por fuera de ETagMiddleware: a la ETag de una respuesta comprimida se le añade
+# la codificación ("x-gzip", "x-br"), porque no es la misma representación que la
+# respuesta sin comprimir.
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+
+from app.core.etag import coded_etag, names_etag
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional: sin ella solo se ofrece gzip
+    brotli = None
+
+
+def accepts(header: str, coding: str) -> bool:
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 4):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app, minimum_size: int = 1000, compresslevel: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        accept_encoding = request_headers.get("accept-encoding", "")
+        if brotli is not None and accepts(accept_encoding, "br"):
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in accept_encoding:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        coding = getattr(responder, "content_encoding", None)
+
+        async def send_with_coded_etag(message):
+            if coding and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                if etag and not responder.content_encoding_set and headers.get("content-encoding") == coding:
+                    headers["ETag"] = coded_etag(etag, coding)
+                elif etag and message["status"] == 304 and names_etag(request_headers.get("if-none-match"), coded_etag(etag, coding)):
+                    # 304 sin cuerpo: se repite la ETag que tiene el cliente si era de esta codificación
+                    headers["ETag"] = coded_etag(etag, coding)
+            await send(message)
+
+        await responder(scope, receive, send_with_coded_etag)
@@ -0,0 +1,39 @@
+# core/csv_utils.py
+import codecs
+import csv
+
+
+def _complete_records(pending, text):
+    # Separa registros CSV completos; un salto de línea dentro de comillas no cierra el registro
+    records = []
+    for piece in text.splitlines(keepends=True):
+        pending += piece
+        if pending.endswith(("\n", "\r")) and pending.count('"') % 2 == 0:
+            records.append(pending)
+            pending = ""
+    return records, pending
+
+
+async def iter_csv_rows(byte_stream, encoding="utf-8-sig"):
+    """Itera un CSV con cabecera, recibido por partes, como diccionarios sin cargarlo entero.
+
+    utf-8-sig descarta el BOM que añade Excel al guardar en UTF-8; sin él, la
+    primera columna de la cabecera llegaría como "\ufeffuser_id".
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    header = None
+    pending = ""
+    async for chunk in byte_stream:
+        records, pending = _complete_records(pending, decoder.decode(chunk))
+        for values in csv.reader(records):
+            if header is None:
+                header = [name.strip() for name in values]
+            elif values:
+                yield dict(zip(header, values))
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        for values in csv.reader([pending]):
+            if header is None:
+                return
+            if values:
+                yield dict(zip(header, values))
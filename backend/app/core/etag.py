@@ -0,0 +1,185 @@
+# core/etag.py
+# Peticiones condicionales (ETag / If-None-Match / If-Match).
+# - Recursos con updated_at: la ETag sale de (pk, updated_at) del elemento, o de
+#   las filas de la página en las colecciones, más los parámetros de la consulta;
+#   se calcula sin cargar filas completas y el 304 se responde sin serializar.
+# - Los elementos llevan además Last-Modified (su updated_at) y atienden
+#   If-Modified-Since cuando el cliente no envía If-None-Match.
+# - If-Match en PUT/DELETE se resuelve en el propio UPDATE/DELETE
+#   (WHERE updated_at = versión esperada), sin bloqueos adicionales.
+# - El resto de GET reciben una ETag con el hash del cuerpo (ETagMiddleware).
+# - Las respuestas comprimidas son otra representación: CompressionMiddleware
+#   añade la codificación a la ETag ("x-gzip", "x-br") y aquí se acepta de vuelta.
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func
+from starlette.datastructures import Headers, MutableHeaders
+
+VERSION_FORMAT = "%Y%m%dT%H%M%S%f"
+CODINGS = ("gzip", "br")
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def item_etag(pk, updated_at, variant=()) -> str:
+    """ETag fuerte "<pk>.<updated_at>[.<variante>]"; la variante distingue ?fields= y similares."""
+    version = updated_at.strftime(VERSION_FORMAT) if updated_at else "0"
+    variant = sorted(variant)
+    return f'"{pk}.{version}.{_digest(variant)[:12]}"' if variant else f'"{pk}.{version}"'
+
+
+def collection_etag(request: Request, versions) -> str:
+    query = sorted(request.query_params.multi_items())
+    return f'"{_digest(request.url.path, query, [tuple(version) for version in versions])}"'
+
+
+def _tags(header: str):
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """ETag de la misma respuesta comprimida: "x" -> "x-gzip" (W/"x" -> W/"x-gzip")."""
+    return f'{etag[:-1]}-{coding}"'
+
+
+def names_etag(header, etag: str) -> bool:
+    """Si la cabecera nombra exactamente esa ETag (sin equivalencias)."""
+    return etag in _tags(header or "")
+
+
+def _without_coding(tag: str) -> str:
+    for coding in CODINGS:
+        if tag.endswith(f'-{coding}"'):
+            return f'{tag[:-len(coding) - 2]}"'
+    return tag
+
+
+def etag_matches(header, etag: str) -> bool:
+    # If-None-Match usa comparación débil: W/"x" equivale a "x", y "x-gzip" a "x"
+    if not header:
+        return False
+    tags = {_without_coding(tag[2:] if tag.startswith("W/") else tag) for tag in _tags(header)}
+    return "*" in tags or etag in tags
+
+
+def _utc(updated_at: datetime) -> datetime:
+    # updated_at es TIMESTAMP sin zona escrito por CURRENT_TIMESTAMP / now(): UTC en el servidor
+    return updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def http_date(updated_at: datetime) -> str:
+    return format_datetime(_utc(updated_at), usegmt=True)
+
+
+def modified_since(header, updated_at: datetime) -> bool:
+    # Una fecha inválida se ignora, como si no hubiera cabecera
+    try:
+        since = parsedate_to_datetime(header) if header else None
+    except (TypeError, ValueError):
+        since = None
+    if since is None:
+        return True
+    return _utc(updated_at) > (since if since.tzinfo else since.replace(tzinfo=timezone.utc))
+
+
+def conditional(request: Request, response: Response, etag: str, last_modified: datetime = None):
+    """Pone ETag (y Last-Modified) en la respuesta; devuelve un 304 si el cliente ya tiene esa versión.
+
+    If-None-Match tiene prioridad: If-Modified-Since solo se mira si no viene.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = last_modified is not None and not modified_since(request.headers.get("if-modified-since"), last_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def if_match(request: Request):
+    """Dependencia: versiones (updated_at) aceptadas por If-Match, o None si no hay condición."""
+    header = request.headers.get("if-match")
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in _tags(header):
+        # If-Match usa comparación fuerte: las ETag débiles nunca coinciden
+        parts = _without_coding(tag).strip('"').split(".") if not tag.startswith("W/") else []
+        try:
+            versions.append(datetime.strptime(parts[1], VERSION_FORMAT))
+        except (IndexError, ValueError):
+            continue
+    if not versions:
+        raise HTTPException(status_code=412, detail="Precondition failed: If-Match does not name a current version")
+    return versions
+
+
+def missing_or_stale(versions, detail: str):
+    # Con If-Match, que no haya fila afectada es 412 (otro cliente la cambió o la borró)
+    if versions:
+        return HTTPException(status_code=412, detail="Precondition failed: resource was modified")
+    return HTTPException(status_code=404, detail=detail)
+
+
+def version_clause(db, column, versions):
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite guarda CURRENT_TIMESTAMP sin microsegundos: se compara normalizado
+        return func.datetime(column).in_([func.datetime(version) for version in versions])
+    return column.in_(versions)
+
+
+class ETagMiddleware:
+    """ETag con el hash del cuerpo para los GET que no la calculan por sí mismos.
+
+    Ahorra transferencia (304) pero no trabajo en el servidor; las respuestas en
+    streaming (exportaciones) pasan sin tocar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                if message["status"] != 200 or "etag" in Headers(raw=message["headers"]):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+            elif message.get("more_body"):
+                passthrough = True
+                await send(start)
+                await send(message)
+            else:
+                body = message.get("body", b"")
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                headers = MutableHeaders(scope=start)
+                headers["ETag"] = etag
+                if etag_matches(if_none_match, etag):
+                    start["status"] = 304
+                    del headers["content-length"]
+                    body = b""
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
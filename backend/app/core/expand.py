@@ -0,0 +1,33 @@
+# core/expand.py
+# Parámetro ?expand=rel1,rel2: relaciones que se cargan junto con la página
+# (un número fijo de consultas, sea cual sea el tamaño de la página) y se
+# anidan en la respuesta en lugar de obligar al cliente a pedirlas una a una.
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, noload, selectinload
+
+
+class InvalidExpand(ValueError):
+    pass
+
+
+def parse_expand(value: Optional[str], allowed) -> list:
+    if not value:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise InvalidExpand(f"Invalid expand '{','.join(unknown)}'. Allowed: {', '.join(sorted(allowed))}")
+    return names
+
+
+def expand_options(model, names):
+    # Muchos-a-uno con JOIN en la misma consulta; colecciones con un SELECT ... IN por relación
+    options = []
+    for name in names:
+        relationship = getattr(model, name)
+        loader = selectinload if relationship.property.uselist else joinedload
+        options.append(loader(relationship))
+    # Lo no expandido queda en None sin consultar: serializar nunca dispara cargas perezosas
+    options.append(noload("*"))
+    return options
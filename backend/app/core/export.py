@@ -0,0 +1,56 @@
+# core/export.py
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi.responses import StreamingResponse
+
+from app.core.config import EXPORT_CHUNK_SIZE
+from app.core.database import stream_partitions
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _ndjson(rows):
+    return "".join(
+        json.dumps({key: _jsonable(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow(["" if value is None else _jsonable(value) for value in row.values()])
+    return buffer.getvalue()
+
+
+async def _encode(stmt, fmt, replica):
+    if fmt == "csv":
+        yield _csv([{column.key: column.key for column in stmt.selected_columns}])
+    encode = _csv if fmt == "csv" else _ndjson
+    async for partition in stream_partitions(stmt, EXPORT_CHUNK_SIZE, replica):
+        yield encode(partition)
+
+
+def export_response(stmt, fmt: str, filename: str, replica: bool = False):
+    """StreamingResponse en NDJSON o CSV; cada lote se envía en cuanto llega de la base de datos."""
+    return StreamingResponse(
+        _encode(stmt, fmt, replica),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
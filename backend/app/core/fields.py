@@ -0,0 +1,58 @@
+# core/fields.py
+# Parámetro ?fields=a,b,c (sparse fieldsets): el SELECT solo lee esas columnas
+# (load_only) y la respuesta se serializa con un modelo recortado a esos campos,
+# de modo que se reducen tanto los bytes leídos de la base como los enviados.
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import create_model
+from sqlalchemy.orm import load_only
+
+from app.core.serialization import fast_response, fast_serialization
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(value: Optional[str], schema) -> Optional[list]:
+    if not value:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown or not names:
+        allowed = ", ".join(schema.model_fields)
+        raise InvalidFields(f"Invalid fields '{','.join(unknown)}'. Allowed: {allowed}")
+    return names
+
+
+def field_options(model, fields, *required):
+    """load_only de las columnas pedidas más las `required` (p. ej. las del orden del cursor)."""
+    if not fields:
+        return []
+    columns = model.__table__.columns
+    # Los nombres que no son columnas (relaciones de ?expand=) los carga expand_options
+    selected = [getattr(model, name) for name in fields if name in columns]
+    selected += [getattr(model, column.key) for column in required]
+    return [load_only(*selected)] if selected else []
+
+
+@lru_cache(maxsize=256)
+def trimmed_model(schema, fields: tuple):
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    return create_model(f"{schema.__name__}Fields", **definitions)
+
+
+def fields_response(content, schema, fields, response: Optional[Response] = None):
+    """Respuesta con solo `fields` (todos si es None); conserva las cabeceras ya puestas en `response` (X-Next-Cursor)."""
+    if fast_serialization:
+        return fast_response(content, schema, fields, response)
+    model = trimmed_model(schema, tuple(fields))
+    if isinstance(content, list):
+        data = [model.model_validate(item, from_attributes=True) for item in content]
+    else:
+        data = model.model_validate(content, from_attributes=True)
+    return JSONResponse(jsonable_encoder(data), headers=dict(response.headers) if response else None)
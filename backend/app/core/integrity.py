@@ -0,0 +1,31 @@
+# core/integrity.py
+# Las restricciones (unique, FK, check) se validan en la base de datos en la misma
+# sentencia de escritura; una violación se traduce por su SQLSTATE a un 409 (choca
+# con datos existentes) o un 422 (datos inválidos) con un mensaje genérico. El texto
+# del driver (tablas, columnas, valores) solo va al log
+from typing import Optional
+
+INTEGRITY_ERRORS = {
+    "23505": (409, "A record with the same unique value already exists"),
+    "23P01": (409, "The record conflicts with an existing record"),
+    "23503": (409, "The record references a missing record or is still referenced"),
+    "23514": (422, "The record does not satisfy a validation rule"),
+    "23502": (422, "A required value is missing"),
+}
+DEFAULT_INTEGRITY_ERROR = (409, "The request conflicts with existing data")
+# SQLite no da SQLSTATE sino el código extendido; su único trigger es el de solapes de time_entries
+SQLITE_SQLSTATES = {
+    "SQLITE_CONSTRAINT_UNIQUE": "23505", "SQLITE_CONSTRAINT_PRIMARYKEY": "23505", "SQLITE_CONSTRAINT_TRIGGER": "23P01",
+    "SQLITE_CONSTRAINT_FOREIGNKEY": "23503", "SQLITE_CONSTRAINT_CHECK": "23514", "SQLITE_CONSTRAINT_NOTNULL": "23502",
+}
+
+
+def sqlstate(error) -> Optional[str]:
+    # psycopg2 (pgcode), psycopg 3 y asyncpg vía SQLAlchemy (sqlstate), sqlite3 (sqlite_errorname)
+    return (getattr(error, "sqlstate", None) or getattr(error, "pgcode", None)
+            or SQLITE_SQLSTATES.get(getattr(error, "sqlite_errorname", None)))
+
+
+def integrity_error(error) -> tuple[int, str]:
+    """(status, mensaje genérico) para el error del driver `error` (exc.orig)."""
+    return INTEGRITY_ERRORS.get(sqlstate(error), DEFAULT_INTEGRITY_ERROR)
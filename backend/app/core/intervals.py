@@ -0,0 +1,53 @@
+# core/intervals.py
+# Solapes entre intervalos semiabiertos [start, end) agrupados (p. ej. por
+# usuario y día) sin comparar cada par ni consultar la base de datos por fila:
+# se ordena una vez (O(n log n)) y se recorre cada grupo en una pasada.
+# Los intervalos ya guardados (existing) siempre se mantienen; de los nuevos que
+# solapan entre sí se mantiene el que empieza antes (a igualdad, el primero del lote).
+from bisect import bisect_left
+from itertools import accumulate, groupby
+from operator import itemgetter
+
+
+def find_overlaps(new, existing=()):
+    """Solapes de los intervalos nuevos.
+
+    new: [(grupo, start, end)] en el orden del lote.
+    existing: [(grupo, start, end, id)] ya guardados.
+    Devuelve {posición en new: ("existing", id) | ("new", posición)} con cada
+    intervalo rechazado y el intervalo con el que choca.
+    """
+    conflicts = {}
+
+    # 1) Contra los guardados: por grupo, inicios ordenados y máximo acumulado de
+    # los finales; un nuevo choca si algún guardado empieza antes de su fin y
+    # termina después de su inicio
+    by_group = {}
+    for group, start, end, entry_id in sorted(existing, key=itemgetter(0, 1)):
+        by_group.setdefault(group, []).append((start, end, entry_id))
+    index = {}
+    for group, intervals in by_group.items():
+        starts = [start for start, _, _ in intervals]
+        reach = list(accumulate(intervals, lambda best, item: item if item[1] > best[1] else best))
+        index[group] = (starts, reach)
+    for position, (group, start, end) in enumerate(new):
+        if group not in index:
+            continue
+        starts, reach = index[group]
+        before_end = bisect_left(starts, end)
+        if before_end and reach[before_end - 1][1] > start:
+            conflicts[position] = ("existing", reach[before_end - 1][2])
+
+    # 2) Entre los nuevos que quedan: barrido por grupo en orden de inicio
+    candidates = sorted(
+        ((item[0], item[1], item[2], position) for position, item in enumerate(new) if position not in conflicts),
+        key=itemgetter(0, 1, 3),
+    )
+    for _, intervals in groupby(candidates, key=itemgetter(0)):
+        holder_end, holder = None, None
+        for _, start, end, position in intervals:
+            if holder is not None and start < holder_end:
+                conflicts[position] = ("new", holder)
+            else:
+                holder_end, holder = end, position
+    return conflicts
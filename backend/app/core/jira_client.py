@@ -0,0 +1,177 @@
+# core/jira_client.py
+# Cliente HTTP para Jira Cloud: una sesión con pool de conexiones compartida,
+# paginación startAt/maxResults, reintentos con backoff ante 429 y descarga
+# concurrente (acotada) de las issues de varios proyectos.
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.cache import TTLCache
+from app.core.utils import get_jira_headers
+from app.core.config import (
+    JIRA_API_URL, JIRA_BASE_URL, JIRA_CACHE_MAXSIZE, JIRA_CLOUD_ID_TTL, JIRA_MAX_CONCURRENCY, JIRA_MAX_RETRIES,
+    JIRA_PAGE_SIZE, JIRA_TIMEOUT,
+)
+from app.core.metrics import observe_jira
+
+ISSUE_FIELDS = "summary,description,status,labels,assignee,created,updated,duedate,startdate"
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class JiraError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _build_session():
+    # requests se importa aquí: cargarlo al arrancar retrasa cada worker aunque no se use Jira
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=JIRA_MAX_CONCURRENCY * 2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Sesión HTTP compartida (pool de conexiones), creada en la primera petición a Jira."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+# Respuestas del proxy (claves por token/endpoint) y cloud id memoizado por token
+jira_cache = TTLCache(maxsize=JIRA_CACHE_MAXSIZE, name="jira")
+cloud_id_cache = TTLCache(maxsize=JIRA_CACHE_MAXSIZE, ttl=JIRA_CLOUD_ID_TTL, name="jira_cloud_id")
+
+
+def token_key(access_token):
+    # Nunca se usa el token en claro como clave de caché
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:32]
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return min(0.5 * 2 ** attempt, 30.0) + random.uniform(0, 0.25)
+
+
+def request_json(method, url, headers, **kwargs):
+    """Petición con reintentos ante 429/5xx transitorios; lanza JiraError si no es 2xx."""
+    kwargs.setdefault("timeout", JIRA_TIMEOUT)
+    for attempt in range(JIRA_MAX_RETRIES + 1):
+        started = time.perf_counter()
+        try:
+            response = http_session().request(method, url, headers=headers, **kwargs)
+        except Exception:
+            observe_jira(method, url, "error", time.perf_counter() - started)
+            raise
+        observe_jira(method, url, response.status_code, time.perf_counter() - started)
+        if response.status_code not in RETRY_STATUSES or attempt == JIRA_MAX_RETRIES:
+            break
+        time.sleep(_retry_delay(response, attempt))
+    if not response.ok:
+        raise JiraError(response.status_code, response.text)
+    return response.json()
+
+
+def parse_issue(issue):
+    fields = issue.get("fields", {})
+    return {
+        "id": issue.get("id"),
+        "key": issue.get("key"),
+        "summary": fields.get("summary"),
+        "description": fields.get("description"),
+        "status": fields.get("status", {}).get("name") if fields.get("status") else None,
+        "labels": fields.get("labels"),
+        "assignee": fields.get("assignee", {}).get("displayName") if fields.get("assignee") else None,
+        "created": fields.get("created"),
+        "updated": fields.get("updated"),
+        "duedate": fields.get("duedate"),
+        "startdate": fields.get("startdate"),
+    }
+
+
+class JiraClient:
+    """Acceso OAuth (Bearer) a la API de Jira Cloud de un usuario."""
+
+    def __init__(self, access_token=None, base_url=JIRA_API_URL, headers=None):
+        self.base_url = base_url
+        self.headers = headers or {
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/json",
+        }
+        self.token_key = token_key(access_token or self.headers["Authorization"])
+
+    @classmethod
+    def with_api_token(cls):
+        """Cliente del sitio JIRA_BASE_URL con JIRA_EMAIL/JIRA_API_TOKEN, para procesos sin usuario."""
+        if not JIRA_BASE_URL:
+            raise JiraError(500, "JIRA_BASE_URL is not configured")
+        return cls(base_url=JIRA_BASE_URL.replace("/rest/api/3", "").rstrip("/"), headers=get_jira_headers())
+
+    def get(self, path, params=None):
+        return request_json("GET", f"{self.base_url}{path}", self.headers, params=params)
+
+    def cloud_id(self, refresh=False):
+        """Id del sitio Jira del token (memoizado), o None si el token ya no es válido."""
+        return cloud_id_cache.get_or_load(self.token_key, self._fetch_cloud_id, refresh=refresh, cache_none=False)
+
+    def _fetch_cloud_id(self):
+        try:
+            resources = self.get("/oauth/token/accessible-resources")
+        except JiraError as exc:
+            if exc.status_code in (401, 403):
+                return None
+            raise
+        if not isinstance(resources, list) or not resources:
+            return None
+        return resources[0]["id"]
+
+    def _paginate(self, path, params, items_key):
+        start_at = 0
+        while True:
+            page = self.get(path, {**params, "startAt": start_at, "maxResults": JIRA_PAGE_SIZE})
+            items = page.get(items_key, [])
+            yield from items
+            start_at += len(items)
+            total = page.get("total")
+            if not items or page.get("isLast") or (total is not None and start_at >= total):
+                break
+
+    def _rest(self, cloud_id):
+        # Con OAuth se pasa por el gateway de Atlassian; con token de API, directo al sitio
+        return f"/ex/jira/{cloud_id}/rest/api/3" if cloud_id else "/rest/api/3"
+
+    def projects(self, cloud_id=None):
+        return list(self._paginate(f"{self._rest(cloud_id)}/project/search", {}, "values"))
+
+    def iter_issues(self, cloud_id, jql, fields=ISSUE_FIELDS):
+        return self._paginate(f"{self._rest(cloud_id)}/search", {"jql": jql, "fields": fields}, "issues")
+
+    def search_issues(self, cloud_id, jql, fields=ISSUE_FIELDS):
+        return list(self.iter_issues(cloud_id, jql, fields))
+
+    def project_issues(self, cloud_id, project_keys, jql_suffix="ORDER BY created DESC"):
+        """Issues de cada proyecto, descargadas en paralelo con concurrencia acotada."""
+        def fetch(key):
+            return self.search_issues(cloud_id, f'project="{key}" {jql_suffix}')
+
+        with ThreadPoolExecutor(max_workers=max(1, min(JIRA_MAX_CONCURRENCY, len(project_keys)))) as pool:
+            return dict(zip(project_keys, pool.map(fetch, project_keys)))
@@ -0,0 +1,162 @@
+# core/jira_sync.py
+# Sincronización incremental de issues de Jira hacia la tabla tickets.
+#
+# Cada proyecto local cuyo `code` coincide con la clave de un proyecto de Jira
+# se sincroniza con JQL `updated >= -Nm`, donde N cubre el tiempo desde la
+# marca de agua guardada en jira_sync_state (más un margen). Se usa una ventana
+# relativa porque las fechas absolutas de JQL se interpretan en la zona horaria
+# del usuario de Jira. Los tickets se insertan o actualizan en bloque por
+# ticket_number (= clave de la issue), así que repetir una ventana es inocuo.
+import asyncio
+import logging
+import math
+import threading
+from datetime import date, datetime, timezone
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, func, select
+
+from app.core.config import JIRA_SYNC_BATCH_SIZE, JIRA_SYNC_OVERLAP_MINUTES
+from app.core.database import SessionLocal, upsert_insert
+from app.core.jira_client import JiraClient
+from app.models.jira_sync_models import JiraSyncState
+from app.models.project_models import Project
+from app.models.ticket_models import Ticket
+from app.models.user_models import User
+
+logger = logging.getLogger(__name__)
+
+SYNC_FIELDS = "summary,description,status,priority,issuetype,assignee,reporter,duedate,resolutiondate,created,updated"
+SYNCED_COLUMNS = (
+    "title", "description", "priority", "status", "category", "project_id", "client_id",
+    "reported_by_user_id", "assigned_to_user_id", "due_date", "resolved_at",
+)
+
+_sync_lock = threading.Lock()
+
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _adf_text(node):
+    # Las descripciones de la API v3 vienen en Atlassian Document Format
+    if node is None:
+        return ""
+    if isinstance(node, str):
+        return node
+    text = node.get("text", "")
+    children = "".join(_adf_text(child) for child in node.get("content", []))
+    separator = "\n" if node.get("type") in ("paragraph", "heading", "listItem", "codeBlock") else ""
+    return text + children + separator
+
+
+def _user_id(person, users_by_email):
+    email = (person or {}).get("emailAddress")
+    return users_by_email.get(email.lower()) if email else None
+
+
+def issue_to_ticket(issue, project, users_by_email):
+    fields = issue.get("fields", {})
+    due_date = fields.get("duedate")
+    return {
+        "ticket_number": issue["key"][:20],
+        "title": (fields.get("summary") or issue["key"])[:200],
+        "description": _adf_text(fields.get("description")).strip(),
+        "priority": ((fields.get("priority") or {}).get("name") or "Medium")[:20],
+        "status": ((fields.get("status") or {}).get("name") or "Open")[:20],
+        "category": ((fields.get("issuetype") or {}).get("name") or "jira")[:50],
+        "project_id": project.project_id,
+        "client_id": project.client_id,
+        "reported_by_user_id": _user_id(fields.get("reporter"), users_by_email),
+        "assigned_to_user_id": _user_id(fields.get("assignee"), users_by_email),
+        "due_date": date.fromisoformat(due_date) if due_date else None,
+        "resolved_at": _parse_datetime(fields.get("resolutiondate")),
+        "created_at": _parse_datetime(fields.get("created")),
+    }
+
+
+def _upsert_tickets(db, rows):
+    # Sin `created` en Jira se usa el mismo valor por defecto que la columna, no NULL
+    stmt = upsert_insert(db, Ticket).values(created_at=func.coalesce(bindparam("created_at"), func.now()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Ticket.ticket_number],
+        set_={**{column: stmt.excluded[column] for column in SYNCED_COLUMNS}, "updated_at": func.now()},
+    )
+    db.execute(stmt, rows)
+
+
+def _save_watermark(db, state, last_updated, count, now):
+    if last_updated and (state.last_updated is None or last_updated > state.last_updated):
+        state.last_updated = last_updated
+    state.last_synced_at = now
+    state.issues_synced += count
+    db.commit()
+
+
+def sync_project(db, client, project, users_by_email, now=None):
+    """Sincroniza un proyecto desde su marca de agua; devuelve el número de issues importadas."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    state = db.get(JiraSyncState, project.code) or JiraSyncState(project_key=project.code, issues_synced=0)
+    db.add(state)
+    jql = f'project="{project.code}"'
+    if state.last_updated:
+        minutes = math.ceil((now - state.last_updated).total_seconds() / 60) + JIRA_SYNC_OVERLAP_MINUTES
+        jql += f" AND updated >= -{max(minutes, 1)}m"
+    jql += " ORDER BY updated ASC"
+
+    batch, batch_updated, total = [], None, 0
+    for issue in client.iter_issues(None, jql, SYNC_FIELDS):
+        batch.append(issue_to_ticket(issue, project, users_by_email))
+        batch_updated = _parse_datetime(issue.get("fields", {}).get("updated")) or batch_updated
+        if len(batch) >= JIRA_SYNC_BATCH_SIZE:
+            # Se confirma por lotes: la marca de agua avanza aunque falle un lote posterior
+            _upsert_tickets(db, batch)
+            _save_watermark(db, state, batch_updated, len(batch), now)
+            total += len(batch)
+            batch = []
+    if batch:
+        _upsert_tickets(db, batch)
+        total += len(batch)
+    _save_watermark(db, state, batch_updated, len(batch), now)
+    return total
+
+
+def sync_all(db=None, client=None):
+    """Sincroniza todos los proyectos enlazados; devuelve un resumen o None si ya hay otra en curso."""
+    if not _sync_lock.acquire(blocking=False):
+        return None
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        client = client or JiraClient.with_api_token()
+        jira_keys = {project["key"] for project in client.projects()}
+        projects = db.scalars(select(Project).where(Project.code.in_(jira_keys))).all() if jira_keys else []
+        users_by_email = {email.lower(): user_id for user_id, email in db.execute(select(User.user_id, User.email))}
+        summary = {"projects": {}, "unmapped": sorted(jira_keys - {project.code for project in projects})}
+        for project in projects:
+            summary["projects"][project.code] = sync_project(db, client, project, users_by_email)
+        summary["issues"] = sum(summary["projects"].values())
+        logger.info("Jira sync finished: %s", summary)
+        return summary
+    finally:
+        if own_session:
+            db.close()
+        _sync_lock.release()
+
+
+def get_sync_states(db):
+    return db.scalars(select(JiraSyncState).order_by(JiraSyncState.project_key)).all()
+
+
+async def run_periodically(interval):
+    """Tarea de fondo para el lifespan de la app: sincroniza cada `interval` segundos."""
+    while True:
+        try:
+            await run_in_threadpool(sync_all)
+        except Exception:
+            logger.exception("Jira sync failed")
+        await asyncio.sleep(interval)
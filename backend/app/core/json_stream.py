@@ -0,0 +1,70 @@
+# core/json_stream.py
+# Array JSON recibido por partes: cada elemento se decodifica en cuanto llega
+# completo, así que en memoria solo está el elemento en curso y no el cuerpo entero
+import codecs
+import json
+
+
+class NotAJsonArray(ValueError):
+    """El cuerpo es otra cosa que un array JSON."""
+
+
+async def iter_json_array(byte_stream, encoding="utf-8-sig"):
+    """Itera los elementos de un array JSON recibido por partes.
+
+    Lanza NotAJsonArray si el cuerpo no empieza por "[" y ValueError
+    (json.JSONDecodeError) si está mal formado; los elementos anteriores al
+    error ya se han entregado.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parser = json.JSONDecoder()
+    chunks = aiter(byte_stream)
+    buffer, pos, eof = "", 0, False
+    state = "open"  # open -> first -> (value -> separator)* -> closed
+
+    async def read():
+        nonlocal buffer, pos, eof
+        try:
+            text = decoder.decode(await anext(chunks))
+        except StopAsyncIteration:
+            text, eof = decoder.decode(b"", final=True), True
+        buffer, pos = buffer[pos:] + text, 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                break
+            await read()
+            continue
+        char = buffer[pos]
+        if state == "open":
+            if char != "[":
+                raise NotAJsonArray("Expected a JSON array")
+            pos, state = pos + 1, "first"
+        elif state == "closed":
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+        elif char == "]" and state in ("first", "separator"):
+            pos, state = pos + 1, "closed"
+        elif state == "separator":
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos, state = pos + 1, "value"
+        else:
+            try:
+                value, end = parser.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Elemento incompleto: falta el resto en el siguiente trozo
+                if eof:
+                    raise
+                await read()
+                continue
+            if end == len(buffer) and not eof:
+                # Un número o literal cortado al final del trozo también se decodifica
+                await read()
+                continue
+            yield value
+            pos, state = end, "separator"
+    if state != "closed":
+        raise json.JSONDecodeError("Unterminated array", buffer, pos)
@@ -0,0 +1,314 @@
+# core/metrics.py
+# Métricas por plantilla de ruta en formato de texto de Prometheus (GET /metrics):
+# latencia, sentencias SQL, tiempo en base de datos, filas y bytes de respuesta
+# por petición, más la latencia de las llamadas salientes a Jira. Cada petición
+# acumula sus datos en un RequestStats (contextvar) que alimentan los hooks
+# before/after_cursor_execute de los engines (ver core/database.py); la misma
+# información sale en la cabecera Server-Timing (db, serialize, app, total).
+# Los contadores son de este worker, como /health/pool.
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BYTES_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = "unmatched"
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # etiquetas -> [cuenta por bucket..., suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            yield from histogram_lines(self.name, self.labelnames, labels, dict(zip(self.buckets, values)),
+                                       values[-2], values[-1])
+
+
+def histogram_lines(name, labelnames, labels, bucket_counts, total_sum, count):
+    """Líneas _bucket/_sum/_count a partir de cuentas por bucket (no acumuladas)."""
+    cumulative = 0
+    for bound, bucket_count in bucket_counts.items():
+        cumulative += bucket_count
+        le = f'le="{_number(bound)}"'
+        yield f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}"
+    yield f"{name}_bucket{_labels(labelnames, labels, INF_LABEL)} {count}"
+    yield f"{name}_sum{_labels(labelnames, labels)} {_number(total_sum)}"
+    yield f"{name}_count{_labels(labelnames, labels)} {count}"
+
+
+def gauge_lines(name: str, documentation: str, samples, labelnames=(), kind: str = "gauge"):
+    """Métrica calculada en el momento de exponerla: samples = [(etiquetas, valor)]."""
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield f"{name}{_labels(labelnames, labels)} {_number(value)}"
+
+
+REQUEST_LABELS = ("method", "route")
+requests_total = Counter("smartplanner_http_requests_total", "HTTP requests by route template and status.",
+                         ("method", "route", "status"))
+request_duration = Histogram("smartplanner_http_request_duration_seconds", "HTTP request latency.", REQUEST_LABELS)
+request_statements = Histogram("smartplanner_db_statements_per_request", "SQL statements executed per HTTP request.",
+                               REQUEST_LABELS, STATEMENT_BUCKETS)
+request_db_time = Histogram("smartplanner_db_time_per_request_seconds", "Time spent executing SQL per HTTP request.",
+                            REQUEST_LABELS)
+db_rows = Counter("smartplanner_db_rows_total", "Rows returned or affected by SQL statements (driver rowcount).",
+                  REQUEST_LABELS)
+response_bytes = Histogram("smartplanner_http_response_bytes", "HTTP response body size as sent (after compression).",
+                           REQUEST_LABELS, BYTES_BUCKETS)
+serialization_time = Histogram("smartplanner_serialization_seconds", "Time spent serializing the response body.",
+                               REQUEST_LABELS)
+jira_duration = Histogram("smartplanner_jira_request_duration_seconds", "Outbound Jira API call latency per attempt.",
+                          ("method", "endpoint", "status"))
+REGISTRY = [requests_total, request_duration, request_statements, request_db_time, db_rows, response_bytes,
+            serialization_time, jira_duration]
+
+
+def exposition(*extra) -> str:
+    """Texto de Prometheus con las métricas registradas y las líneas adicionales (pool, cachés...)."""
+    lines = [line for metric in REGISTRY for line in metric.render()]
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "db_seconds", "rows", "serialize_seconds", "endpoint_finished", "shapes", "budget")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+        self.endpoint_finished = None
+        # Para core/query_diagnostics.py: sentencias por forma y presupuesto declarado por la ruta
+        self.shapes = {}
+        self.budget = None
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# Hooks de SQLAlchemy: se registran en core/database.py para cada engine
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _record(elapsed: float, rows: int = 0):
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        stats.rows += rows
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # rowcount: filas de un SELECT en psycopg2, afectadas en escrituras; -1 si el driver no lo sabe
+    _record(time.perf_counter() - conn.info["metrics_started"].pop(), max(cursor.rowcount, 0))
+
+
+def handle_error(context):
+    # Una sentencia que falla (p. ej. una violación de unicidad) no pasa por
+    # after_cursor_execute: se cuenta aquí y se saca su inicio de la pila
+    started = context.connection.info.get("metrics_started") if context.connection is not None else None
+    if started:
+        _record(time.perf_counter() - started.pop())
+
+
+@contextmanager
+def timed_serialization():
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - started
+
+
+def _timed_endpoint(call):
+    # Marca el final del handler: lo que pasa después hasta enviar la respuesta es
+    # la validación/serialización de FastAPI (response_model + JSON)
+    if iscoroutinefunction(call):
+        @wraps(call)
+        async def endpoint(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    else:
+        @wraps(call)
+        def endpoint(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    endpoint.timed = True
+    return endpoint
+
+
+def _mark_endpoint_finished():
+    stats = _current.get()
+    if stats is not None:
+        stats.endpoint_finished = time.perf_counter()
+
+
+def instrument_routes(app):
+    """Envuelve el handler de cada ruta de la API; se llama tras registrar los routers."""
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is not None and dependant.call is not None and not getattr(dependant.call, "timed", False):
+            dependant.call = _timed_endpoint(dependant.call)
+
+
+_JIRA_CLOUD_PREFIX = re.compile(r"^/ex/jira/[^/]+")
+# ids numéricos y claves de issue (PROJ-123), salvo la versión de la API (/rest/api/3)
+_JIRA_IDS = re.compile(r"(?<!/api)/(\d+|[A-Z][A-Z0-9]*-\d+)(?=/|$)")
+
+
+def jira_endpoint(url: str) -> str:
+    # Sin host, cloud id ni ids, para que la etiqueta tenga pocos valores posibles
+    path = "/" + url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0]
+    return _JIRA_IDS.sub("/{id}", _JIRA_CLOUD_PREFIX.sub("", path))
+
+
+def observe_jira(method: str, url: str, status, seconds: float):
+    jira_duration.observe(seconds, method, jira_endpoint(url), str(status))
+
+
+def server_timing(stats: RequestStats, total: float, serialize: float) -> str:
+    app_seconds = max(total - stats.db_seconds - serialize, 0.0)
+    return ", ".join([
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries"',
+        f"serialize;dur={serialize * 1000:.2f}",
+        f"app;dur={app_seconds * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+
+
+class MetricsMiddleware:
+    """Registra las métricas de cada petición y añade Server-Timing a la respuesta.
+
+    Va por fuera del resto de middlewares: la latencia y los bytes son los que ve
+    el cliente. En respuestas en streaming la cabecera sale antes del cuerpo, así
+    que solo cuenta lo hecho hasta entonces; las métricas sí incluyen todo.
+    """
+
+    def __init__(self, app, server_timing: bool = True, timing_allow_origin: str = ""):
+        self.app = app
+        self.server_timing = server_timing
+        self.timing_allow_origin = timing_allow_origin
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status, sent = 500, 0
+        serialize = 0.0
+
+        async def send_with_metrics(message):
+            nonlocal status, sent, serialize
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                serialize = stats.serialize_seconds + (now - stats.endpoint_finished if stats.endpoint_finished else 0.0)
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(stats, now - started, serialize))
+                    if self.timing_allow_origin:
+                        headers.append("Timing-Allow-Origin", self.timing_allow_origin)
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            labels = (scope["method"], stats.route)
+            requests_total.inc(*labels, str(status))
+            request_duration.observe(time.perf_counter() - started, *labels)
+            request_statements.observe(stats.statements, *labels)
+            request_db_time.observe(stats.db_seconds, *labels)
+            db_rows.inc(*labels, amount=stats.rows)
+            response_bytes.observe(sent, *labels)
+            serialization_time.observe(serialize, *labels)
@@ -0,0 +1,109 @@
+# core/pagination.py
+# Paginación por keyset (cursor). En lugar de OFFSET, cada página continúa
+# a partir de los valores de ordenación de la última fila, de modo que la
+# página N cuesta lo mismo que la primera y el orden no se desplaza.
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi import Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _dump(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+
+class Keyset:
+    """Orden estable (columna de orden, ..., pk) usado para paginar por cursor."""
+
+    def __init__(self, *columns, descending=False):
+        self.columns = columns
+        self.descending = descending
+
+    def reversed(self):
+        return Keyset(*self.columns, descending=not self.descending)
+
+    @property
+    def name(self):
+        name = ",".join(column.key for column in self.columns)
+        return f"-{name}" if self.descending else name
+
+    def order_by(self):
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def encode(self, row) -> str:
+        payload = {"k": self.name, "v": [_dump(getattr(row, column.key)) for column in self.columns]}
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            values = payload["v"]
+            if payload["k"] != self.name or len(values) != len(self.columns):
+                raise InvalidCursor("Cursor does not match the requested sort")
+            return [_load(column, value) for column, value in zip(self.columns, values)]
+        except InvalidCursor:
+            raise
+        except (ValueError, KeyError, TypeError) as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+
+    def after(self, values):
+        # (a, b, pk) > (va, vb, vpk) expandido, válido en cualquier backend
+        clauses = []
+        for i, column in enumerate(self.columns):
+            equal = [self.columns[j] == values[j] for j in range(i)]
+            beyond = column < values[i] if self.descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def apply(self, query, cursor=None):
+        if cursor:
+            query = query.filter(self.after(self.decode(cursor)))
+        return query.order_by(*self.order_by())
+
+
+def keyset_for(keysets: dict, sort: str) -> Keyset:
+    descending = sort.startswith("-")
+    keyset = keysets.get(sort.lstrip("-"))
+    if keyset is None:
+        allowed = ", ".join(sorted(keysets))
+        raise InvalidCursor(f"Invalid sort '{sort}'. Allowed: {allowed}")
+    return keyset.reversed() if descending else keyset
+
+
+def paginate(query, keysets: dict, sort: str, skip: int = 0, limit: int = 100, cursor=None):
+    query = keyset_for(keysets, sort).apply(query, cursor)
+    # skip solo se respeta sin cursor, por compatibilidad con clientes antiguos
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, rows, limit: int, keysets: dict, sort: str):
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = keyset_for(keysets, sort).encode(rows[-1])
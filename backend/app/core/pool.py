@@ -0,0 +1,93 @@
+# core/pool.py
+# Métricas del pool de conexiones: cuánto espera cada petición por una conexión
+# libre (histograma en ms), cuántas esperas acaban en timeout y qué parte de la
+# capacidad (pool_size + max_overflow) está en uso.
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            milliseconds = seconds * 1000
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if milliseconds <= bound:
+                    self.buckets[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS, self.buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.checkouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "wait_ms_buckets": buckets,
+            }
+
+    def histogram(self):
+        # Cuentas por bucket (en segundos, sin acumular), suma y total para /metrics
+        with self._lock:
+            buckets = {bound / 1000: count for bound, count in zip(WAIT_BUCKETS_MS, self.buckets)}
+            return buckets, self.wait_seconds_total, self.checkouts
+
+
+class _InstrumentedPool:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        # _do_get es la espera por una conexión libre (o la apertura de una nueva)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+def instrumented(pool_class, metrics: PoolMetrics):
+    # La métrica va en la clase: engine.dispose() recrea el pool con la misma clase
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPool, pool_class), {"metrics": metrics})
+
+
+def pool_stats(pool, max_overflow: int):
+    stats = {"pool": type(pool).__name__}
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        # Pools sin límite (SQLite en memoria): no hay saturación que medir
+        return stats
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max_overflow
+    stats.update(
+        size=pool.size(),
+        checked_out=checked_out,
+        idle=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        capacity=capacity,
+        saturation=round(checked_out / capacity, 4) if capacity else 0.0,
+        **metrics.snapshot(),
+    )
+    return stats
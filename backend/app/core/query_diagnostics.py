@@ -0,0 +1,162 @@
+# core/query_diagnostics.py
+# Diagnóstico de consultas para desarrollo y canary:
+# - Sentencias lentas (SLOW_QUERY_MS): se registran con sus parámetros y la ruta
+#   que las lanzó; con SLOW_QUERY_EXPLAIN, además el plan de EXPLAIN (ANALYZE,
+#   BUFFERS) de los SELECT lentos en PostgreSQL (vuelve a ejecutar la consulta).
+# - N+1 (N_PLUS_ONE_THRESHOLD): la misma forma de sentencia repetida N veces en
+#   una petición, típico de una relación lazy recorrida fila a fila.
+# - Presupuesto de sentencias por ruta, declarado con
+#   dependencies=[Depends(query_budget(n))]. Con QUERY_BUDGET_MODE=strict una
+#   ruta que lo supera (o con N+1) responde 500, y los tests que la llaman fallan.
+import logging
+import re
+import time
+
+from starlette.responses import JSONResponse
+
+from app.core.config import N_PLUS_ONE_THRESHOLD, QUERY_BUDGET_MODE, SLOW_QUERY_EXPLAIN, SLOW_QUERY_MS
+from app.core.metrics import Counter, REGISTRY, REQUEST_LABELS, current_stats
+
+logger = logging.getLogger("app.sql")
+
+_LITERALS = re.compile(r"\b\d+\b|'(?:[^']|'')*'")
+_SPACES = re.compile(r"\s+")
+MAX_LOGGED_CHARS = 2000
+
+query_budget_exceeded = Counter("smartplanner_query_budget_exceeded_total",
+                                "Requests that ran more SQL statements than their route's budget.", REQUEST_LABELS)
+n_plus_one_detected = Counter("smartplanner_n_plus_one_total",
+                              "Requests that repeated one statement shape N_PLUS_ONE_THRESHOLD times or more.", REQUEST_LABELS)
+slow_queries = Counter("smartplanner_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ("route",))
+REGISTRY.extend([query_budget_exceeded, n_plus_one_detected, slow_queries])
+
+
+def enabled() -> bool:
+    return SLOW_QUERY_MS > 0 or N_PLUS_ONE_THRESHOLD > 0
+
+
+def statement_shape(statement: str) -> str:
+    # Los valores van como parámetros; se quitan además literales y espacios por si vienen en el SQL
+    return _SPACES.sub(" ", _LITERALS.sub("?", statement)).strip()
+
+
+def _truncate(value) -> str:
+    text = repr(value) if not isinstance(value, str) else value
+    return text if len(text) <= MAX_LOGGED_CHARS else text[:MAX_LOGGED_CHARS] + "..."
+
+
+def _explain(conn, statement, parameters):
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    # Cursor DBAPI directo: no pasa por los hooks ni cuenta en el presupuesto de la petición
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except Exception as exc:
+        return f"EXPLAIN failed: {exc}"
+    finally:
+        cursor.close()
+
+
+def _observe(conn, statement, parameters, elapsed, explain=True, context=None):
+    stats = current_stats()
+    route = stats.route if stats else "-"
+    # Los lotes de un mismo execute() (insertmanyvalues; en SQLite, fila a fila si el
+    # RETURNING debe seguir el orden de los parámetros) comparten contexto: cuentan una vez
+    repeated_batch = context is not None and conn.info.get("diagnostics_context") is context
+    conn.info["diagnostics_context"] = context
+    if N_PLUS_ONE_THRESHOLD > 0 and stats is not None and not repeated_batch:
+        shape = statement_shape(statement)
+        stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+    if SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_queries.inc(route)
+        plan = _explain(conn, statement, parameters) if SLOW_QUERY_EXPLAIN and explain else None
+        logger.warning("Slow query (%.1f ms) in %s: %s | params=%s%s", elapsed * 1000, route, _truncate(statement),
+                       _truncate(parameters), f"\n{plan}" if plan else "")
+
+
+# Hooks de SQLAlchemy: core/database.py los registra solo si enabled()
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("diagnostics_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _observe(conn, statement, parameters, time.perf_counter() - conn.info["diagnostics_started"].pop(), context=context)
+
+
+def handle_error(context):
+    # Las sentencias que fallan también cuentan para N+1 y sentencias lentas
+    conn = context.connection
+    started = conn.info.get("diagnostics_started") if conn is not None else None
+    if started:
+        # Sin EXPLAIN: en PostgreSQL la transacción ya está abortada
+        _observe(conn, context.statement or "", context.parameters, time.perf_counter() - started.pop(), explain=False,
+                 context=context.execution_context)
+
+
+def query_budget(max_statements: int):
+    """Dependencia de ruta: máximo de sentencias SQL que puede ejecutar una petición."""
+    async def declare_budget():
+        stats = current_stats()
+        if stats is not None:
+            stats.budget = max_statements
+    return declare_budget
+
+
+def _over_budget(stats, method: str):
+    query_budget_exceeded.inc(method, stats.route)
+    return f"{method} {stats.route} ran {stats.statements} SQL statements (budget {stats.budget})"
+
+
+def violations(stats, method: str):
+    problems = []
+    if stats.budget is not None and stats.statements > stats.budget:
+        problems.append(_over_budget(stats, method))
+    if N_PLUS_ONE_THRESHOLD > 0:
+        repeated = [(count, shape) for shape, count in stats.shapes.items() if count >= N_PLUS_ONE_THRESHOLD]
+        if repeated:
+            n_plus_one_detected.inc(method, stats.route)
+        for count, shape in sorted(repeated, reverse=True):
+            problems.append(f"{method} {stats.route} repeated a statement {count} times (N+1?): {_truncate(shape)}")
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """Comprueba presupuesto y N+1 al empezar la respuesta (y al terminar, para el streaming).
+
+    Va dentro de MetricsMiddleware, que es quien crea las estadísticas de la petición.
+    """
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.strict = mode == "strict"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or current_stats() is None:
+            await self.app(scope, receive, send)
+            return
+        stats = current_stats()
+        at_start, replaced = None, False
+
+        async def send_checked(message):
+            nonlocal at_start, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                at_start = stats.statements
+                problems = violations(stats, scope["method"])
+                for problem in problems:
+                    logger.warning(problem)
+                if problems and self.strict:
+                    # Se descarta la respuesta del handler y se devuelve el diagnóstico
+                    replaced = True
+                    await JSONResponse({"detail": problems}, status_code=500)(scope, receive, send)
+                    return
+            await send(message)
+
+        await self.app(scope, receive, send_checked)
+        # Respuestas en streaming: lo ejecutado después de la cabecera ya no puede
+        # cambiar el código de estado, solo se registra (sin N+1: cada lote repite la consulta)
+        if not replaced and at_start is not None and stats.budget is not None and at_start <= stats.budget < stats.statements:
+            logger.warning(_over_budget(stats, scope["method"]))
@@ -0,0 +1,57 @@
+# core/readiness.py
+# Verificación de la base de datos al arrancar, fuera del import: el worker
+# arranca y responde /health/live aunque PostgreSQL tarde en aceptar conexiones,
+# y /health/ready da 503 hasta que la base responde y tiene todas las tablas.
+# El esquema ya no se crea al arrancar: python -m scripts.bootstrap_db
+import asyncio
+import logging
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    def __init__(self):
+        self.ready = False
+        self.error = "starting"
+        self.attempts = 0
+        self.ready_at = None
+        self._started = time.monotonic()
+
+    def verify(self, engine, metadata) -> bool:
+        self.attempts += 1
+        try:
+            with engine.connect() as connection:
+                existing = set(inspect(connection).get_table_names())
+        except Exception as exc:
+            self.error = f"database unavailable: {exc}"
+            return False
+        missing = sorted(table.name for table in metadata.sorted_tables if table.name not in existing)
+        if missing:
+            self.error = f"missing tables {missing}; run python -m scripts.bootstrap_db"
+            return False
+        self.ready, self.error = True, None
+        self.ready_at = time.monotonic()
+        return True
+
+    async def wait(self, engine, metadata, delay: float = 0.5, max_delay: float = 30.0):
+        """Reintenta con backoff hasta que la base de datos esté lista."""
+        while not await run_in_threadpool(self.verify, engine, metadata):
+            logger.warning("Not ready (attempt %s): %s", self.attempts, self.error)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+        logger.info("Database ready after %s attempt(s)", self.attempts)
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "attempts": self.attempts,
+            "seconds_to_ready": round(self.ready_at - self._started, 3) if self.ready_at else None,
+        }
+
+
+readiness = Readiness()
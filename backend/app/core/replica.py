@@ -0,0 +1,117 @@
+# core/replica.py
+# Enrutado de lecturas a una réplica:
+# - ReplicaMonitor comprueba (como mucho una vez por intervalo) que la réplica
+#   responde y que su retraso está por debajo del máximo; si no, se lee del primario.
+# - Read-your-writes: tras una escritura correcta el cliente recibe una cookie con
+#   la hora de la escritura y, durante la ventana configurada, sus lecturas van al
+#   primario para que vea lo que acaba de escribir aunque la réplica vaya atrasada.
+import asyncio
+import logging
+import time
+from contextvars import Context
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITE_COOKIE = "sp_last_write"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Retraso de reproducción de una réplica en streaming; 0 si ya reprodujo todo lo
+# recibido (un primario sin escrituras no debe contar como réplica atrasada)
+_PG_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def replication_lag_seconds(connection) -> float:
+    if connection.dialect.name == "postgresql":
+        return float(connection.execute(_PG_LAG_SQL).scalar())
+    # Otros backends (SQLite como réplica local de pruebas): solo se comprueba que responde
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReplicaMonitor:
+    def __init__(self, engine, max_lag: float, interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.healthy = False
+        self.lag = None
+        self.error = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def check(self):
+        try:
+            with self.engine.connect() as connection:
+                self.lag = replication_lag_seconds(connection)
+            self.error = None
+            self.healthy = self.lag <= self.max_lag
+        except Exception as exc:
+            if self.healthy or self.error is None:
+                logger.warning("Read replica unavailable, reading from primary: %s", exc)
+            self.error = str(exc)
+            self.lag = None
+            self.healthy = False
+        self.checked_at = time.monotonic()
+        return self.healthy
+
+    async def available(self) -> bool:
+        if time.monotonic() - self.checked_at < self.interval:
+            return self.healthy
+        async with self._lock:
+            # Otra petición pudo hacer la comprobación mientras se esperaba el lock
+            if time.monotonic() - self.checked_at >= self.interval:
+                # Contexto vacío: la comprobación no cuenta como sentencia de la petición que la dispara
+                await run_in_threadpool(Context().run, self.check)
+        return self.healthy
+
+    def status(self):
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "error": self.error,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+        }
+
+
+def recently_wrote(request: Request, window: float) -> bool:
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < window
+
+
+class ReadYourWritesMiddleware:
+    """Marca con una cookie a los clientes que acaban de escribir (métodos no seguros con éxito)."""
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
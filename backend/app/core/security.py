@@ -0,0 +1,70 @@
+# core/security.py
+# bcrypt consume 100-300 ms de CPU por hash; se ejecuta en un pool de procesos
+# dedicado para no ocupar el threadpool ni el GIL del proceso que sirve la API.
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor = None
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(password):
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password, password_hash):
+    # Devuelve (válida, nuevo hash o None); hay nuevo hash si cambió BCRYPT_ROUNDS
+    if password_hash is None:
+        # Usuario inexistente: mismo coste que una verificación real
+        pwd_context.dummy_verify()
+        return False, None
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: no se hereda el estado (hilos, conexiones) del proceso del servidor
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def _run(fn, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, password_hash):
+    """Verifica la contraseña; devuelve (válida, hash actualizado o None)."""
+    try:
+        return await _run(_verify_and_update, password, password_hash)
+    except ValueError as exc:
+        # Hash en claro, de otro esquema o mal formado (filas antiguas): no coincide
+        # (401), no es un error del servidor. Se registra aquí y no en el pool de
+        # procesos, que no tiene el logging de la API
+        logger.warning("Login rejected: unrecognised password hash (%s); reset the user's password", exc)
+        return await _run(_verify_and_update, password, None)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,76 @@
+# core/serialization.py
+# Modo rápido de serialización (FAST_SERIALIZATION): las filas ORM se convierten
+# en dicts leyendo directamente los atributos que declara el esquema *Out, sin
+# validarlas con pydantic, y se codifican con orjson. Los tipos ya vienen de la
+# base de datos, así que la validación de salida solo repetía trabajo; los
+# esquemas siguen definiendo qué campos salen y en qué forma.
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+from typing import Optional, get_args
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import FAST_SERIALIZATION
+from app.core.metrics import timed_serialization
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional: sin ella se usa siempre la ruta estándar
+    orjson = None
+
+fast_serialization = FAST_SERIALIZATION and orjson is not None
+
+
+def _default(value):
+    # Lo único que orjson no sabe codificar de nuestras columnas (DECIMAL -> float, como pydantic)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+def _nested_schema(annotation):
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+class RowDumper:
+    """Fila ORM (o Row) -> dict con los campos de `schema`, sin validación."""
+
+    def __init__(self, schema, fields=None):
+        self.names = tuple(fields or schema.model_fields)
+        getter = attrgetter(*self.names)
+        self._get = getter if len(self.names) > 1 else lambda row: (getter(row),)
+        self.nested = {}
+        for name in self.names:
+            nested = _nested_schema(schema.model_fields[name].annotation)
+            if nested is not None:
+                self.nested[name] = row_dumper(nested)
+
+    def __call__(self, row):
+        data = dict(zip(self.names, self._get(row)))
+        for name, dump in self.nested.items():
+            if data[name] is not None:
+                data[name] = dump(data[name])
+        return data
+
+
+@lru_cache(maxsize=256)
+def row_dumper(schema, fields: Optional[tuple] = None) -> RowDumper:
+    return RowDumper(schema, fields)
+
+
+def fast_response(content, schema, fields=None, response: Optional[Response] = None):
+    with timed_serialization():
+        dump = row_dumper(schema, tuple(fields) if fields else None)
+        data = [dump(row) for row in content] if isinstance(content, list) else dump(content)
+        return FastJSONResponse(data, headers=dict(response.headers) if response else None)
@@ -1,9 +1,7 @@
 # core/utils.py
+# Las variables del archivo .env las carga app.core.config al importarse
 import base64
 import os
-from dotenv import load_dotenv
-
-load_dotenv()  # Carga las variables desde el archivo .env
 
 def get_jira_headers():
     email = os.getenv("JIRA_EMAIL")
@@ -1,39 +1,57 @@
+from typing import Optional
+from sqlalchemy import delete, insert, update
 from sqlalchemy.orm import Session
 from app.models.client_models import Client
 from app.schemas.client_schema import ClientCreate, ClientUpdate
+from app.core.cache import EntityCache
+from app.core.config import REFERENCE_CACHE_MAXSIZE, REFERENCE_CACHE_TTL
+from app.core.database import is_replica
+from app.core.fields import field_options
+from app.core.pagination import Keyset, keyset_for, paginate
 
 
-def get_client(db: Session, client_id: int):
-    return db.query(Client).filter(Client.client_id == client_id).first()
+CLIENT_SORTS = {
+    "client_id": Keyset(Client.client_id),
+    "name": Keyset(Client.name, Client.client_id),
+}
 
+client_cache = EntityCache(Client, maxsize=REFERENCE_CACHE_MAXSIZE, ttl=REFERENCE_CACHE_TTL)
 
-def get_clients(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Client).offset(skip).limit(limit).all()
+
+def get_client(db: Session, client_id: int, fields=None):
+    query = db.query(Client).options(*field_options(Client, fields)).filter(Client.client_id == client_id)
+    if fields or is_replica(db):
+        return query.first()
+    return client_cache.get(client_id, query.first)
+
+
+def get_clients(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "client_id", fields=None):
+    query = db.query(Client).options(*field_options(Client, fields, *keyset_for(CLIENT_SORTS, sort).columns))
+    return paginate(query, CLIENT_SORTS, sort, skip, limit, cursor).all()
 
 
 def create_client(db: Session, client: ClientCreate):
-    db_client = Client(**client.dict())
-    db.add(db_client)
+    db_client = db.scalars(insert(Client).returning(Client), [client.dict()]).one()
     db.commit()
-    db.refresh(db_client)
+    client_cache.put(db_client)
     return db_client
 
 
 def update_client(db: Session, client_id: int, updates: ClientUpdate):
-    db_client = get_client(db, client_id)
-    if not db_client:
-        return None
-    for key, value in updates.dict(exclude_unset=True).items():
-        setattr(db_client, key, value)
+    values = updates.dict(exclude_unset=True)
+    if not values:
+        return get_client(db, client_id)
+    stmt = update(Client).where(Client.client_id == client_id).values(**values).returning(Client)
+    db_client = db.scalars(stmt).one_or_none()
     db.commit()
-    db.refresh(db_client)
+    if db_client:
+        client_cache.put(db_client)
     return db_client
 
 
 def delete_client(db: Session, client_id: int):
-    db_client = get_client(db, client_id)
-    if not db_client:
-        return None
-    db.delete(db_client)
+    db_client = db.scalars(delete(Client).where(Client.client_id == client_id).returning(Client)).one_or_none()
     db.commit()
+    if db_client:
+        client_cache.invalidate(client_id)
     return db_client
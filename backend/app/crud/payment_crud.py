@@ -0,0 +1,233 @@
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import Integer, case, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import BILLABLE_STATUSES, BILLING_CHUNK_SIZE, BILLING_CURRENCY, INVOICE_DUE_DAYS
+from app.core.pagination import Keyset, paginate
+from app.models.payment_models import Invoice, InvoiceLine, Payment, RateCard
+from app.models.project_models import Project
+from app.models.time_entry_models import TimeEntry
+from app.schemas.payment_schema import PaymentCreate, RateCardCreate, RateCardUpdate
+
+INVOICE_SORTS = {
+    "invoice_id": Keyset(Invoice.invoice_id),
+    "period_start": Keyset(Invoice.period_start, Invoice.invoice_id),
+}
+
+
+class InvoiceStateError(ValueError):
+    """La factura no está en un estado que permita la operación (409)."""
+
+
+def get_rate_cards(db: Session, client_id: Optional[int] = None, project_id: Optional[int] = None):
+    query = db.query(RateCard)
+    if client_id is not None:
+        query = query.filter(RateCard.client_id == client_id)
+    if project_id is not None:
+        query = query.filter(RateCard.project_id == project_id)
+    return query.order_by(RateCard.rate_card_id).all()
+
+
+def create_rate_card(db: Session, rate_card: RateCardCreate):
+    db_rate_card = db.scalars(insert(RateCard).returning(RateCard), [rate_card.dict()]).one()
+    db.commit()
+    return db_rate_card
+
+
+def update_rate_card(db: Session, rate_card_id: int, rate_card: RateCardUpdate):
+    stmt = update(RateCard).where(RateCard.rate_card_id == rate_card_id).values(**rate_card.dict()).returning(RateCard)
+    db_rate_card = db.scalars(stmt).one_or_none()
+    db.commit()
+    return db_rate_card
+
+
+def delete_rate_card(db: Session, rate_card_id: int):
+    db_rate_card = db.scalars(delete(RateCard).where(RateCard.rate_card_id == rate_card_id).returning(RateCard)).one_or_none()
+    db.commit()
+    return db_rate_card
+
+
+def _hundredths(value: int) -> Decimal:
+    return Decimal(value) / 100
+
+
+def _invoice_number(period_start: date, period_end: date, client_id: int, reissue: int = 0) -> str:
+    number = f"INV-{period_start:%Y%m%d}-{period_end:%Y%m%d}-{client_id}"
+    return f"{number}-{reissue + 1}" if reissue else number
+
+
+def _day_offset(dialect: str, period_start: date):
+    # Día del periodo de cada registro (0 = period_start)
+    if dialect == "sqlite":
+        return cast(func.julianday(TimeEntry.entry_date) - func.julianday(period_start), Integer)
+    return cast(TimeEntry.entry_date - period_start, Integer)
+
+
+def run_billing(db: Session, period_start: date, period_end: date, client_id: Optional[int] = None):
+    """Factura las horas facturables del periodo: un borrador por cliente con una línea por proyecto, actividad y tarifa.
+
+    Los registros se leen en lotes de BILLING_CHUNK_SIZE y se agregan con NumPy
+    (core/billing.py); las facturas y sus líneas se escriben con un INSERT
+    multi-fila cada una. Repetir la facturación de un periodo sustituye los
+    borradores que se solapan con él; se omiten los clientes con una factura
+    emitida o pagada en esas fechas.
+    """
+    # NumPy solo se carga al facturar, no al arrancar la API
+    from app.core import billing
+
+    # Facturas de periodos que se solapan con este: no se factura dos veces el mismo día
+    overlapping = (Invoice.period_start <= period_end, Invoice.period_end >= period_start)
+    if client_id is not None:
+        overlapping += (Invoice.client_id == client_id,)
+    existing = db.execute(
+        select(Invoice.client_id, Invoice.status, Invoice.period_start, Invoice.period_end)
+        .where(*overlapping, Invoice.status != "draft")
+    ).all()
+    skipped = sorted({row.client_id for row in existing if row.status != "void"})
+    # Una factura anulada conserva su número: la que la sustituye lleva un sufijo
+    reissues = Counter(row.client_id for row in existing
+                       if row.status == "void" and (row.period_start, row.period_end) == (period_start, period_end))
+
+    client_of = billing.client_index(db.execute(select(Project.project_id, Project.client_id)).all())
+    rate_cards = [
+        (card.client_id, card.project_id, card.activity_type, billing.cents(card.hourly_rate), card.valid_from, card.valid_to)
+        for card in db.execute(
+            select(RateCard.client_id, RateCard.project_id, RateCard.activity_type, RateCard.hourly_rate,
+                   RateCard.valid_from, RateCard.valid_to)
+            .where(RateCard.valid_from.is_(None) | (RateCard.valid_from <= period_end),
+                   RateCard.valid_to.is_(None) | (RateCard.valid_to >= period_start))
+            .order_by(RateCard.rate_card_id)
+        )
+    ]
+
+    # Solo enteros (salvo la actividad): el driver no tiene que convertir fechas ni decimales.
+    # duration_hours ya está redondeada a centésimas
+    stmt = select(
+        TimeEntry.project_id, TimeEntry.activity_type, _day_offset(db.get_bind().dialect.name, period_start),
+        cast(func.round(TimeEntry.duration_hours * 100), Integer),
+    ).where(TimeEntry.entry_date.between(period_start, period_end), TimeEntry.status.in_(BILLABLE_STATUSES))
+    if client_id is not None or skipped:
+        billed_projects = select(Project.project_id)
+        if client_id is not None:
+            billed_projects = billed_projects.where(Project.client_id == client_id)
+        if skipped:
+            billed_projects = billed_projects.where(Project.client_id.not_in(skipped))
+        stmt = stmt.where(TimeEntry.project_id.in_(billed_projects))
+    accumulator = billing.BillingAccumulator(period_start)
+    # Core en lugar de ORM: las filas llegan como tuplas, sin el coste de cargarlas como entidades
+    for partition in db.connection().execute(stmt.execution_options(yield_per=BILLING_CHUNK_SIZE)).partitions():
+        accumulator.add(partition)
+    lines, unrated = billing.billing_lines(accumulator, client_of, rate_cards)
+
+    # Los borradores anteriores se sustituyen (no tienen pagos: solo se paga lo emitido)
+    drafts = select(Invoice.invoice_id).where(*overlapping, Invoice.status == "draft")
+    db.execute(delete(InvoiceLine).where(InvoiceLine.invoice_id.in_(drafts)))
+    db.execute(delete(Invoice).where(Invoice.invoice_id.in_(drafts)))
+
+    totals = {}
+    for client, _, _, _, centihours, _, amount in lines:
+        hours, total = totals.get(client, (0, 0))
+        totals[client] = (hours + centihours, total + amount)
+    clients = sorted(totals)
+    invoice_ids = []
+    if clients:
+        invoice_ids = db.scalars(insert(Invoice).returning(Invoice.invoice_id, sort_by_parameter_order=True), [
+            {
+                "invoice_number": _invoice_number(period_start, period_end, client, reissues[client]), "client_id": client,
+                "period_start": period_start, "period_end": period_end, "status": "draft", "currency": BILLING_CURRENCY,
+                "hours": _hundredths(totals[client][0]), "total": _hundredths(totals[client][1]), "amount_paid": 0,
+                "due_date": period_end + timedelta(days=INVOICE_DUE_DAYS),
+            }
+            for client in clients
+        ]).all()
+        invoice_of = dict(zip(clients, invoice_ids))
+        db.execute(insert(InvoiceLine), [
+            {
+                "invoice_id": invoice_of[client], "project_id": project_id, "activity_type": activity_type,
+                "entries": entries, "hours": _hundredths(centihours), "hourly_rate": _hundredths(rate),
+                "amount": _hundredths(amount),
+            }
+            for client, project_id, activity_type, entries, centihours, rate, amount in lines
+        ])
+    db.commit()
+    return {
+        "period_start": period_start,
+        "period_end": period_end,
+        "entries": int(accumulator.entries.sum()),
+        "hours": float(_hundredths(sum(hours for hours, _ in totals.values()))),
+        "total": float(_hundredths(sum(total for _, total in totals.values()))),
+        "invoice_ids": invoice_ids,
+        "lines": len(lines),
+        "skipped_clients": skipped,
+        "unrated": [
+            {"project_id": project_id, "activity_type": activity_type, "hours": float(_hundredths(centihours))}
+            for project_id, activity_type, centihours in unrated
+        ],
+    }
+
+
+def get_invoices(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "invoice_id",
+                 client_id: Optional[int] = None, status: Optional[str] = None, period_start: Optional[date] = None):
+    query = db.query(Invoice)
+    if client_id is not None:
+        query = query.filter(Invoice.client_id == client_id)
+    if status is not None:
+        query = query.filter(Invoice.status == status)
+    if period_start is not None:
+        query = query.filter(Invoice.period_start == period_start)
+    return paginate(query, INVOICE_SORTS, sort, skip, limit, cursor).all()
+
+
+def get_invoice(db: Session, invoice_id: int):
+    # Factura, líneas y pagos en tres consultas
+    query = db.query(Invoice).options(selectinload(Invoice.lines), selectinload(Invoice.payments))
+    return query.filter(Invoice.invoice_id == invoice_id).first()
+
+
+def _invoice_status(db: Session, invoice_id: int):
+    return db.scalar(select(Invoice.status).where(Invoice.invoice_id == invoice_id))
+
+
+# Las transiciones son un UPDATE condicionado al estado: atómico sin bloquear antes la fila
+def issue_invoice(db: Session, invoice_id: int):
+    stmt = (update(Invoice).where(Invoice.invoice_id == invoice_id, Invoice.status == "draft")
+            .values(status="issued", issued_at=func.now()).returning(Invoice))
+    db_invoice = db.scalars(stmt).one_or_none()
+    db.commit()
+    if db_invoice is None and (status := _invoice_status(db, invoice_id)):
+        raise InvoiceStateError(f"Only draft invoices can be issued (invoice is {status})")
+    return db_invoice
+
+
+def void_invoice(db: Session, invoice_id: int):
+    stmt = (update(Invoice).where(Invoice.invoice_id == invoice_id, Invoice.status.in_(("draft", "issued")),
+                                  Invoice.amount_paid == 0)
+            .values(status="void").returning(Invoice))
+    db_invoice = db.scalars(stmt).one_or_none()
+    db.commit()
+    if db_invoice is None and _invoice_status(db, invoice_id):
+        raise InvoiceStateError("Only draft or issued invoices without payments can be voided")
+    return db_invoice
+
+
+def create_payment(db: Session, invoice_id: int, payment: PaymentCreate):
+    # El UPDATE bloquea la factura hasta el commit: dos pagos simultáneos no pierden su suma
+    paid = Invoice.amount_paid + payment.amount
+    stmt = (update(Invoice).where(Invoice.invoice_id == invoice_id, Invoice.status == "issued")
+            .values(amount_paid=paid, status=case((paid >= Invoice.total, "paid"), else_="issued"))
+            .returning(Invoice.invoice_id))
+    if db.scalar(stmt) is None:
+        db.rollback()
+        status = _invoice_status(db, invoice_id)
+        if status:
+            raise InvoiceStateError(f"Payments can only be recorded on issued invoices (invoice is {status})")
+        return None
+    db_payment = db.scalars(insert(Payment).returning(Payment), [{"invoice_id": invoice_id, **payment.dict()}]).one()
+    db.commit()
+    return db_payment
+
+
+def get_payments(db: Session, invoice_id: int):
+    return db.scalars(select(Payment).where(Payment.invoice_id == invoice_id).order_by(Payment.payment_id)).all()
@@ -1,39 +1,76 @@
+from typing import Optional
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from app.models.project_models import Project
 from app.schemas.project_schema import ProjectCreate, ProjectUpdate
+from app.core.cache import EntityCache
+from app.core.config import REFERENCE_CACHE_MAXSIZE, REFERENCE_CACHE_TTL
+from app.core.database import is_replica
+from app.core.etag import version_clause
+from app.core.expand import expand_options
+from app.core.fields import field_options
+from app.core.pagination import Keyset, keyset_for, paginate
 
 
-def get_project(db: Session, project_id: int):
-    return db.query(Project).filter(Project.project_id == project_id).first()
+PROJECT_SORTS = {
+    "project_id": Keyset(Project.project_id),
+    "name": Keyset(Project.name, Project.project_id),
+}
 
+PROJECT_EXPANDS = ("client",)
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Project).offset(skip).limit(limit).all()
+project_cache = EntityCache(Project, maxsize=REFERENCE_CACHE_MAXSIZE, ttl=REFERENCE_CACHE_TTL)
+
+
+def get_project_versions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "project_id"):
+    # (pk, updated_at) de la página, para la ETag sin cargar las filas
+    query = db.query(Project.project_id, Project.updated_at)
+    return paginate(query, PROJECT_SORTS, sort, skip, limit, cursor).all()
+
+
+def get_project_version(db: Session, project_id: int):
+    return db.execute(select(Project.updated_at).where(Project.project_id == project_id)).first()
+
+
+def get_project(db: Session, project_id: int, expand=(), fields=None):
+    options = [*expand_options(Project, expand), *field_options(Project, fields)]
+    query = db.query(Project).options(*options).filter(Project.project_id == project_id)
+    if expand or fields or is_replica(db):
+        return query.first()
+    return project_cache.get(project_id, query.first)
+
+
+def get_projects(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "project_id", expand=(),
+                 fields=None):
+    options = [*expand_options(Project, expand), *field_options(Project, fields, *keyset_for(PROJECT_SORTS, sort).columns)]
+    query = db.query(Project).options(*options)
+    return paginate(query, PROJECT_SORTS, sort, skip, limit, cursor).all()
 
 
 def create_project(db: Session, project: ProjectCreate):
-    db_project = Project(**project.dict())
-    db.add(db_project)
+    db_project = db.scalars(insert(Project).returning(Project), [project.dict()]).one()
     db.commit()
-    db.refresh(db_project)
+    project_cache.put(db_project)
     return db_project
 
 
-def update_project(db: Session, project_id: int, updates: ProjectUpdate):
-    db_project = get_project(db, project_id)
-    if not db_project:
-        return None
-    for key, value in updates.dict(exclude_unset=True).items():
-        setattr(db_project, key, value)
+def update_project(db: Session, project_id: int, updates: ProjectUpdate, versions=None):
+    values = updates.dict(exclude_unset=True)
+    condition = version_clause(db, Project.updated_at, versions) if versions else True
+    if not values:
+        return db.query(Project).filter(Project.project_id == project_id, condition).first()
+    stmt = update(Project).where(Project.project_id == project_id, condition).values(**values).returning(Project)
+    db_project = db.scalars(stmt).one_or_none()
     db.commit()
-    db.refresh(db_project)
+    if db_project:
+        project_cache.put(db_project)
     return db_project
 
 
-def delete_project(db: Session, project_id: int):
-    db_project = get_project(db, project_id)
-    if not db_project:
-        return None
-    db.delete(db_project)
+def delete_project(db: Session, project_id: int, versions=None):
+    condition = version_clause(db, Project.updated_at, versions) if versions else True
+    db_project = db.scalars(delete(Project).where(Project.project_id == project_id, condition).returning(Project)).one_or_none()
     db.commit()
+    if db_project:
+        project_cache.invalidate(project_id)
     return db_project
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+from sqlalchemy import Date, cast, delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.database import upsert_insert
+from app.models.report_models import TimeEntryRollup
+from app.models.time_entry_models import TimeEntry
+
+REPORT_GROUPS = {
+    "user": TimeEntryRollup.user_id,
+    "project": TimeEntryRollup.project_id,
+    "activity_type": TimeEntryRollup.activity_type,
+}
+REPORT_PERIODS = ("day", "week", "month")
+ROLLUP_KEY = ("user_id", "project_id", "activity_type", "entry_date")
+
+
+def entry_hours(entry_date: date, start_time, end_time) -> Decimal:
+    # Misma fórmula y redondeo que la columna calculada time_entries.duration_hours
+    seconds = (datetime.combine(entry_date, end_time) - datetime.combine(entry_date, start_time)).total_seconds()
+    return (Decimal(seconds) / 3600).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def add_rollup_delta(deltas, entry, sign: int = 1):
+    """Acumula en `deltas` la contribución (+/-) de un registro de tiempo."""
+    key = (entry.user_id, entry.project_id, entry.activity_type, entry.entry_date)
+    hours, entries = deltas[key]
+    deltas[key] = (hours + sign * entry_hours(entry.entry_date, entry.start_time, entry.end_time), entries + sign)
+    return deltas
+
+
+def new_rollup_deltas():
+    return defaultdict(lambda: (Decimal(0), 0))
+
+
+def apply_rollup_deltas(db: Session, deltas):
+    """Aplica los deltas con un único upsert; no hace commit (va en la transacción del llamador).
+
+    Las filas que se quedan sin registros se borran en la misma transacción: un
+    agregado vacío no debe impedir borrar su usuario o su proyecto (claves foráneas).
+    """
+    rows = [
+        {"user_id": user_id, "project_id": project_id, "activity_type": activity_type,
+         "entry_date": entry_date, "hours": hours, "entries": entries}
+        for (user_id, project_id, activity_type, entry_date), (hours, entries) in deltas.items()
+        if hours or entries
+    ]
+    if not rows:
+        return
+    upsert = upsert_insert(db, TimeEntryRollup)
+    stmt = upsert.on_conflict_do_update(
+        index_elements=[TimeEntryRollup.user_id, TimeEntryRollup.project_id,
+                        TimeEntryRollup.activity_type, TimeEntryRollup.entry_date],
+        set_={
+            "hours": TimeEntryRollup.hours + upsert.excluded.hours,
+            "entries": TimeEntryRollup.entries + upsert.excluded.entries,
+        },
+    )
+    db.execute(stmt, rows)
+    emptied = [tuple(row[key] for key in ROLLUP_KEY) for row in rows if row["entries"] < 0]
+    if emptied:
+        key = tuple_(*(getattr(TimeEntryRollup, column) for column in ROLLUP_KEY))
+        db.execute(delete(TimeEntryRollup).where(key.in_(emptied), TimeEntryRollup.entries <= 0))
+
+
+def rebuild_rollups(db: Session):
+    """Recalcula la tabla de agregados completa a partir de time_entries."""
+    db.execute(delete(TimeEntryRollup))
+    db.execute(
+        insert(TimeEntryRollup).from_select(
+            ["user_id", "project_id", "activity_type", "entry_date", "hours", "entries"],
+            select(
+                TimeEntry.user_id, TimeEntry.project_id, TimeEntry.activity_type, TimeEntry.entry_date,
+                func.coalesce(func.sum(TimeEntry.duration_hours), 0), func.count(),
+            ).group_by(TimeEntry.user_id, TimeEntry.project_id, TimeEntry.activity_type, TimeEntry.entry_date),
+        )
+    )
+    db.commit()
+    return db.scalar(select(func.count()).select_from(TimeEntryRollup))
+
+
+def rollups_out_of_date(db: Session) -> bool:
+    """Si los agregados no cuadran con time_entries (base anterior a la tabla, filas vacías...)."""
+    entries = db.scalar(select(func.count()).select_from(TimeEntry))
+    rolled_up, empty = db.execute(select(
+        func.coalesce(func.sum(TimeEntryRollup.entries), 0), func.count().filter(TimeEntryRollup.entries <= 0),
+    )).one()
+    return entries != rolled_up or empty > 0
+
+
+def _period_start(dialect: str, period: str):
+    column = TimeEntryRollup.entry_date
+    if period == "day":
+        return column
+    if dialect == "sqlite":
+        # Semanas de lunes a domingo, igual que date_trunc('week') en PostgreSQL
+        modifiers = ("weekday 0", "-6 days") if period == "week" else ("start of month",)
+        return func.date(column, *modifiers)
+    return cast(func.date_trunc(period, column), Date)
+
+
+def get_hours_report(db: Session, group_by: list[str], period: str = "week",
+                     date_from: Optional[date] = None, date_to: Optional[date] = None,
+                     user_id: Optional[int] = None, project_id: Optional[int] = None):
+    period_start = _period_start(db.get_bind().dialect.name, period).label("period_start")
+    groups = [REPORT_GROUPS[name].label(f"{name}_id" if name != "activity_type" else name) for name in group_by]
+    stmt = select(
+        period_start, *groups,
+        func.sum(TimeEntryRollup.hours).label("hours"),
+        func.sum(TimeEntryRollup.entries).label("entries"),
+    )
+    if date_from is not None:
+        stmt = stmt.where(TimeEntryRollup.entry_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(TimeEntryRollup.entry_date <= date_to)
+    if user_id is not None:
+        stmt = stmt.where(TimeEntryRollup.user_id == user_id)
+    if project_id is not None:
+        stmt = stmt.where(TimeEntryRollup.project_id == project_id)
+    stmt = stmt.group_by(period_start, *groups).having(func.sum(TimeEntryRollup.entries) > 0)
+    return db.execute(stmt.order_by(period_start, *groups)).mappings().all()
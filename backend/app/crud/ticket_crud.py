@@ -1,32 +1,135 @@
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import Float, cast, column, delete, func, insert, literal_column, select, table, type_coerce, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import Session
 from app.models.ticket_models import Ticket
-from app.schemas.ticket_schema import TicketCreate, TicketUpdate
+from app.schemas.ticket_schema import TicketCreate, TicketUpdate, TicketFilter
+from app.core.config import SEARCH_TEXT_CONFIG
+from app.core.etag import version_clause
+from app.core.expand import expand_options
+from app.core.fields import field_options
+from app.core.pagination import Keyset, keyset_for, paginate
+
+TICKET_SORTS = {
+    "ticket_id": Keyset(Ticket.ticket_id),
+    "ticket_number": Keyset(Ticket.ticket_number, Ticket.ticket_id),
+}
 
 def create_ticket(db: Session, ticket: TicketCreate):
-    db_ticket = Ticket(**ticket.dict())
-    db.add(db_ticket)
+    db_ticket = db.scalars(insert(Ticket).returning(Ticket), [ticket.dict()]).one()
     db.commit()
-    db.refresh(db_ticket)
     return db_ticket
 
-def get_tickets(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Ticket).offset(skip).limit(limit).all()
+TICKET_EXPANDS = ("project", "client", "assigned_to_user", "reported_by_user")
+
+# Orden de /tickets/search: relevancia descendente y ticket_id como desempate
+TICKET_SEARCH_SORTS = {"rank": Keyset(column("rank", Float), Ticket.ticket_id, descending=True)}
+SEARCH_HIGHLIGHT = ("<mark>", "</mark>")
+
+def ticket_filters(filters: Optional[TicketFilter]):
+    # Cada filtro tiene su índice en Ticket.__table_args__
+    if filters is None:
+        return []
+    clauses = []
+    for column in ("assigned_to_user_id", "reported_by_user_id", "project_id", "client_id"):
+        value = getattr(filters, column)
+        if value is not None:
+            clauses.append(getattr(Ticket, column) == value)
+    if filters.status is not None:
+        clauses.append(Ticket.status.in_(filters.status))
+    if filters.priority is not None:
+        clauses.append(Ticket.priority.in_(filters.priority))
+    if filters.due_from is not None:
+        clauses.append(Ticket.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        clauses.append(Ticket.due_date <= filters.due_to)
+    if filters.open is not None:
+        # Mismo predicado que el índice parcial ix_tickets_open_assignee_due
+        clauses.append(Ticket.closed_at.is_(None) if filters.open else Ticket.closed_at.is_not(None))
+    return clauses
+
+def get_tickets(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "ticket_id",
+                filters: Optional[TicketFilter] = None, expand=(), fields=None):
+    options = [*expand_options(Ticket, expand), *field_options(Ticket, fields, *keyset_for(TICKET_SORTS, sort).columns)]
+    query = db.query(Ticket).options(*options).filter(*ticket_filters(filters))
+    return paginate(query, TICKET_SORTS, sort, skip, limit, cursor).all()
+
+def export_tickets_query(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         user_id: Optional[int] = None, project_id: Optional[int] = None):
+    # El rango de fechas se aplica sobre created_at; user_id es el usuario asignado
+    stmt = select(*Ticket.__table__.columns)
+    if date_from is not None:
+        stmt = stmt.where(Ticket.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(Ticket.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    if user_id is not None:
+        stmt = stmt.where(Ticket.assigned_to_user_id == user_id)
+    if project_id is not None:
+        stmt = stmt.where(Ticket.project_id == project_id)
+    return stmt.order_by(Ticket.ticket_id)
+
+def get_ticket_versions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "ticket_id",
+                        filters: Optional[TicketFilter] = None):
+    # (pk, updated_at) de la página, para la ETag sin cargar las filas
+    query = db.query(Ticket.ticket_id, Ticket.updated_at).filter(*ticket_filters(filters))
+    return paginate(query, TICKET_SORTS, sort, skip, limit, cursor).all()
+
+def get_ticket_version(db: Session, ticket_id: int):
+    return db.execute(select(Ticket.updated_at).where(Ticket.ticket_id == ticket_id)).first()
 
-def get_ticket(db: Session, ticket_id: int):
-    return db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+def get_ticket(db: Session, ticket_id: int, expand=(), fields=None):
+    options = [*expand_options(Ticket, expand), *field_options(Ticket, fields)]
+    return db.query(Ticket).options(*options).filter(Ticket.ticket_id == ticket_id).first()
 
-def update_ticket(db: Session, ticket_id: int, ticket: TicketUpdate):
-    db_ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
-    if db_ticket:
-        for key, value in ticket.dict().items():
-            setattr(db_ticket, key, value)
-        db.commit()
-        db.refresh(db_ticket)
+def update_ticket(db: Session, ticket_id: int, ticket: TicketUpdate, versions=None):
+    condition = version_clause(db, Ticket.updated_at, versions) if versions else True
+    stmt = update(Ticket).where(Ticket.ticket_id == ticket_id, condition).values(**ticket.dict()).returning(Ticket)
+    db_ticket = db.scalars(stmt).one_or_none()
+    db.commit()
     return db_ticket
 
-def delete_ticket(db: Session, ticket_id: int):
-    db_ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
-    if db_ticket:
-        db.delete(db_ticket)
-        db.commit()
+def delete_ticket(db: Session, ticket_id: int, versions=None):
+    condition = version_clause(db, Ticket.updated_at, versions) if versions else True
+    db_ticket = db.scalars(delete(Ticket).where(Ticket.ticket_id == ticket_id, condition).returning(Ticket)).one_or_none()
+    db.commit()
     return db_ticket
+
+def _search_terms(q: str):
+    return re.findall(r"\w+", q)
+
+def _tsquery(q: str):
+    return func.websearch_to_tsquery(cast(SEARCH_TEXT_CONFIG, REGCONFIG), q)
+
+def search_tickets(db: Session, q: str, limit: int = 20, cursor: Optional[str] = None):
+    """Tickets que contienen las palabras de q, por relevancia y con un fragmento resaltado."""
+    if not _search_terms(q):
+        return []
+    columns = Ticket.__table__.columns
+    if db.get_bind().dialect.name == "sqlite":
+        fts = table("tickets_fts", column("rowid"))
+        # Cada palabra entre comillas: la sintaxis de consulta de FTS5 no se expone al usuario
+        matches = literal_column("tickets_fts").match(" ".join(f'"{term}"' for term in _search_terms(q)))
+        rank = type_coerce(-func.bm25(literal_column("tickets_fts"), 10.0, 5.0, 1.0), Float).label("rank")
+        snippet = func.snippet(literal_column("tickets_fts"), -1, *SEARCH_HIGHLIGHT, "…", 16).label("snippet")
+        keyset = Keyset(rank, Ticket.ticket_id, descending=True)
+        stmt = select(*columns, rank, snippet).join(fts, fts.c.rowid == Ticket.ticket_id).where(matches)
+        return db.execute(keyset.apply(stmt, cursor).limit(limit)).all()
+
+    query = _tsquery(q)
+    vector = literal_column("tickets.search_vector")
+    # real -> double precision para que el valor del cursor se compare exacto al volver
+    rank = cast(func.ts_rank_cd(vector, query), Float(53)).label("rank")
+    keyset = Keyset(rank, Ticket.ticket_id, descending=True)
+    page = keyset.apply(select(Ticket.ticket_id, rank).where(vector.op("@@")(query)), cursor).limit(limit).subquery()
+    # ts_headline es caro: solo se calcula para las filas de la página
+    document = func.concat_ws(" … ", Ticket.title, Ticket.description, Ticket.resolution_description)
+    options = f"StartSel={SEARCH_HIGHLIGHT[0]}, StopSel={SEARCH_HIGHLIGHT[1]}, MaxFragments=2, MaxWords=20, MinWords=5"
+    snippet = func.ts_headline(cast(SEARCH_TEXT_CONFIG, REGCONFIG), document, query, options).label("snippet")
+    stmt = (
+        select(*columns, page.c.rank, snippet)
+        .join(page, page.c.ticket_id == Ticket.ticket_id)
+        .order_by(page.c.rank.desc(), page.c.ticket_id.desc())
+    )
+    return db.execute(stmt).all()
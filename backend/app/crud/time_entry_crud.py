@@ -1,34 +1,200 @@
+import csv
+import io
+import logging
+from typing import Optional
+from datetime import date
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 from app.models.time_entry_models import TimeEntry
-from app.schemas.time_entry_schema import TimeEntryCreate, TimeEntryUpdate
+from app.schemas.time_entry_schema import TimeEntryCreate, TimeEntryUpdate, TimeEntryFilter
+from app.core.etag import version_clause
+from app.core.integrity import integrity_error, sqlstate
+from app.core.intervals import find_overlaps
+from app.core.fields import field_options
+from app.core.pagination import Keyset, keyset_for, paginate
+from app.crud.report_crud import add_rollup_delta, apply_rollup_deltas, new_rollup_deltas
+
+logger = logging.getLogger(__name__)
+
+TIME_ENTRY_SORTS = {
+    "entry_id": Keyset(TimeEntry.entry_id),
+    "entry_date": Keyset(TimeEntry.entry_date, TimeEntry.entry_id),
+}
 
 def create_time_entry(db: Session, entry: TimeEntryCreate):
-    db_entry = TimeEntry(**entry.dict())
-    db.add(db_entry)
+    db_entry = db.scalars(insert(TimeEntry).returning(TimeEntry), [entry.dict()]).one()
+    apply_rollup_deltas(db, add_rollup_delta(new_rollup_deltas(), db_entry))
     db.commit()
-    db.refresh(db_entry)
     return db_entry
 
-def get_time_entries(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(TimeEntry).offset(skip).limit(limit).all()
+def time_entry_filters(filters: Optional[TimeEntryFilter]):
+    # Cada filtro tiene su índice en TimeEntry.__table_args__
+    if filters is None:
+        return []
+    clauses = []
+    if filters.user_id is not None:
+        clauses.append(TimeEntry.user_id == filters.user_id)
+    if filters.project_id is not None:
+        clauses.append(TimeEntry.project_id == filters.project_id)
+    if filters.date_from is not None:
+        clauses.append(TimeEntry.entry_date >= filters.date_from)
+    if filters.date_to is not None:
+        clauses.append(TimeEntry.entry_date <= filters.date_to)
+    if filters.status is not None:
+        clauses.append(TimeEntry.status.in_(filters.status))
+    return clauses
 
-def get_time_entry(db: Session, entry_id: int):
-    return db.query(TimeEntry).filter(TimeEntry.entry_id == entry_id).first()
+def get_time_entries(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "entry_id",
+                     filters: Optional[TimeEntryFilter] = None, fields=None):
+    options = field_options(TimeEntry, fields, *keyset_for(TIME_ENTRY_SORTS, sort).columns)
+    query = db.query(TimeEntry).options(*options).filter(*time_entry_filters(filters))
+    return paginate(query, TIME_ENTRY_SORTS, sort, skip, limit, cursor).all()
 
-def update_time_entry(db: Session, entry_id: int, entry_data: TimeEntryUpdate):
-    db_entry = db.query(TimeEntry).filter(TimeEntry.entry_id == entry_id).first()
-    if not db_entry:
+def export_time_entries_query(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                              user_id: Optional[int] = None, project_id: Optional[int] = None):
+    filters = TimeEntryFilter(date_from=date_from, date_to=date_to, user_id=user_id, project_id=project_id)
+    stmt = select(*TimeEntry.__table__.columns).where(*time_entry_filters(filters))
+    return stmt.order_by(TimeEntry.entry_date, TimeEntry.entry_id)
+
+def get_time_entry_versions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "entry_id",
+                            filters: Optional[TimeEntryFilter] = None):
+    # (pk, updated_at) de la página, para la ETag sin cargar las filas
+    query = db.query(TimeEntry.entry_id, TimeEntry.updated_at).filter(*time_entry_filters(filters))
+    return paginate(query, TIME_ENTRY_SORTS, sort, skip, limit, cursor).all()
+
+def get_time_entry_version(db: Session, entry_id: int):
+    return db.execute(select(TimeEntry.updated_at).where(TimeEntry.entry_id == entry_id)).first()
+
+def get_time_entry(db: Session, entry_id: int, fields=None):
+    return db.query(TimeEntry).options(*field_options(TimeEntry, fields)).filter(TimeEntry.entry_id == entry_id).first()
+
+def update_time_entry(db: Session, entry_id: int, entry_data: TimeEntryUpdate, versions=None):
+    # Los valores previos hacen falta para restar el delta de los agregados; se
+    # bloquea la fila para que una actualización concurrente no los deje obsoletos.
+    # La condición de If-Match va en ese mismo SELECT, sin bloqueos adicionales.
+    condition = version_clause(db, TimeEntry.updated_at, versions) if versions else True
+    previous = db.execute(
+        select(TimeEntry.user_id, TimeEntry.project_id, TimeEntry.activity_type,
+               TimeEntry.entry_date, TimeEntry.start_time, TimeEntry.end_time)
+        .where(TimeEntry.entry_id == entry_id, condition)
+        .with_for_update()
+    ).first()
+    if not previous:
         return None
-    for key, value in entry_data.dict().items():
-        setattr(db_entry, key, value)
+    stmt = update(TimeEntry).where(TimeEntry.entry_id == entry_id).values(**entry_data.dict()).returning(TimeEntry)
+    db_entry = db.scalars(stmt).one()
+    deltas = add_rollup_delta(new_rollup_deltas(), previous, -1)
+    apply_rollup_deltas(db, add_rollup_delta(deltas, db_entry))
     db.commit()
-    db.refresh(db_entry)
     return db_entry
 
-def delete_time_entry(db: Session, entry_id: int):
-    db_entry = db.query(TimeEntry).filter(TimeEntry.entry_id == entry_id).first()
+def delete_time_entry(db: Session, entry_id: int, versions=None):
+    condition = version_clause(db, TimeEntry.updated_at, versions) if versions else True
+    db_entry = db.scalars(delete(TimeEntry).where(TimeEntry.entry_id == entry_id, condition).returning(TimeEntry)).one_or_none()
     if not db_entry:
         return None
-    db.delete(db_entry)
+    apply_rollup_deltas(db, add_rollup_delta(new_rollup_deltas(), db_entry, -1))
     db.commit()
     return db_entry
+
+def bulk_create_time_entries(db: Session, entries: list[TimeEntryCreate]):
+    """Inserta un lote con un único INSERT multi-fila ... RETURNING.
+
+    Devuelve (ids insertados, {posición en el lote: error}). Si el lote falla en
+    la base de datos se reintenta fila a fila en SAVEPOINTs para aislar las
+    filas inválidas sin descartar el resto.
+    """
+    rows = [entry.dict() for entry in entries]
+    if not rows:
+        return [], {}
+    stmt = insert(TimeEntry).returning(TimeEntry.entry_id, sort_by_parameter_order=True)
+    try:
+        ids = db.scalars(stmt, rows).all()
+        deltas = new_rollup_deltas()
+        for entry in entries:
+            add_rollup_delta(deltas, entry)
+        apply_rollup_deltas(db, deltas)
+        db.commit()
+        return ids, {}
+    except DBAPIError:
+        db.rollback()
+
+    ids, errors = [], {}
+    deltas = new_rollup_deltas()
+    for position, row in enumerate(rows):
+        try:
+            with db.begin_nested():
+                ids.append(db.scalars(stmt, [row]).one())
+            add_rollup_delta(deltas, entries[position])
+        except DBAPIError as exc:
+            # Mismo mensaje genérico que la respuesta de un IntegrityError; el del driver, al log
+            logger.info("Bulk row %s rejected (%s): %s", position, sqlstate(exc.orig), exc.orig)
+            errors[position] = integrity_error(exc.orig)[1]
+    apply_rollup_deltas(db, deltas)
+    db.commit()
+    return ids, errors
+
+
+def find_time_entry_overlaps(db: Session, entries: list[TimeEntryCreate], indexes: Optional[list[int]] = None):
+    """Solapes de un lote, entre sus filas y con lo ya guardado, con una sola consulta.
+
+    Devuelve {posición en el lote: error}; de dos filas del lote que se solapan
+    se rechaza la que empieza después. indexes traduce posiciones a los índices
+    que ve el cliente (las filas inválidas ya descartadas).
+    """
+    if not entries:
+        return {}
+    groups = {(entry.user_id, entry.entry_date) for entry in entries}
+    dates = [entry_date for _, entry_date in groups]
+    # Usa ix_time_entries_user_date; el rango de fechas puede traer días de más, se filtran aquí
+    rows = db.execute(
+        select(TimeEntry.user_id, TimeEntry.entry_date, TimeEntry.start_time, TimeEntry.end_time, TimeEntry.entry_id)
+        .where(TimeEntry.user_id.in_({user_id for user_id, _ in groups}),
+               TimeEntry.entry_date.between(min(dates), max(dates)))
+    ).all()
+    existing = [((row.user_id, row.entry_date), row.start_time, row.end_time, row.entry_id)
+                for row in rows if (row.user_id, row.entry_date) in groups]
+    new = [((entry.user_id, entry.entry_date), entry.start_time, entry.end_time) for entry in entries]
+    errors = {}
+    for position, (kind, other) in find_overlaps(new, existing).items():
+        if kind == "existing":
+            errors[position] = f"overlaps existing time entry {other}"
+        else:
+            errors[position] = f"overlaps entry at index {indexes[other] if indexes else other}"
+    return errors
+
+
+def copy_time_entries(db: Session, entries: list[TimeEntryCreate]):
+    """Carga un lote con COPY FROM STDIN (solo PostgreSQL + psycopg2); no devuelve ids.
+
+    Devuelve el número de filas cargadas, o None si el lote fue rechazado o el
+    driver no soporta COPY.
+    """
+    columns = list(TimeEntryCreate.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for entry in entries:
+        writer.writerow(["" if value is None else value for value in entry.dict().values()])
+    buffer.seek(0)
+    connection = db.connection()
+    if connection.dialect.driver != "psycopg2":
+        return None
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {TimeEntry.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    except connection.dialect.dbapi.Error:
+        # COPY es todo o nada: el llamador reintenta el lote con INSERT para aislar errores
+        db.rollback()
+        return None
+    finally:
+        cursor.close()
+    deltas = new_rollup_deltas()
+    for entry in entries:
+        add_rollup_delta(deltas, entry)
+    apply_rollup_deltas(db, deltas)
+    db.commit()
+    return len(entries)
@@ -1,54 +1,101 @@
+from typing import Optional
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from app.models.user_models import User
 from app.schemas.user_schema import UserCreate, UserUpdate
-from passlib.context import CryptContext
+from app.core.cache import EntityCache
+from app.core.config import REFERENCE_CACHE_MAXSIZE, REFERENCE_CACHE_TTL
+from app.core.database import is_replica
+from app.core.etag import version_clause
+from app.core.fields import field_options
+from app.core.pagination import Keyset, keyset_for, paginate
+from app.core.security import pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+USER_SORTS = {
+    "user_id": Keyset(User.user_id),
+    "username": Keyset(User.username, User.user_id),
+}
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.user_id == user_id).first()
+# Sin password_hash: las credenciales se leen siempre de la base de datos (get_user_credentials)
+user_cache = EntityCache(User, maxsize=REFERENCE_CACHE_MAXSIZE, ttl=REFERENCE_CACHE_TTL, aliases=("username", "email"),
+                         exclude=("password_hash",))
+
+def get_user_versions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "user_id"):
+    # (pk, updated_at) de la página, para la ETag sin cargar las filas
+    query = db.query(User.user_id, User.updated_at)
+    return paginate(query, USER_SORTS, sort, skip, limit, cursor).all()
+
+def get_user_version(db: Session, user_id: int):
+    return db.execute(select(User.updated_at).where(User.user_id == user_id)).first()
+
+def get_user(db: Session, user_id: int, fields=None):
+    query = db.query(User).options(*field_options(User, fields)).filter(User.user_id == user_id)
+    if fields or is_replica(db):
+        return query.first()
+    return user_cache.get(user_id, query.first)
 
 def get_user_by_username(db: Session, username: str):
+    query = db.query(User).filter(User.username == username)
+    if is_replica(db):
+        return query.first()
+    return user_cache.get_by("username", username, query.first)
+
+def get_user_credentials(db: Session, username: str):
+    # Login: sin caché, otro worker puede haber cambiado la contraseña o desactivado al usuario
     return db.query(User).filter(User.username == username).first()
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+    query = db.query(User).filter(User.email == email)
+    if is_replica(db):
+        return query.first()
+    return user_cache.get_by("email", email, query.first)
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "user_id", fields=None):
+    query = db.query(User).options(*field_options(User, fields, *keyset_for(USER_SORTS, sort).columns))
+    return paginate(query, USER_SORTS, sort, skip, limit, cursor).all()
 
-def create_user(db: Session, user: UserCreate):
-    password_hash = pwd_context.hash(user.password_hash)
-    db_user = User(
+# Los routers calculan el hash con app.core.security (pool de procesos) y lo pasan
+# ya hecho; si no se pasa, se calcula aquí en línea.
+def create_user(db: Session, user: UserCreate, password_hash: Optional[str] = None):
+    password_hash = password_hash or pwd_context.hash(user.password_hash)
+    values = dict(
         username=user.username,
         full_name=user.full_name,
         email=user.email,
         role=user.role,
         password_hash=password_hash
     )
-    db.add(db_user)
+    # Unicidad de username/email: la garantiza la base de datos (IntegrityError)
+    db_user = db.scalars(insert(User).returning(User), [values]).one()
     db.commit()
-    db.refresh(db_user)
+    user_cache.put(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, updates: UserUpdate):
-    db_user = get_user(db, user_id)
-    if not db_user:
-        return None
-    for key, value in updates.dict(exclude_unset=True).items():
-        if key == "password":
-            value = pwd_context.hash(value)
-            setattr(db_user, "password_hash", value)
-        else:
-            setattr(db_user, key, value)
+def update_user(db: Session, user_id: int, updates: UserUpdate, password_hash: Optional[str] = None, versions=None):
+    values = updates.dict(exclude_unset=True)
+    if "password_hash" in values:
+        # El campo trae la contraseña en claro, nunca se guarda tal cual
+        plain = values.pop("password_hash")
+        if plain is not None:
+            values["password_hash"] = password_hash or pwd_context.hash(plain)
+    condition = version_clause(db, User.updated_at, versions) if versions else True
+    if not values:
+        return db.query(User).filter(User.user_id == user_id, condition).first()
+    db_user = db.scalars(update(User).where(User.user_id == user_id, condition).values(**values).returning(User)).one_or_none()
     db.commit()
-    db.refresh(db_user)
+    if db_user:
+        user_cache.put(db_user)
     return db_user
 
-def delete_user(db: Session, user_id: int):
-    db_user = get_user(db, user_id)
-    if not db_user:
-        return None
-    db.delete(db_user)
+def set_password_hash(db: Session, user_id: int, password_hash: str):
+    db.execute(update(User).where(User.user_id == user_id).values(password_hash=password_hash))
+    db.commit()
+    user_cache.invalidate(user_id)
+
+def delete_user(db: Session, user_id: int, versions=None):
+    condition = version_clause(db, User.updated_at, versions) if versions else True
+    db_user = db.scalars(delete(User).where(User.user_id == user_id, condition).returning(User)).one_or_none()
     db.commit()
+    if db_user:
+        user_cache.invalidate(user_id)
     return db_user
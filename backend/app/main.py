@@ -1,13 +1,61 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import close_default_broker
+from app.core.compression import CompressionMiddleware
+from app.core.config import (
+    BROTLI_QUALITY, COMPRESSION_MINIMUM_SIZE, DATABASE, GZIP_LEVEL, JIRA_SYNC_INTERVAL, QUERY_BUDGET_MODE, SERVER_TIMING,
+)
+from app.core.database import Base, engine, replica_monitor
+from app.core.etag import ETagMiddleware
+from app.core.integrity import integrity_error, sqlstate
+from app.core.jira_sync import run_periodically
+from app.core.metrics import MetricsMiddleware, instrument_routes
+from app.core.query_diagnostics import QueryBudgetMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.readiness import readiness
+from app.core.replica import ReadYourWritesMiddleware
+from app.core.serialization import FastJSONResponse, fast_serialization
+from app.core import security
+from app.routers import project_router, client_router, user_router, ticket_router, time_entry_router, jira_router, report_router, payment_router, cache_router, health_router, metrics_router # Agrega otros routers aquí
+
+# El esquema se crea con `python -m scripts.bootstrap_db`, no al importar: cada
+# worker arranca sin abrir conexiones ni esperar a la base de datos
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Comprobación de la base de datos en segundo plano; /health/ready la expone
+    ready_task = asyncio.create_task(readiness.wait(engine, Base.metadata))
+    # Sincronización periódica con Jira, si está habilitada
+    sync_task = asyncio.create_task(run_periodically(JIRA_SYNC_INTERVAL)) if JIRA_SYNC_INTERVAL > 0 else None
+    yield
+    ready_task.cancel()
+    if sync_task:
+        sync_task.cancel()
+    security.shutdown()
+    close_default_broker()
+
+app = FastAPI(
+    title="Sistema de Gestión de Proyectos",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if fast_serialization else JSONResponse,
+)
 
-from app.core.database import Base, engine
-from app.routers import project_router, client_router, user_router, ticket_router, time_entry_router, jira_router # Agrega otros routers aquí
+logger = logging.getLogger(__name__)
 
-# Crear todas las tablas en la base de datos
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Sistema de Gestión de Proyectos")
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    # Respuesta genérica según el SQLSTATE (app.core.integrity); el texto del driver solo va al log
+    logger.info("Integrity error %s on %s %s: %s", sqlstate(exc.orig), request.method, request.url.path, exc.orig)
+    status_code, detail = integrity_error(exc.orig)
+    return JSONResponse(status_code=status_code, content={"detail": detail})
 
 # Configurar los orígenes permitidos (CORS)
 origins = [
@@ -21,12 +69,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
 
+# ETag por hash del cuerpo para los GET sin ETag propia (los de recursos con
+# updated_at la calculan antes de cargar filas)
+app.add_middleware(ETagMiddleware)
+
+# Con réplica de lectura, quien acaba de escribir lee del primario durante unos segundos
+if replica_monitor is not None:
+    app.add_middleware(ReadYourWritesMiddleware, window=DATABASE.read_your_writes_seconds)
+
+# La compresión va por fuera de ETagMiddleware: la ETag se calcula sobre el cuerpo sin
+# comprimir y CompressionMiddleware le añade la codificación ("x-gzip", "x-br")
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, compresslevel=GZIP_LEVEL,
+                   brotli_quality=BROTLI_QUALITY)
+
+# Presupuesto de sentencias por ruta y N+1 (core/query_diagnostics.py); dentro de MetricsMiddleware
+if QUERY_BUDGET_MODE != "off":
+    app.add_middleware(QueryBudgetMiddleware, mode=QUERY_BUDGET_MODE)
+
+# Métricas por ruta y Server-Timing, lo más afuera posible: latencia y bytes como los ve el cliente
+app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING, timing_allow_origin=", ".join(origins))
+
 # Registrar routers
 app.include_router(project_router.router)
 app.include_router(client_router.router)
 app.include_router(user_router.router)
 app.include_router(ticket_router.router)
 app.include_router(time_entry_router.router)
-app.include_router(jira_router.router)
\ No newline at end of file
+app.include_router(jira_router.router)
+app.include_router(report_router.router)
+app.include_router(payment_router.router)
+app.include_router(cache_router.router)
+app.include_router(health_router.router)
+app.include_router(metrics_router.router)
+
+# Marca el final de cada handler para separar en Server-Timing la serialización del resto
+instrument_routes(app)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from app.core.database import Base
+
+class JiraSyncState(Base):
+    """Marca de agua de la sincronización incremental de cada proyecto de Jira."""
+    __tablename__ = "jira_sync_state"
+
+    project_key = Column(String(20), primary_key=True)
+    last_updated = Column(TIMESTAMP)  # mayor `updated` de Jira ya importado (UTC)
+    last_synced_at = Column(TIMESTAMP)
+    issues_synced = Column(Integer, nullable=False, default=0)
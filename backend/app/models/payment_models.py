@@ -0,0 +1,98 @@
+from sqlalchemy import Column, Integer, String, Text, Date, DECIMAL, TIMESTAMP, ForeignKey, CheckConstraint, Index, func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class RateCard(Base):
+    """Tarifa por hora. Sin proyecto/cliente/actividad aplica a todos; gana la más específica.
+
+    Orden: proyecto+actividad, proyecto, cliente+actividad, cliente, actividad, general.
+    """
+    __tablename__ = "rate_cards"
+
+    rate_card_id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.client_id"))
+    project_id = Column(Integer, ForeignKey("projects.project_id"))
+    activity_type = Column(String(50))
+    hourly_rate = Column(DECIMAL(10, 2), nullable=False)
+    valid_from = Column(Date)
+    valid_to = Column(Date)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("hourly_rate >= 0"),
+        CheckConstraint("valid_to IS NULL OR valid_from IS NULL OR valid_to >= valid_from"),
+        Index("ix_rate_cards_project", "project_id"),
+        Index("ix_rate_cards_client", "client_id"),
+    )
+
+
+class Invoice(Base):
+    __tablename__ = "invoices"
+
+    invoice_id = Column(Integer, primary_key=True, index=True)
+    invoice_number = Column(String(40), unique=True, nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.client_id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    status = Column(String(20), nullable=False, default="draft")
+    currency = Column(String(3), nullable=False)
+    hours = Column(DECIMAL(14, 2), nullable=False, default=0)
+    total = Column(DECIMAL(14, 2), nullable=False, default=0)
+    amount_paid = Column(DECIMAL(14, 2), nullable=False, default=0)
+    issued_at = Column(TIMESTAMP)
+    due_date = Column(Date)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    # La facturación no solapa periodos de un cliente (ver payment_crud.run_billing)
+    __table_args__ = (
+        Index("ix_invoices_client_period", "client_id", "period_start", "period_end"),
+        CheckConstraint("status IN ('draft', 'issued', 'paid', 'void')"),
+        Index("ix_invoices_period", "period_start", "invoice_id"),
+        Index("ix_invoices_status", "status", "invoice_id"),
+    )
+
+    lines = relationship("InvoiceLine", back_populates="invoice", cascade="all, delete-orphan",
+                         order_by="InvoiceLine.line_id")
+    payments = relationship("Payment", back_populates="invoice", order_by="Payment.payment_id")
+
+
+class InvoiceLine(Base):
+    """Horas facturadas de un proyecto y actividad a una tarifa."""
+    __tablename__ = "invoice_lines"
+
+    line_id = Column(Integer, primary_key=True, index=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.invoice_id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    activity_type = Column(String(50), nullable=False)
+    entries = Column(Integer, nullable=False)
+    hours = Column(DECIMAL(12, 2), nullable=False)
+    hourly_rate = Column(DECIMAL(10, 2), nullable=False)
+    amount = Column(DECIMAL(14, 2), nullable=False)
+
+    __table_args__ = (
+        Index("ix_invoice_lines_invoice", "invoice_id", "line_id"),
+    )
+
+    invoice = relationship("Invoice", back_populates="lines")
+
+
+class Payment(Base):
+    __tablename__ = "payments"
+
+    payment_id = Column(Integer, primary_key=True, index=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.invoice_id"), nullable=False)
+    amount = Column(DECIMAL(14, 2), nullable=False)
+    paid_on = Column(Date, nullable=False)
+    method = Column(String(30), nullable=False)
+    reference = Column(String(100))
+    notes = Column(Text)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("amount > 0"),
+        Index("ix_payments_invoice", "invoice_id", "payment_id"),
+    )
+
+    invoice = relationship("Invoice", back_populates="payments")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, ForeignKey, Index
+from app.core.database import Base
+
+class TimeEntryRollup(Base):
+    """Horas agregadas por usuario/proyecto/actividad/día, mantenidas por deltas desde time_entry_crud."""
+    __tablename__ = "time_entry_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.project_id"), primary_key=True)
+    activity_type = Column(String(50), primary_key=True)
+    entry_date = Column(Date, primary_key=True)
+    hours = Column(DECIMAL(12, 2), nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_time_entry_rollups_entry_date", "entry_date"),
+    )
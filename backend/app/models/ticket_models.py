@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Date, TIMESTAMP, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Date, TIMESTAMP, Enum, Index, event, text
 from sqlalchemy.orm import relationship
+from app.core.config import SEARCH_TEXT_CONFIG
 from app.core.database import Base
 from sqlalchemy.sql import func
 
@@ -23,9 +24,67 @@ class Ticket(Base):
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     resolved_at = Column(TIMESTAMP)
     closed_at = Column(TIMESTAMP)
+
+    # Índices de los filtros de GET /tickets/; ticket_id al final sirve el orden por defecto
+    __table_args__ = (
+        Index("ix_tickets_assignee_status", "assigned_to_user_id", "status", "ticket_id"),
+        Index("ix_tickets_reporter", "reported_by_user_id", "ticket_id"),
+        Index("ix_tickets_project_status", "project_id", "status", "ticket_id"),
+        Index("ix_tickets_client", "client_id", "ticket_id"),
+        Index("ix_tickets_due_date", "due_date"),
+        # Parcial: solo tickets abiertos ("mis tickets pendientes por vencimiento")
+        Index("ix_tickets_open_assignee_due", "assigned_to_user_id", "due_date",
+              postgresql_where=text("closed_at IS NULL"), sqlite_where=text("closed_at IS NULL")),
+    )
     
     # Relaciones
     project = relationship("Project", back_populates="tickets")
     client = relationship("Client", back_populates="tickets")
     reported_by_user = relationship("User", foreign_keys=[reported_by_user_id], back_populates="tickets_reported")
     assigned_to_user = relationship("User", foreign_keys=[assigned_to_user_id], back_populates="tickets_assigned")
+
+
+# Búsqueda de texto completo (GET /tickets/search). El índice vive fuera del
+# modelo para que los SELECT de Ticket no arrastren el tsvector:
+# - PostgreSQL: columna generada search_vector (título > descripción > resolución) con índice GIN
+# - SQLite: tabla FTS5 de contenido externo sincronizada por triggers
+# Las sentencias son idempotentes; scripts.create_indexes las aplica a bases ya existentes.
+TICKET_SEARCH_DDL = {
+    "postgresql": [
+        f"""ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(resolution_description, '')), 'C')
+        ) STORED""",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_search ON tickets USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+            title, description, resolution_description, content='tickets', content_rowid='ticket_id')""",
+        """CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts(rowid, title, description, resolution_description)
+            VALUES (new.ticket_id, new.title, new.description, new.resolution_description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, title, description, resolution_description)
+            VALUES ('delete', old.ticket_id, old.title, old.description, old.resolution_description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, title, description, resolution_description)
+            VALUES ('delete', old.ticket_id, old.title, old.description, old.resolution_description);
+            INSERT INTO tickets_fts(rowid, title, description, resolution_description)
+            VALUES (new.ticket_id, new.title, new.description, new.resolution_description);
+        END""",
+        "INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+def create_ticket_search(connection):
+    for statement in TICKET_SEARCH_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Ticket.__table__, "after_create")
+def _create_ticket_search(target, connection, **kw):
+    create_ticket_search(connection)
@@ -1,6 +1,30 @@
-from sqlalchemy import Column, Integer, Date, Time, Text, String, TIMESTAMP, ForeignKey, Computed, DECIMAL
+from sqlalchemy import CheckConstraint, Column, Integer, Date, Time, Text, String, TIMESTAMP, ForeignKey, Computed, DECIMAL, Index, event, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
 from app.core.database import Base
 
+
+class hours_between(ColumnElement):
+    """Horas entre dos columnas TIME, en el SQL de cada dialecto (columna generada)."""
+    inherit_cache = True
+    type = DECIMAL(5, 2)
+
+    def __init__(self, start: str, end: str):
+        self.start = start
+        self.end = end
+
+
+@compiles(hours_between)
+def _hours_between(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM ({element.end} - {element.start})) / 3600"
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    # SQLite guarda TIME como texto 'HH:MM:SS.ffffff'; julianday() lo entiende
+    return f"ROUND((julianday({element.end}) - julianday({element.start})) * 24, 2)"
+
+
 class TimeEntry(Base):
     __tablename__ = "time_entries"
 
@@ -11,8 +35,81 @@ class TimeEntry(Base):
     activity_type = Column(String(50), nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
-    duration_hours = Column(DECIMAL(5, 2), Computed("EXTRACT(EPOCH FROM (end_time - start_time)) / 3600", persisted=True))
+    duration_hours = Column(DECIMAL(5, 2), Computed(hours_between("start_time", "end_time"), persisted=True))
     description = Column(Text)
     status = Column(String(20), nullable=False)
-    created_at = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
-    updated_at = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    # Índices de los filtros de GET /time-entries/ y de los rangos de fechas de exportación
+    __table_args__ = (
+        Index("ix_time_entries_user_date", "user_id", "entry_date", "entry_id"),
+        Index("ix_time_entries_project_date", "project_id", "entry_date", "entry_id"),
+        Index("ix_time_entries_date", "entry_date", "entry_id"),
+        Index("ix_time_entries_status_date", "status", "entry_date"),
+        CheckConstraint("end_time > start_time", name="ck_time_entries_end_after_start"),
+    )
+
+
+# Un usuario no puede tener dos registros que se solapen el mismo día ([start, end),
+# así que uno puede empezar a la hora en que acaba otro):
+# - PostgreSQL: restricción de exclusión GiST sobre el rango de timestamps (btree_gist para user_id)
+# - SQLite: triggers que abortan el INSERT/UPDATE que solaparía
+# La violación llega como IntegrityError (409). Las sentencias son idempotentes;
+# scripts.create_indexes las aplica a bases ya existentes. Los lotes se validan
+# antes en memoria (crud.find_time_entry_overlaps) para informar fila a fila.
+TIME_ENTRY_OVERLAP_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        """DO $$ BEGIN
+            ALTER TABLE time_entries ADD CONSTRAINT ex_time_entries_no_overlap EXCLUDE USING gist (
+                user_id WITH =, tsrange(entry_date + start_time, entry_date + end_time) WITH &&);
+        EXCEPTION WHEN duplicate_object OR duplicate_table THEN NULL;
+        END $$""",
+    ],
+    "sqlite": [
+        """CREATE TRIGGER IF NOT EXISTS time_entries_no_overlap_insert BEFORE INSERT ON time_entries
+        WHEN EXISTS (SELECT 1 FROM time_entries WHERE user_id = new.user_id AND entry_date = new.entry_date
+                     AND start_time < new.end_time AND new.start_time < end_time)
+        BEGIN
+            SELECT RAISE(ABORT, 'time entry overlaps another entry of the same user');
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS time_entries_no_overlap_update BEFORE UPDATE ON time_entries
+        WHEN EXISTS (SELECT 1 FROM time_entries WHERE user_id = new.user_id AND entry_date = new.entry_date
+                     AND start_time < new.end_time AND new.start_time < end_time AND entry_id != new.entry_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'time entry overlaps another entry of the same user');
+        END""",
+    ],
+}
+
+
+def create_time_entry_overlap(connection):
+    for statement in TIME_ENTRY_OVERLAP_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(TimeEntry.__table__, "after_create")
+def _create_time_entry_overlap(target, connection, **kw):
+    create_time_entry_overlap(connection)
+
+
+# ck_time_entries_end_after_start en una tabla ya existente (create_all solo la
+# incluye al crear la tabla). SQLite no admite ADD CONSTRAINT: ahí hay que recrear
+# la tabla, y mientras tanto la validación de TimeEntryWrite rechaza esas escrituras.
+TIME_ENTRY_CHECK_DDL = {
+    "postgresql": [
+        """DO $$ BEGIN
+            ALTER TABLE time_entries ADD CONSTRAINT ck_time_entries_end_after_start CHECK (end_time > start_time);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$""",
+    ],
+}
+
+
+def create_time_entry_check(connection):
+    """Añade la restricción si el dialecto lo permite; devuelve si se ha podido."""
+    statements = TIME_ENTRY_CHECK_DDL.get(connection.dialect.name)
+    for statement in statements or []:
+        connection.exec_driver_sql(statement)
+    return statements is not None
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.crud.client_crud import client_cache
+from app.crud.project_crud import project_cache
+from app.crud.user_crud import user_cache
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+REFERENCE_CACHES = (client_cache, project_cache, user_cache)
+
+@router.get("/stats")
+def get_cache_stats():
+    # Aciertos/fallos de la caché de filas de referencia de este worker
+    return {"caches": [cache.stats() for cache in REFERENCE_CACHES]}
@@ -1,37 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from app.schemas import client_schema
 from app.crud import client_crud
-from app.core.database import get_db
+from app.core.database import Database, get_database, get_read_database
+from app.core.fields import InvalidFields, fields_response, parse_fields
+from app.core.serialization import fast_serialization
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
 @router.post("/", response_model=client_schema.ClientOut)
-def create(client: client_schema.ClientCreate, db: Session = Depends(get_db)):
-    return client_crud.create_client(db, client)
+async def create(client: client_schema.ClientCreate, db: Database = Depends(get_database)):
+    return await db.run(client_crud.create_client, client)
 
-@router.get("/", response_model=list[client_schema.ClientOut])
-def read_all(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return client_crud.get_clients(db, skip, limit)
+@router.get("/", response_model=list[client_schema.ClientOut], dependencies=[Depends(query_budget(1))])
+async def read_all(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "client_id",
+                   fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, client_schema.ClientOut)
+        clients = await db.run(client_crud.get_clients, skip, limit, cursor=cursor, sort=sort, fields=fields)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    set_next_cursor(response, clients, limit, client_crud.CLIENT_SORTS, sort)
+    if fields or fast_serialization:
+        return fields_response(clients, client_schema.ClientOut, fields, response)
+    return clients
 
-@router.get("/{client_id}", response_model=client_schema.ClientOut)
-def read(client_id: int, db: Session = Depends(get_db)):
-    db_client = client_crud.get_client(db, client_id)
+@router.get("/{client_id}", response_model=client_schema.ClientOut, dependencies=[Depends(query_budget(1))])
+async def read(response: Response, client_id: int, fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, client_schema.ClientOut)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    db_client = await db.run(client_crud.get_client, client_id, fields=fields)
     if not db_client:
         raise HTTPException(status_code=404, detail="Client not found")
+    if fields or fast_serialization:
+        return fields_response(db_client, client_schema.ClientOut, fields, response)
     return db_client
 
 @router.put("/{client_id}", response_model=client_schema.ClientOut)
-def update(client_id: int, client: client_schema.ClientUpdate, db: Session = Depends(get_db)):
-    db_client = client_crud.update_client(db, client_id, client)
+async def update(client_id: int, client: client_schema.ClientUpdate, db: Database = Depends(get_database)):
+    db_client = await db.run(client_crud.update_client, client_id, client)
     if not db_client:
         raise HTTPException(status_code=404, detail="Client not found")
     return db_client
 
 @router.delete("/{client_id}", response_model=client_schema.ClientOut)
-def delete(client_id: int, db: Session = Depends(get_db)):
-    db_client = client_crud.delete_client(db, client_id)
+async def delete(client_id: int, db: Database = Depends(get_database)):
+    db_client = await db.run(client_crud.delete_client, client_id)
     if not db_client:
         raise HTTPException(status_code=404, detail="Client not found")
     return db_client
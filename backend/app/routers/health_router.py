@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.database import database_pool_stats, replica_monitor
+from app.core.readiness import readiness
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/live")
+def live():
+    # El proceso responde; no toca la base de datos
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    # 503 hasta que la base de datos responde y tiene el esquema (ver core/readiness.py)
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+@router.get("/pool")
+def get_pool_stats():
+    # Espera por conexión (histograma en ms), timeouts y saturación del pool de este worker
+    return database_pool_stats()
+
+@router.get("/replica")
+def get_replica_status():
+    # Estado de la réplica según la última comprobación (None si no hay réplica configurada)
+    return {"configured": replica_monitor is not None, **(replica_monitor.status() if replica_monitor else {})}
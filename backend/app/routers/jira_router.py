@@ -1,14 +1,23 @@
 # backend/app/routers/jira_router.py
-from fastapi import APIRouter, HTTPException, Request, Response, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response, Depends
+from typing import List
 from fastapi.responses import RedirectResponse, JSONResponse
 from app.core.utils import get_jira_headers
+from app.core.config import (
+    JIRA_BASE_URL, JIRA_CACHE_TTL_BOARDS, JIRA_CACHE_TTL_ISSUES, JIRA_CACHE_TTL_PROJECTS, JIRA_CACHE_TTL_SPRINTS,
+)
+from app.core.jira_client import (
+    JiraClient, JiraError, cloud_id_cache, http_session, jira_cache, parse_issue, request_json, token_key,
+)
+from app.core.database import Database, get_read_database
+from app.core.query_diagnostics import query_budget
+from app.core import jira_sync
+from app.schemas.jira_sync_schema import JiraSyncStateOut
 from urllib.parse import urlencode
-import requests
 import os
 
 router = APIRouter(prefix="/jira", tags=["Jira"])
 
-JIRA_BASE_URL = os.getenv("JIRA_BASE_URL")
 PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
 
 
@@ -37,7 +46,7 @@ def oauth_callback(request: Request):
         "code": code,
         "redirect_uri": os.getenv("JIRA_REDIRECT_URI"),
     }
-    response = requests.post("https://auth.atlassian.com/oauth/token", json=data)
+    response = http_session().post("https://auth.atlassian.com/oauth/token", json=data)
     token_data = response.json()
     access_token = token_data.get("access_token")
     if not access_token:
@@ -48,118 +57,113 @@ def oauth_callback(request: Request):
     return resp
 
 @router.get("/logout")
-def logout():
+def logout(request: Request):
+    access_token = request.cookies.get("jira_access_token")
+    if access_token:
+        cloud_id_cache.delete(token_key(access_token))
     resp = RedirectResponse(url="/jira/oauth/login")
     resp.delete_cookie("jira_access_token")
     return resp
 
-@router.get("/projects")
-def get_projects(request: Request):
+def _login_redirect(clear_cookie=False):
+    resp = RedirectResponse(url="/jira/oauth/login")
+    if clear_cookie:
+        resp.delete_cookie("jira_access_token")
+    return resp
+
+def _bypass_cache(request: Request):
+    # ?refresh=true o Cache-Control: no-cache fuerzan una consulta a Jira
+    refresh = request.query_params.get("refresh", "").lower() in ("1", "true", "yes")
+    return refresh or "no-cache" in request.headers.get("cache-control", "")
+
+def _cached(request: Request, key, ttl, loader):
+    try:
+        return jira_cache.get_or_load(key, loader, ttl=ttl, refresh=_bypass_cache(request))
+    except JiraError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+def _oauth_client(request: Request):
     access_token = request.cookies.get("jira_access_token")
     if not access_token:
-        return RedirectResponse(url="/jira/oauth/login")
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json"
-    }
-    # Obtén el cloudid de tu sitio
-    cloud_response = requests.get(
-        "https://api.atlassian.com/oauth/token/accessible-resources",
-        headers=headers
-    )
-    resources = cloud_response.json()
-    if not isinstance(resources, list) or not resources:
-        resp = RedirectResponse(url="/jira/oauth/login")
-        resp.delete_cookie("jira_access_token")
-        return resp
-    cloudid = resources[0]["id"]
-    # Llama a la API de Jira
-    url = f"https://api.atlassian.com/ex/jira/{cloudid}/rest/api/3/project/search"
-    response = requests.get(url, headers=headers)
-    projects = response.json().get("values", [])
-    # Filtra solo id, key y name
-    filtered = [{"id": p["id"], "key": p["key"], "name": p["name"]} for p in projects]
-    return {"projects": filtered}
+        return None, None
+    client = JiraClient(access_token)
+    try:
+        # Obtén el cloudid de tu sitio (memoizado por token)
+        return client, client.cloud_id(refresh=_bypass_cache(request))
+    except JiraError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+@router.get("/projects")
+def get_projects(request: Request):
+    client, cloudid = _oauth_client(request)
+    if not client:
+        return _login_redirect()
+    if not cloudid:
+        return _login_redirect(clear_cookie=True)
+
+    def load():
+        # Filtra solo id, key y name
+        projects = client.projects(cloudid)
+        return {"projects": [{"id": p["id"], "key": p["key"], "name": p["name"]} for p in projects]}
+
+    return _cached(request, ("projects", client.token_key), JIRA_CACHE_TTL_PROJECTS, load)
 
 @router.get("/projects-with-issues")
 def get_projects_with_issues(request: Request):
-    access_token = request.cookies.get("jira_access_token")
-    if not access_token:
-        return RedirectResponse(url="/jira/oauth/login")
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json"
-    }
-    # Obtén el cloudid de tu sitio
-    cloud_response = requests.get(
-        "https://api.atlassian.com/oauth/token/accessible-resources",
-        headers=headers
-    )
-    resources = cloud_response.json()
-    if not isinstance(resources, list) or not resources:
-        resp = RedirectResponse(url="/jira/oauth/login")
-        resp.delete_cookie("jira_access_token")
-        return resp
-    cloudid = resources[0]["id"]
-    # Llama a la API de Jira para obtener los proyectos
-    url_projects = f"https://api.atlassian.com/ex/jira/{cloudid}/rest/api/3/project/search"
-    response_projects = requests.get(url_projects, headers=headers)
-    projects = response_projects.json().get("values", [])
-    result = []
-    for p in projects:
-        project_info = {
-            "id": p["id"],
-            "key": p["key"],
-            "name": p["name"],
-            "issues": []
-        }
-        # Obtén las tareas (issues) del proyecto
-        jql = f"project={p['key']} ORDER BY created DESC"
-        url_issues = f"https://api.atlassian.com/ex/jira/{cloudid}/rest/api/3/search?jql={jql}&fields=summary,description,status,labels,assignee,created,updated,duedate,startdate"
-        response_issues = requests.get(url_issues, headers=headers)
-        issues = response_issues.json().get("issues", [])
-        for issue in issues:
-            fields = issue.get("fields", {})
-            project_info["issues"].append({
-                "id": issue.get("id"),
-                "key": issue.get("key"),
-                "summary": fields.get("summary"),
-                "description": fields.get("description"),
-                "status": fields.get("status", {}).get("name") if fields.get("status") else None,
-                "labels": fields.get("labels"),
-                "assignee": fields.get("assignee", {}).get("displayName") if fields.get("assignee") else None,
-                "created": fields.get("created"),
-                "updated": fields.get("updated"),
-                "duedate": fields.get("duedate"),
-                "startdate": fields.get("startdate"),
-            })
-        result.append(project_info)
-    return {"projects": result}
+    client, cloudid = _oauth_client(request)
+    if not client:
+        return _login_redirect()
+    if not cloudid:
+        return _login_redirect(clear_cookie=True)
+
+    def load():
+        projects = client.projects(cloudid)
+        # Issues de todos los proyectos en paralelo, con todas sus páginas
+        issues_by_project = client.project_issues(cloudid, [p["key"] for p in projects])
+        result = [
+            {
+                "id": p["id"],
+                "key": p["key"],
+                "name": p["name"],
+                "issues": [parse_issue(issue) for issue in issues_by_project[p["key"]]],
+            }
+            for p in projects
+        ]
+        return {"projects": result}
+
+    return _cached(request, ("projects-with-issues", client.token_key), JIRA_CACHE_TTL_ISSUES, load)
+
+def _jira_get(url, params=None):
+    return request_json("GET", url, get_jira_headers(), params=params)
 
 @router.get("/boards")
-def get_boards():
+def get_boards(request: Request):
     url = f"{JIRA_BASE_URL.replace('/rest/api/3','/rest/agile/1.0')}/board"
-    headers = get_jira_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json().get("values", [])
+    return _cached(request, ("boards",), JIRA_CACHE_TTL_BOARDS, lambda: _jira_get(url).get("values", []))
 
 @router.get("/sprints/{board_id}")
-def get_sprints(board_id: int):
+def get_sprints(board_id: int, request: Request):
     url = f"{JIRA_BASE_URL.replace('/rest/api/3','/rest/agile/1.0')}/board/{board_id}/sprint"
-    headers = get_jira_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json().get("values", [])
+    return _cached(request, ("sprints", board_id), JIRA_CACHE_TTL_SPRINTS, lambda: _jira_get(url).get("values", []))
 
 @router.get("/issues/{project_key}")
-def get_issues(project_key: str):
+def get_issues(project_key: str, request: Request):
     jql = f"project={project_key} ORDER BY created DESC"
-    url = f"{JIRA_BASE_URL}/search?jql={jql}"
-    headers = get_jira_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json().get("issues", [])
+    return _cached(
+        request, ("issues", project_key), JIRA_CACHE_TTL_ISSUES,
+        lambda: _jira_get(f"{JIRA_BASE_URL}/search", {"jql": jql}).get("issues", []),
+    )
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    return {"caches": [jira_cache.stats(), cloud_id_cache.stats()]}
+
+@router.post("/sync", status_code=202)
+def start_sync(background_tasks: BackgroundTasks):
+    # Sincronización incremental bajo demanda; la programada se configura con JIRA_SYNC_INTERVAL
+    background_tasks.add_task(jira_sync.sync_all)
+    return {"status": "scheduled"}
+
+@router.get("/sync/status", response_model=List[JiraSyncStateOut], dependencies=[Depends(query_budget(1))])
+async def get_sync_status(db: Database = Depends(get_read_database)):
+    return await db.run(jira_sync.get_sync_states)
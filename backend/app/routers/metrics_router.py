@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.database import pool_metrics, database_pool_stats
+from app.core.jira_client import cloud_id_cache, jira_cache
+from app.core.metrics import exposition, gauge_lines, histogram_lines
+from app.routers.cache_router import REFERENCE_CACHES
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_lines():
+    pools = database_pool_stats()
+    yield "# HELP smartplanner_db_pool_wait_seconds Time waited for a free pooled connection."
+    yield "# TYPE smartplanner_db_pool_wait_seconds histogram"
+    for name in pools:
+        yield from histogram_lines("smartplanner_db_pool_wait_seconds", ("pool",), (name,), *pool_metrics[name].histogram())
+    yield from gauge_lines("smartplanner_db_pool_checked_out", "Connections currently checked out.",
+                           [((name,), stats["checked_out"]) for name, stats in pools.items() if "checked_out" in stats], ("pool",))
+    yield from gauge_lines("smartplanner_db_pool_capacity", "pool_size + max_overflow.",
+                           [((name,), stats["capacity"]) for name, stats in pools.items() if "capacity" in stats], ("pool",))
+    yield from gauge_lines("smartplanner_db_pool_timeouts_total", "Checkouts that timed out waiting for a connection.",
+                           [((name,), stats["timeouts"]) for name, stats in pools.items() if "timeouts" in stats], ("pool",),
+                           kind="counter")
+
+
+def _cache_lines():
+    caches = [cache.stats() for cache in (*REFERENCE_CACHES, jira_cache, cloud_id_cache)]
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("size", "gauge")):
+        name = f"smartplanner_cache_{field}{'_total' if kind == 'counter' else ''}"
+        yield from gauge_lines(name, f"In-process cache {field}.", [((stats["name"],), stats[field]) for stats in caches],
+                               ("cache",), kind=kind)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Formato de texto de Prometheus; los valores son de este worker
+    return PlainTextResponse(exposition(_pool_lines(), _cache_lines()), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,87 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from app.core.database import Database, SessionLocal, get_database, get_read_database
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
+from app.schemas import payment_schema
+from app.crud import payment_crud
+from app.crud.payment_crud import InvoiceStateError
+
+router = APIRouter(prefix="/payments", tags=["Payments"])
+
+@router.get("/rate-cards", response_model=List[payment_schema.RateCardOut], dependencies=[Depends(query_budget(1))])
+async def read_rate_cards(client_id: Optional[int] = None, project_id: Optional[int] = None, db: Database = Depends(get_read_database)):
+    return await db.run(payment_crud.get_rate_cards, client_id, project_id)
+
+@router.post("/rate-cards", response_model=payment_schema.RateCardOut)
+async def create_rate_card(rate_card: payment_schema.RateCardCreate, db: Database = Depends(get_database)):
+    return await db.run(payment_crud.create_rate_card, rate_card)
+
+@router.put("/rate-cards/{rate_card_id}", response_model=payment_schema.RateCardOut)
+async def update_rate_card(rate_card_id: int, rate_card: payment_schema.RateCardUpdate, db: Database = Depends(get_database)):
+    db_rate_card = await db.run(payment_crud.update_rate_card, rate_card_id, rate_card)
+    if not db_rate_card:
+        raise HTTPException(status_code=404, detail="Rate card not found")
+    return db_rate_card
+
+@router.delete("/rate-cards/{rate_card_id}", response_model=payment_schema.RateCardOut)
+async def delete_rate_card(rate_card_id: int, db: Database = Depends(get_database)):
+    db_rate_card = await db.run(payment_crud.delete_rate_card, rate_card_id)
+    if not db_rate_card:
+        raise HTTPException(status_code=404, detail="Rate card not found")
+    return db_rate_card
+
+@router.post("/billing-runs", response_model=payment_schema.BillingRunResult)
+async def billing_run(run: payment_schema.BillingRunCreate):
+    # La agregación con NumPy es CPU: con DB_ASYNC no puede ir en el event loop,
+    # así que siempre corre en el threadpool con una sesión síncrona
+    db = Database(SessionLocal())
+    try:
+        return await db.run(payment_crud.run_billing, run.period_start, run.period_end, run.client_id)
+    finally:
+        await db.close()
+
+@router.get("/invoices", response_model=List[payment_schema.InvoiceOut], dependencies=[Depends(query_budget(1))])
+async def read_invoices(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "invoice_id",
+                        client_id: Optional[int] = None, status: Optional[str] = Query(None, pattern="^(draft|issued|paid|void)$"),
+                        period_start: Optional[date] = None, db: Database = Depends(get_read_database)):
+    try:
+        invoices = await db.run(payment_crud.get_invoices, skip, limit, cursor=cursor, sort=sort,
+                                client_id=client_id, status=status, period_start=period_start)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    set_next_cursor(response, invoices, limit, payment_crud.INVOICE_SORTS, sort)
+    return invoices
+
+@router.get("/invoices/{invoice_id}", response_model=payment_schema.InvoiceDetailOut, dependencies=[Depends(query_budget(3))])
+async def read_invoice(invoice_id: int, db: Database = Depends(get_read_database)):
+    db_invoice = await db.run(payment_crud.get_invoice, invoice_id)
+    if not db_invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return db_invoice
+
+async def _change_invoice(db: Database, action, *args):
+    try:
+        db_result = await db.run(action, *args)
+    except InvoiceStateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if not db_result:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return db_result
+
+@router.post("/invoices/{invoice_id}/issue", response_model=payment_schema.InvoiceOut)
+async def issue_invoice(invoice_id: int, db: Database = Depends(get_database)):
+    return await _change_invoice(db, payment_crud.issue_invoice, invoice_id)
+
+@router.post("/invoices/{invoice_id}/void", response_model=payment_schema.InvoiceOut)
+async def void_invoice(invoice_id: int, db: Database = Depends(get_database)):
+    return await _change_invoice(db, payment_crud.void_invoice, invoice_id)
+
+@router.get("/invoices/{invoice_id}/payments", response_model=List[payment_schema.PaymentOut], dependencies=[Depends(query_budget(1))])
+async def read_payments(invoice_id: int, db: Database = Depends(get_read_database)):
+    return await db.run(payment_crud.get_payments, invoice_id)
+
+@router.post("/invoices/{invoice_id}/payments", response_model=payment_schema.PaymentOut)
+async def create_payment(invoice_id: int, payment: payment_schema.PaymentCreate, db: Database = Depends(get_database)):
+    return await _change_invoice(db, payment_crud.create_payment, invoice_id, payment)
@@ -1,42 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import List, Optional
 
 # from backend.app.schemas.project_schema import ProjectCreate, ProjectUpdate
 # from backend.app.crud import project_crud as crud
 # from app.core.database import get_db
 
-from app.schemas.project_schema import ProjectCreate, ProjectUpdate, ProjectOut
+from app.schemas.project_schema import ProjectCreate, ProjectUpdate, ProjectOut, ProjectExpandedOut
 from app.crud import project_crud
-from app.core.database import get_db
+from app.core.database import Database, get_database, get_read_database
+from app.core.etag import collection_etag, conditional, http_date, if_match, item_etag, missing_or_stale
+from app.core.expand import InvalidExpand, parse_expand
+from app.core.fields import InvalidFields, fields_response, parse_fields
+from app.core.serialization import fast_serialization
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 @router.post("/", response_model=ProjectOut)
-def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
-    return project_crud.create_project(db, project)
+async def create_project(project: ProjectCreate, db: Database = Depends(get_database)):
+    return await db.run(project_crud.create_project, project)
 
-@router.get("/", response_model=List[ProjectOut])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return project_crud.get_projects(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[ProjectExpandedOut], dependencies=[Depends(query_budget(2))])
+async def read_projects(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "project_id",
+                        expand: Optional[str] = None, fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        expand = parse_expand(expand, project_crud.PROJECT_EXPANDS)
+        fields = parse_fields(fields, ProjectExpandedOut)
+        if not expand:
+            # Con expand, la ETag la pone ETagMiddleware (las filas relacionadas no tienen versión aquí)
+            versions = await db.run(project_crud.get_project_versions, skip=skip, limit=limit, cursor=cursor, sort=sort)
+            not_modified = conditional(request, response, collection_etag(request, versions))
+            if not_modified:
+                return not_modified
+        projects = await db.run(project_crud.get_projects, skip=skip, limit=limit, cursor=cursor, sort=sort, expand=expand, fields=fields)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except (InvalidExpand, InvalidFields) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    set_next_cursor(response, projects, limit, project_crud.PROJECT_SORTS, sort)
+    if fields or fast_serialization:
+        return fields_response(projects, ProjectExpandedOut, fields, response)
+    return projects
 
-@router.get("/{project_id}", response_model=ProjectOut)
-def read_project(project_id: int, db: Session = Depends(get_db)):
-    db_project = project_crud.get_project(db, project_id)
+@router.get("/{project_id}", response_model=ProjectExpandedOut, dependencies=[Depends(query_budget(2))])
+async def read_project(request: Request, response: Response, project_id: int, expand: Optional[str] = None, fields: Optional[str] = None,
+                       db: Database = Depends(get_read_database)):
+    try:
+        expand = parse_expand(expand, project_crud.PROJECT_EXPANDS)
+        fields = parse_fields(fields, ProjectExpandedOut)
+    except (InvalidExpand, InvalidFields) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not expand:
+        version = await db.run(project_crud.get_project_version, project_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Project not found")
+        not_modified = conditional(request, response, item_etag(project_id, version.updated_at, request.query_params.multi_items()),
+                                   version.updated_at)
+        if not_modified:
+            return not_modified
+    db_project = await db.run(project_crud.get_project, project_id, expand, fields)
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
+    if fields or fast_serialization:
+        return fields_response(db_project, ProjectExpandedOut, fields, response)
     return db_project
 
 @router.put("/{project_id}", response_model=ProjectOut)
-def update_project(project_id: int, project: ProjectUpdate, db: Session = Depends(get_db)):
-    db_project = project_crud.update_project(db, project_id, project)
+async def update_project(project_id: int, project: ProjectUpdate, response: Response, versions=Depends(if_match),
+                         db: Database = Depends(get_database)):
+    db_project = await db.run(project_crud.update_project, project_id, project, versions)
     if not db_project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        raise missing_or_stale(versions, "Project not found")
+    response.headers["ETag"] = item_etag(db_project.project_id, db_project.updated_at)
+    response.headers["Last-Modified"] = http_date(db_project.updated_at)
     return db_project
 
 @router.delete("/{project_id}", response_model=ProjectOut)
-def delete_project(project_id: int, db: Session = Depends(get_db)):
-    db_project = project_crud.delete_project(db, project_id)
+async def delete_project(project_id: int, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_project = await db.run(project_crud.delete_project, project_id, versions)
     if not db_project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        raise missing_or_stale(versions, "Project not found")
     return db_project
\ No newline at end of file
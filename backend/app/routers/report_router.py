@@ -0,0 +1,21 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from app.schemas.report_schema import HoursReportRow
+from app.crud import report_crud
+from app.core.database import Database, get_read_database
+from app.core.query_diagnostics import query_budget
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+@router.get("/hours", response_model=List[HoursReportRow], response_model_exclude_none=True, dependencies=[Depends(query_budget(1))])
+async def hours_report(group_by: str = "user,project", period: str = Query("week", pattern="^(day|week|month)$"),
+                       date_from: Optional[date] = None, date_to: Optional[date] = None,
+                       user_id: Optional[int] = None, project_id: Optional[int] = None,
+                       db: Database = Depends(get_read_database)):
+    groups = [name.strip() for name in group_by.split(",") if name.strip()]
+    invalid = [name for name in groups if name not in report_crud.REPORT_GROUPS]
+    if invalid:
+        allowed = ", ".join(report_crud.REPORT_GROUPS)
+        raise HTTPException(status_code=400, detail=f"Invalid group_by {invalid}. Allowed: {allowed}")
+    return await db.run(report_crud.get_hours_report, groups, period, date_from, date_to, user_id, project_id)
@@ -1,37 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.ticket_schema import TicketCreate, TicketUpdate, TicketOut
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from app.schemas.ticket_schema import TicketCreate, TicketUpdate, TicketOut, TicketExpandedOut, TicketFilter, TicketSearchResult
 from app.crud import ticket_crud
-from app.core.database import get_db
+from app.core.database import Database, get_database, get_read_database, use_replica
+from app.core.export import export_response
+from app.core.etag import collection_etag, conditional, http_date, if_match, item_etag, missing_or_stale
+from app.core.expand import InvalidExpand, parse_expand
+from app.core.fields import InvalidFields, fields_response, parse_fields
+from app.core.serialization import fast_serialization
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
+def ticket_filter(assigned_to_user_id: Optional[int] = None, reported_by_user_id: Optional[int] = None,
+                  project_id: Optional[int] = None, client_id: Optional[int] = None,
+                  status: Optional[List[str]] = Query(None), priority: Optional[List[str]] = Query(None),
+                  due_from: Optional[date] = None, due_to: Optional[date] = None, open: Optional[bool] = None):
+    return TicketFilter(assigned_to_user_id=assigned_to_user_id, reported_by_user_id=reported_by_user_id,
+                        project_id=project_id, client_id=client_id, status=status, priority=priority,
+                        due_from=due_from, due_to=due_to, open=open)
+
 @router.post("/", response_model=TicketOut)
-def create_ticket(ticket: TicketCreate, db: Session = Depends(get_db)):
-    return ticket_crud.create_ticket(db, ticket)
+async def create_ticket(ticket: TicketCreate, db: Database = Depends(get_database)):
+    return await db.run(ticket_crud.create_ticket, ticket)
+
+@router.get("/", response_model=List[TicketExpandedOut], dependencies=[Depends(query_budget(2))])
+async def read_tickets(request: Request, response: Response, filters: TicketFilter = Depends(ticket_filter), skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                       sort: str = "ticket_id", expand: Optional[str] = None, fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        expand = parse_expand(expand, ticket_crud.TICKET_EXPANDS)
+        fields = parse_fields(fields, TicketExpandedOut)
+        if not expand:
+            # Con expand, la ETag la pone ETagMiddleware (las filas relacionadas no tienen versión aquí)
+            versions = await db.run(ticket_crud.get_ticket_versions, skip, limit, cursor=cursor, sort=sort, filters=filters)
+            not_modified = conditional(request, response, collection_etag(request, versions))
+            if not_modified:
+                return not_modified
+        tickets = await db.run(ticket_crud.get_tickets, skip, limit, cursor=cursor, sort=sort, filters=filters, expand=expand, fields=fields)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except (InvalidExpand, InvalidFields) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    set_next_cursor(response, tickets, limit, ticket_crud.TICKET_SORTS, sort)
+    if fields or fast_serialization:
+        return fields_response(tickets, TicketExpandedOut, fields, response)
+    return tickets
+
+@router.get("/search", response_model=List[TicketSearchResult], dependencies=[Depends(query_budget(1))])
+async def search(response: Response, q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+                 db: Database = Depends(get_read_database)):
+    try:
+        hits = await db.run(ticket_crud.search_tickets, q, limit, cursor=cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    set_next_cursor(response, hits, limit, ticket_crud.TICKET_SEARCH_SORTS, "rank")
+    return hits
 
-@router.get("/", response_model=List[TicketOut])
-def read_tickets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return ticket_crud.get_tickets(db, skip, limit)
+@router.get("/export")
+async def export(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), date_from: Optional[date] = None, date_to: Optional[date] = None,
+                 user_id: Optional[int] = None, project_id: Optional[int] = None, replica: bool = Depends(use_replica)):
+    stmt = ticket_crud.export_tickets_query(date_from, date_to, user_id, project_id)
+    return export_response(stmt, format, "tickets", replica)
 
-@router.get("/{ticket_id}", response_model=TicketOut)
-def read_ticket(ticket_id: int, db: Session = Depends(get_db)):
-    db_ticket = ticket_crud.get_ticket(db, ticket_id)
+@router.get("/{ticket_id}", response_model=TicketExpandedOut, dependencies=[Depends(query_budget(2))])
+async def read_ticket(request: Request, response: Response, ticket_id: int, expand: Optional[str] = None, fields: Optional[str] = None,
+                      db: Database = Depends(get_read_database)):
+    try:
+        expand = parse_expand(expand, ticket_crud.TICKET_EXPANDS)
+        fields = parse_fields(fields, TicketExpandedOut)
+    except (InvalidExpand, InvalidFields) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not expand:
+        version = await db.run(ticket_crud.get_ticket_version, ticket_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        not_modified = conditional(request, response, item_etag(ticket_id, version.updated_at, request.query_params.multi_items()),
+                                   version.updated_at)
+        if not_modified:
+            return not_modified
+    db_ticket = await db.run(ticket_crud.get_ticket, ticket_id, expand, fields)
     if not db_ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    if fields or fast_serialization:
+        return fields_response(db_ticket, TicketExpandedOut, fields, response)
     return db_ticket
 
 @router.put("/{ticket_id}", response_model=TicketOut)
-def update_ticket(ticket_id: int, ticket: TicketUpdate, db: Session = Depends(get_db)):
-    db_ticket = ticket_crud.update_ticket(db, ticket_id, ticket)
+async def update_ticket(ticket_id: int, ticket: TicketUpdate, response: Response, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_ticket = await db.run(ticket_crud.update_ticket, ticket_id, ticket, versions)
     if not db_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
+        raise missing_or_stale(versions, "Ticket not found")
+    response.headers["ETag"] = item_etag(db_ticket.ticket_id, db_ticket.updated_at)
+    response.headers["Last-Modified"] = http_date(db_ticket.updated_at)
     return db_ticket
 
 @router.delete("/{ticket_id}", response_model=TicketOut)
-def delete_ticket(ticket_id: int, db: Session = Depends(get_db)):
-    db_ticket = ticket_crud.delete_ticket(db, ticket_id)
+async def delete_ticket(ticket_id: int, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_ticket = await db.run(ticket_crud.delete_ticket, ticket_id, versions)
     if not db_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
+        raise missing_or_stale(versions, "Ticket not found")
     return db_ticket
@@ -1,37 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.schemas.time_entry_schema import TimeEntryCreate, TimeEntryUpdate, TimeEntryOut
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from typing import List, Optional
+from app.core.config import BULK_CHUNK_SIZE
+from app.core.csv_utils import iter_csv_rows
+from app.core.database import Database, get_database, get_read_database, use_replica
+from app.core.export import export_response
+from app.core.json_stream import NotAJsonArray, iter_json_array
+from app.core.etag import collection_etag, conditional, http_date, if_match, item_etag, missing_or_stale
+from app.core.fields import InvalidFields, fields_response, parse_fields
+from app.core.serialization import fast_serialization
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
+from app.schemas.time_entry_schema import TimeEntryCreate, TimeEntryUpdate, TimeEntryOut, TimeEntryBulkResult, TimeEntryFilter
 from app.crud import time_entry_crud as crud
 
 router = APIRouter(prefix="/time-entries", tags=["Time Entries"])
 
+def time_entry_filter(user_id: Optional[int] = None, project_id: Optional[int] = None, date_from: Optional[date] = None,
+                      date_to: Optional[date] = None, status: Optional[List[str]] = Query(None)):
+    return TimeEntryFilter(user_id=user_id, project_id=project_id, date_from=date_from, date_to=date_to, status=status)
+
 @router.post("/", response_model=TimeEntryOut)
-def create(entry: TimeEntryCreate, db: Session = Depends(get_db)):
-    return crud.create_time_entry(db, entry)
+async def create(entry: TimeEntryCreate, db: Database = Depends(get_database)):
+    return await db.run(crud.create_time_entry, entry)
+
+async def _bulk_rows(request: Request):
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        # El CSV se procesa a medida que llega, sin cargar el cuerpo en memoria
+        async for row in iter_csv_rows(request.stream()):
+            yield {key: value if value != "" else None for key, value in row.items()}
+        return
+    # El JSON también se procesa por elementos; un error a mitad del cuerpo corta la
+    # carga, pero los bloques anteriores ya están escritos
+    try:
+        async for row in iter_json_array(request.stream()):
+            yield row
+    except NotAJsonArray:
+        raise HTTPException(status_code=422, detail="Expected a JSON array of time entries")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or a text/csv upload")
+
+@router.post("/bulk", response_model=TimeEntryBulkResult)
+async def create_bulk(request: Request, method: str = Query("insert", pattern="^(insert|copy)$"), db: Database = Depends(get_database)):
+    # Con method=copy se usa COPY en PostgreSQL; esas filas no devuelven entry_ids
+    result = {"inserted": 0, "entry_ids": [], "errors": []}
+    chunk, positions = [], []
+
+    async def flush():
+        # Los solapes se detectan en memoria antes de escribir; los de un bloque
+        # anterior se encuentran porque ese bloque ya está en la base de datos
+        overlaps = await db.run(crud.find_time_entry_overlaps, chunk, positions)
+        if overlaps:
+            result["errors"].extend({"index": positions[i], "errors": [message]} for i, message in overlaps.items())
+            kept = [i for i in range(len(chunk)) if i not in overlaps]
+            chunk[:] = [chunk[i] for i in kept]
+            positions[:] = [positions[i] for i in kept]
+        loaded = await db.run(crud.copy_time_entries, chunk) if method == "copy" and chunk else None
+        if loaded is None:
+            ids, failed = await db.run(crud.bulk_create_time_entries, chunk)
+            result["entry_ids"].extend(ids)
+            result["errors"].extend({"index": positions[i], "errors": [message]} for i, message in failed.items())
+            loaded = len(ids)
+        result["inserted"] += loaded
+        chunk.clear()
+        positions.clear()
+
+    index = 0
+    async for row in _bulk_rows(request):
+        try:
+            chunk.append(TimeEntryCreate(**row))
+            positions.append(index)
+        except ValidationError as exc:
+            result["errors"].append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+        except TypeError:
+            result["errors"].append({"index": index, "errors": ["Row must be an object"]})
+        index += 1
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    result["errors"].sort(key=lambda error: error["index"])
+    return result
 
-@router.get("/", response_model=List[TimeEntryOut])
-def read_all(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_time_entries(db, skip, limit)
+@router.get("/", response_model=List[TimeEntryOut], dependencies=[Depends(query_budget(2))])
+async def read_all(request: Request, response: Response, filters: TimeEntryFilter = Depends(time_entry_filter), skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                   sort: str = "entry_id", fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, TimeEntryOut)
+        versions = await db.run(crud.get_time_entry_versions, skip, limit, cursor=cursor, sort=sort, filters=filters)
+        not_modified = conditional(request, response, collection_etag(request, versions))
+        if not_modified:
+            return not_modified
+        entries = await db.run(crud.get_time_entries, skip, limit, cursor=cursor, sort=sort, filters=filters, fields=fields)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    set_next_cursor(response, entries, limit, crud.TIME_ENTRY_SORTS, sort)
+    if fields or fast_serialization:
+        return fields_response(entries, TimeEntryOut, fields, response)
+    return entries
 
-@router.get("/{entry_id}", response_model=TimeEntryOut)
-def read(entry_id: int, db: Session = Depends(get_db)):
-    db_entry = crud.get_time_entry(db, entry_id)
+@router.get("/export")
+async def export(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), date_from: Optional[date] = None, date_to: Optional[date] = None,
+                 user_id: Optional[int] = None, project_id: Optional[int] = None, replica: bool = Depends(use_replica)):
+    stmt = crud.export_time_entries_query(date_from, date_to, user_id, project_id)
+    return export_response(stmt, format, "time_entries", replica)
+
+@router.get("/{entry_id}", response_model=TimeEntryOut, dependencies=[Depends(query_budget(2))])
+async def read(request: Request, response: Response, entry_id: int, fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, TimeEntryOut)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    version = await db.run(crud.get_time_entry_version, entry_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+    not_modified = conditional(request, response, item_etag(entry_id, version.updated_at, request.query_params.multi_items()),
+                               version.updated_at)
+    if not_modified:
+        return not_modified
+    db_entry = await db.run(crud.get_time_entry, entry_id, fields=fields)
     if not db_entry:
         raise HTTPException(status_code=404, detail="Time entry not found")
+    if fields or fast_serialization:
+        return fields_response(db_entry, TimeEntryOut, fields, response)
     return db_entry
 
 @router.put("/{entry_id}", response_model=TimeEntryOut)
-def update(entry_id: int, entry: TimeEntryUpdate, db: Session = Depends(get_db)):
-    db_entry = crud.update_time_entry(db, entry_id, entry)
+async def update(entry_id: int, entry: TimeEntryUpdate, response: Response, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_entry = await db.run(crud.update_time_entry, entry_id, entry, versions)
     if not db_entry:
-        raise HTTPException(status_code=404, detail="Time entry not found")
+        raise missing_or_stale(versions, "Time entry not found")
+    response.headers["ETag"] = item_etag(db_entry.entry_id, db_entry.updated_at)
+    response.headers["Last-Modified"] = http_date(db_entry.updated_at)
     return db_entry
 
 @router.delete("/{entry_id}", response_model=TimeEntryOut)
-def delete(entry_id: int, db: Session = Depends(get_db)):
-    db_entry = crud.delete_time_entry(db, entry_id)
+async def delete(entry_id: int, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_entry = await db.run(crud.delete_time_entry, entry_id, versions)
     if not db_entry:
-        raise HTTPException(status_code=404, detail="Time entry not found")
+        raise missing_or_stale(versions, "Time entry not found")
     return db_entry
@@ -1,43 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.exc import IntegrityError
 # from app.schemas import user_schema
-from app.schemas.user_schema import UserCreate, UserUpdate, UserOut
+from app.schemas.user_schema import UserCreate, UserUpdate, UserOut, UserLogin
 from app.crud import user_crud
-from app.core.database import get_db
+from app.core.database import Database, get_database, get_read_database
+from app.core.etag import collection_etag, conditional, http_date, if_match, item_etag, missing_or_stale
+from app.core.fields import InvalidFields, fields_response, parse_fields
+from app.core.serialization import fast_serialization
+from app.core.pagination import InvalidCursor, set_next_cursor
+from app.core.query_diagnostics import query_budget
+from app.core.security import hash_password, verify_password
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+def _duplicate_user(exc: IntegrityError):
+    # Traduce la violación de unicidad a los mismos 400 de siempre, sin SELECT previos
+    message = str(exc.orig).lower()
+    if "username" in message:
+        return HTTPException(status_code=400, detail="Username already registered")
+    if "email" in message:
+        return HTTPException(status_code=400, detail="Email already registered")
+    return HTTPException(status_code=409, detail="User conflicts with existing data")
+
 @router.post("/", response_model=UserOut)
-def create(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = user_crud.get_user_by_username(db, user.username)
-    db_user_email = user_crud.get_user_by_email(db, user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-    if db_user_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return user_crud.create_user(db, user)
-
-@router.get("/", response_model=list[UserOut])
-def read_all(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return user_crud.get_users(db, skip, limit)
-
-@router.get("/{user_id}", response_model=UserOut)
-def read(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_crud.get_user(db, user_id)
+async def create(user: UserCreate, db: Database = Depends(get_database)):
+    password_hash = await hash_password(user.password_hash)
+    try:
+        return await db.run(user_crud.create_user, user, password_hash)
+    except IntegrityError as exc:
+        raise _duplicate_user(exc)
+
+@router.post("/login", response_model=UserOut)
+async def login(credentials: UserLogin, db: Database = Depends(get_database)):
+    db_user = await db.run(user_crud.get_user_credentials, credentials.username)
+    valid, new_hash = await verify_password(credentials.password, db_user.password_hash if db_user else None)
+    if not db_user or not valid or not db_user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    if new_hash:
+        # Rehash transparente si cambió BCRYPT_ROUNDS
+        await db.run(user_crud.set_password_hash, db_user.user_id, new_hash)
+    return db_user
+
+@router.get("/", response_model=list[UserOut], dependencies=[Depends(query_budget(2))])
+async def read_all(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "user_id",
+                   fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, UserOut)
+        versions = await db.run(user_crud.get_user_versions, skip, limit, cursor=cursor, sort=sort)
+        not_modified = conditional(request, response, collection_etag(request, versions))
+        if not_modified:
+            return not_modified
+        users = await db.run(user_crud.get_users, skip, limit, cursor=cursor, sort=sort, fields=fields)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    set_next_cursor(response, users, limit, user_crud.USER_SORTS, sort)
+    if fields or fast_serialization:
+        return fields_response(users, UserOut, fields, response)
+    return users
+
+@router.get("/{user_id}", response_model=UserOut, dependencies=[Depends(query_budget(2))])
+async def read(request: Request, response: Response, user_id: int, fields: Optional[str] = None, db: Database = Depends(get_read_database)):
+    try:
+        fields = parse_fields(fields, UserOut)
+    except InvalidFields as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    version = await db.run(user_crud.get_user_version, user_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="User not found")
+    not_modified = conditional(request, response, item_etag(user_id, version.updated_at, request.query_params.multi_items()),
+                               version.updated_at)
+    if not_modified:
+        return not_modified
+    db_user = await db.run(user_crud.get_user, user_id, fields=fields)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    if fields or fast_serialization:
+        return fields_response(db_user, UserOut, fields, response)
     return db_user
 
 @router.put("/{user_id}", response_model=UserOut)
-def update(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
-    db_user = user_crud.update_user(db, user_id, user)
+async def update(user_id: int, user: UserUpdate, response: Response, versions=Depends(if_match), db: Database = Depends(get_database)):
+    password_hash = await hash_password(user.password_hash) if user.password_hash else None
+    try:
+        db_user = await db.run(user_crud.update_user, user_id, user, password_hash, versions)
+    except IntegrityError as exc:
+        raise _duplicate_user(exc)
     if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
+        raise missing_or_stale(versions, "User not found")
+    response.headers["ETag"] = item_etag(db_user.user_id, db_user.updated_at)
+    response.headers["Last-Modified"] = http_date(db_user.updated_at)
     return db_user
 
 @router.delete("/{user_id}", response_model=UserOut)
-def delete(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_crud.delete_user(db, user_id)
+async def delete(user_id: int, versions=Depends(if_match), db: Database = Depends(get_database)):
+    db_user = await db.run(user_crud.delete_user, user_id, versions)
     if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
+        raise missing_or_stale(versions, "User not found")
     return db_user
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+class JiraSyncStateOut(BaseModel):
+    project_key: str
+    last_updated: Optional[datetime] = None
+    last_synced_at: Optional[datetime] = None
+    issues_synced: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,123 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+
+# El motor indexa los días del periodo en 16 bits; un año de sobra para cualquier cierre
+MAX_BILLING_DAYS = 366
+
+
+class RateCardBase(BaseModel):
+    client_id: Optional[int] = None
+    project_id: Optional[int] = None
+    activity_type: Optional[str] = None
+    hourly_rate: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_validity(self):
+        if self.valid_from and self.valid_to and self.valid_to < self.valid_from:
+            raise ValueError("valid_to must not be earlier than valid_from")
+        return self
+
+
+class RateCardCreate(RateCardBase):
+    pass
+
+
+class RateCardUpdate(RateCardBase):
+    pass
+
+
+class RateCardOut(RateCardBase):
+    rate_card_id: int
+    hourly_rate: float
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BillingRunCreate(BaseModel):
+    period_start: date
+    period_end: date
+    client_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.period_end < self.period_start:
+            raise ValueError("period_end must not be earlier than period_start")
+        if (self.period_end - self.period_start).days >= MAX_BILLING_DAYS:
+            raise ValueError(f"A billing run covers at most {MAX_BILLING_DAYS} days")
+        return self
+
+
+class UnratedHours(BaseModel):
+    project_id: int
+    activity_type: str
+    hours: float
+
+
+class BillingRunResult(BaseModel):
+    period_start: date
+    period_end: date
+    entries: int
+    hours: float
+    total: float
+    invoice_ids: List[int]
+    lines: int
+    skipped_clients: List[int]
+    unrated: List[UnratedHours]
+
+
+class InvoiceLineOut(BaseModel):
+    line_id: int
+    project_id: int
+    activity_type: str
+    entries: int
+    hours: float
+    hourly_rate: float
+    amount: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PaymentCreate(BaseModel):
+    amount: Decimal = Field(gt=0, max_digits=14, decimal_places=2)
+    paid_on: date
+    method: str
+    reference: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class PaymentOut(PaymentCreate):
+    payment_id: int
+    invoice_id: int
+    amount: float
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InvoiceOut(BaseModel):
+    invoice_id: int
+    invoice_number: str
+    client_id: int
+    period_start: date
+    period_end: date
+    status: str
+    currency: str
+    hours: float
+    total: float
+    amount_paid: float
+    issued_at: Optional[datetime] = None
+    due_date: Optional[date] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InvoiceDetailOut(InvoiceOut):
+    lines: List[InvoiceLineOut]
+    payments: List[PaymentOut]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
+from app.schemas.client_schema import ClientOut
 
 
 class ProjectBase(BaseModel):
@@ -27,5 +28,9 @@ class ProjectOut(ProjectBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectExpandedOut(ProjectOut):
+    # Solo viene informado con ?expand=client
+    client: Optional[ClientOut] = None
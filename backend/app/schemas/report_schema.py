@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+class HoursReportRow(BaseModel):
+    period_start: date
+    user_id: Optional[int] = None
+    project_id: Optional[int] = None
+    activity_type: Optional[str] = None
+    hours: float
+    entries: int
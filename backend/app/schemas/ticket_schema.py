@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
+from app.schemas.client_schema import ClientOut
+from app.schemas.project_schema import ProjectOut
+from app.schemas.user_schema import UserOut
 
 class TicketBase(BaseModel):
     title: str
@@ -29,12 +32,33 @@ class TicketOut(TicketBase):
     ticket_number: str
     project_id: int
     client_id: int
-    reported_by_user_id: int
-    assigned_to_user_id: int
+    reported_by_user_id: Optional[int] = None
+    assigned_to_user_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     resolved_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TicketExpandedOut(TicketOut):
+    # Solo vienen informadas las relaciones pedidas con ?expand=
+    project: Optional[ProjectOut] = None
+    client: Optional[ClientOut] = None
+    assigned_to_user: Optional[UserOut] = None
+    reported_by_user: Optional[UserOut] = None
+
+class TicketFilter(BaseModel):
+    assigned_to_user_id: Optional[int] = None
+    reported_by_user_id: Optional[int] = None
+    project_id: Optional[int] = None
+    client_id: Optional[int] = None
+    status: Optional[List[str]] = None
+    priority: Optional[List[str]] = None
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+    open: Optional[bool] = None
+
+class TicketSearchResult(TicketOut):
+    rank: float
+    snippet: str
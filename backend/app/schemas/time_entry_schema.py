@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 from datetime import date, time, datetime
-from typing import Optional
+from typing import Any, List, Optional
 
 class TimeEntryBase(BaseModel):
     user_id: int
@@ -8,14 +8,22 @@ class TimeEntryBase(BaseModel):
     entry_date: date
     activity_type: str
     start_time: time
-    end_time: Optional[time] = None
+    end_time: time
     description: Optional[str] = None
     status: str
 
-class TimeEntryCreate(TimeEntryBase):
+class TimeEntryWrite(TimeEntryBase):
+    # Solo en escritura: un registro antiguo inválido se sigue pudiendo leer
+    @model_validator(mode="after")
+    def check_times(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be later than start_time")
+        return self
+
+class TimeEntryCreate(TimeEntryWrite):
     pass
 
-class TimeEntryUpdate(TimeEntryBase):
+class TimeEntryUpdate(TimeEntryWrite):
     pass
 
 class TimeEntryOut(TimeEntryBase):
@@ -24,5 +32,20 @@ class TimeEntryOut(TimeEntryBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TimeEntryBulkError(BaseModel):
+    index: int
+    errors: List[Any]
+
+class TimeEntryBulkResult(BaseModel):
+    inserted: int
+    entry_ids: List[int]
+    errors: List[TimeEntryBulkError]
+
+class TimeEntryFilter(BaseModel):
+    user_id: Optional[int] = None
+    project_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    status: Optional[List[str]] = None
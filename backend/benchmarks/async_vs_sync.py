@@ -0,0 +1,36 @@
+# benchmarks/async_vs_sync.py
+# Compara el throughput del camino síncrono (threadpool + psycopg2) contra el
+# asíncrono (AsyncSession + asyncpg) levantando uvicorn con DB_ASYNC=0 y DB_ASYNC=1.
+#
+#   python -m benchmarks.async_vs_sync --requests 5000 --concurrency 200 --path "/clients/?limit=50"
+#
+# Usa la base de datos configurada en DATABASE_URL; el resultado se imprime como JSON.
+import argparse
+import json
+
+from benchmarks.common import hammer, running_server
+
+
+def run_mode(db_async, args):
+    with running_server(args.port, DB_ASYNC=int(db_async)) as base_url:
+        url = base_url + args.path
+        get = lambda _, session: session.get(url)
+        hammer(get, min(200, args.requests), args.concurrency)  # calentamiento
+        return hammer(get, args.requests, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput sync vs async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--path", default="/clients/?limit=50")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    report = {"sync": run_mode(False, args), "async": run_mode(True, args)}
+    report["speedup"] = round(report["async"]["throughput_rps"] / report["sync"]["throughput_rps"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/billing.py
+# Facturación de un periodo sobre el dataset de DATABASE_URL (ver
+# scripts.generate_dataset): tiempo total, registros por segundo y memoria
+# máxima del proceso, más una comprobación de que las horas facturadas y las
+# que quedaron sin tarifa suman lo mismo que SUM(duration_hours) en SQL y de
+# que el total de cada factura es la suma de sus líneas. Genera borradores
+# (sustituye los del periodo). Sin tarifas, crea una general con --rate.
+#
+#   python -m scripts.generate_dataset --scale production
+#   python -m benchmarks.billing --month 2022-03 --chunk-size 50000
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor de facturación: tiempo, memoria y consistencia")
+    parser.add_argument("--month", help="YYYY-MM (por defecto, el primer mes con registros)")
+    parser.add_argument("--chunk-size", type=int, help="sustituye BILLING_CHUNK_SIZE")
+    parser.add_argument("--rate", default="100.00", help="tarifa general a crear si no hay ninguna")
+    args = parser.parse_args()
+    if args.chunk_size:
+        os.environ["BILLING_CHUNK_SIZE"] = str(args.chunk_size)
+
+    from app.core.config import BILLABLE_STATUSES, BILLING_CHUNK_SIZE
+    from app.core.database import SessionLocal
+    from app.crud.payment_crud import run_billing
+    from app.models import client_models, ticket_models, user_models  # noqa: F401  (relaciones)
+    from app.models.payment_models import Invoice, InvoiceLine, RateCard
+    from app.models.time_entry_models import TimeEntry
+    from scripts.billing_run import month_period
+
+    db = SessionLocal()
+    try:
+        if args.month:
+            period_start, period_end = month_period(args.month)
+        else:
+            first = db.scalar(select(func.min(TimeEntry.entry_date)))
+            if first is None:
+                sys.exit("time_entries is empty: run python -m scripts.generate_dataset first")
+            period_start, period_end = month_period(f"{first:%Y-%m}")
+        if not db.scalar(select(func.count()).select_from(RateCard)):
+            db.add(RateCard(hourly_rate=Decimal(args.rate)))
+            db.commit()
+            print(f"no rate cards: created a general rate of {args.rate}", file=sys.stderr)
+        expected_hours = db.scalar(
+            select(func.coalesce(func.sum(TimeEntry.duration_hours), 0))
+            .where(TimeEntry.entry_date.between(period_start, period_end), TimeEntry.status.in_(BILLABLE_STATUSES))
+        )
+        db.rollback()
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        result = run_billing(db, period_start, period_end)
+        elapsed = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        mismatched = db.execute(
+            select(Invoice.invoice_id).join(InvoiceLine, InvoiceLine.invoice_id == Invoice.invoice_id)
+            .where(Invoice.invoice_id.in_(result["invoice_ids"] or [0]))
+            .group_by(Invoice.invoice_id, Invoice.total).having(func.sum(InvoiceLine.amount) != Invoice.total)
+        ).all()
+    finally:
+        db.close()
+
+    # Las horas se comparan en centésimas: duration_hours ya viene redondeada
+    billed = round(result["hours"] * 100) + sum(round(row["hours"] * 100) for row in result["unrated"])
+    consistent = billed == round(Decimal(expected_hours) * 100) and not mismatched
+    print(json.dumps({
+        "period": [str(period_start), str(period_end)],
+        "entries": result["entries"],
+        "chunk_size": BILLING_CHUNK_SIZE,
+        "seconds": round(elapsed, 2),
+        "entries_per_second": round(result["entries"] / elapsed) if elapsed else None,
+        # ru_maxrss: KiB en Linux; crece solo si la facturación supera el máximo anterior
+        "max_rss_mb": round(rss_after / 1024, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        "invoices": len(result["invoice_ids"]),
+        "lines": result["lines"],
+        "total": result["total"],
+        "unrated_combinations": len(result["unrated"]),
+        "consistent": consistent,
+    }, indent=2))
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/common.py
+# Utilidades compartidas por los benchmarks: arranque de uvicorn y carga HTTP concurrente.
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base_url}/docs", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+@contextmanager
+def running_server(port, app="app.main:app", **env_overrides):
+    """Levanta `uvicorn <app>` (por defecto la API) con las variables de entorno indicadas."""
+    env = dict(os.environ, **{key: str(value) for key, value in env_overrides.items()})
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    if len(latencies) < 2:
+        latencies = latencies * 2 or [0.0, 0.0]
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def hammer(request_for, total, concurrency):
+    """Lanza `total` peticiones con `concurrency` hilos; request_for(i, session) hace la i-ésima."""
+    local = threading.local()
+
+    def one(index):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = request_for(index, session)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": sum(1 for _, status in results if status >= 400),
+        "throughput_rps": round(total / elapsed, 1),
+        **latency_summary([latency for latency, _ in results]),
+    }
@@ -0,0 +1,102 @@
+# benchmarks/expand_queries.py
+# Sentencias SQL por página de GET /tickets/ y /projects/ con ?expand=,
+# frente a las peticiones que haría el cliente resolviendo cada id por
+# separado. El número de sentencias no debe depender del tamaño de página;
+# si depende, el comando termina con código 1. tests/test_expand_queries.py
+# hace la misma comprobación en la suite de pytest.
+#
+#   python -m benchmarks.expand_queries
+import argparse
+import json
+import sys
+
+from sqlalchemy import event, func, insert, select
+
+from app.core.database import SessionLocal, engine
+from app.crud import project_crud, ticket_crud
+from app.models import time_entry_models  # noqa: F401  (relaciones)
+from app.models.client_models import Client
+from app.models.project_models import Project
+from app.models.ticket_models import Ticket
+from app.models.user_models import User
+from app.schemas.project_schema import ProjectExpandedOut
+from app.schemas.ticket_schema import TicketExpandedOut
+
+PAGE_SIZES = (10, 50, 100)
+
+
+def seed(db, tickets):
+    # Cada ticket apunta a proyecto/cliente/usuarios distintos: el peor caso para el N+1
+    existing = db.scalar(select(func.count()).select_from(Ticket))
+    missing = tickets - existing
+    if missing <= 0:
+        return
+    clients = db.scalars(insert(Client).returning(Client.client_id), [{"name": f"expand-{i}"} for i in range(missing)]).all()
+    projects = db.scalars(insert(Project).returning(Project.project_id), [
+        {"client_id": client_id, "name": f"expand-{i}", "project_type": "development", "status": "active"}
+        for i, client_id in enumerate(clients)
+    ]).all()
+    users = db.scalars(insert(User).returning(User.user_id), [
+        {"username": f"expand-{existing + i}", "email": f"expand-{existing + i}@example.com", "password_hash": "-", "role": "dev"}
+        for i in range(missing)
+    ]).all()
+    db.execute(insert(Ticket), [
+        {"ticket_number": f"EXP-{existing + i}", "project_id": projects[i], "client_id": clients[i],
+         "reported_by_user_id": users[i], "assigned_to_user_id": users[-1 - i], "title": "t", "description": "d",
+         "priority": "medium", "status": "Open", "category": "bug"}
+        for i in range(missing)
+    ])
+    db.commit()
+
+
+def count_statements(load, schema):
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", listener)
+    db = SessionLocal()
+    try:
+        rows = load(db)
+        db.close()
+        # La serialización va fuera de la sesión, como en el router
+        payload = [schema.model_validate(row, from_attributes=True).model_dump() for row in rows]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), payload
+
+
+def client_side_requests(payload, expand):
+    # 1 petición de la lista + 1 por cada id relacionado distinto
+    ids = {(name, (row[name] or {}).get(f"{'user' if name.endswith('user') else name}_id")) for row in payload for name in expand}
+    return 1 + len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentencias por página con ?expand=")
+    parser.parse_args()
+    db = SessionLocal()
+    try:
+        seed(db, max(PAGE_SIZES))
+    finally:
+        db.close()
+
+    cases = [
+        ("tickets", ticket_crud.TICKET_EXPANDS, TicketExpandedOut,
+         lambda limit, expand: lambda db: ticket_crud.get_tickets(db, limit=limit, expand=expand)),
+        ("projects", project_crud.PROJECT_EXPANDS, ProjectExpandedOut,
+         lambda limit, expand: lambda db: project_crud.get_projects(db, limit=limit, expand=expand)),
+    ]
+    report, constant = [], True
+    for name, expand, schema, loader in cases:
+        for expanded in ((), expand):
+            counts = {}
+            for limit in PAGE_SIZES:
+                statements, payload = count_statements(loader(limit, list(expanded)), schema)
+                counts[limit] = {"statements": statements, "client_side_requests": client_side_requests(payload, expanded)}
+            constant &= len({value["statements"] for value in counts.values()}) == 1
+            report.append({"endpoint": name, "expand": ",".join(expanded), "per_page_size": counts})
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if constant else 1)
+
+
+if __name__ == "__main__":
+    main()
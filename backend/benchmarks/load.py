@@ -0,0 +1,189 @@
+# benchmarks/load.py
+# Benchmark repetible de todas las rutas (/clients, /projects, /users, /tickets,
+# /time-entries, /reports y /jira/* contra benchmarks.mock_jira) a los niveles de
+# concurrencia indicados. Por escenario y nivel: p50/p95/p99, throughput y
+# errores medidos contra uvicorn, y sentencias SQL por petición contadas en
+# proceso (TestClient) escuchando los engines. La salida es JSON para poder
+# comparar ejecuciones; con --compare se imprime además la diferencia con una
+# ejecución anterior.
+#
+#   python -m scripts.bootstrap_db && python -m scripts.generate_dataset --scale small
+#   python -m benchmarks.load --concurrency 1,10,50 --requests 500 --output before.json
+#   python -m benchmarks.load --concurrency 1,10,50 --requests 500 --compare before.json
+import argparse
+import json
+import os
+import sys
+import uuid
+
+from sqlalchemy import event, func, select
+
+from benchmarks.common import hammer, running_server
+
+JIRA_COOKIE = {"Cookie": "jira_access_token=benchmark"}
+
+
+def id_ranges():
+    from app.core.database import SessionLocal
+    from app.models import time_entry_models  # noqa: F401  (relaciones)
+    from app.models.client_models import Client
+    from app.models.project_models import Project
+    from app.models.ticket_models import Ticket
+    from app.models.time_entry_models import TimeEntry
+    from app.models.user_models import User
+
+    db = SessionLocal()
+    try:
+        ranges = {
+            name: db.execute(select(func.min(column), func.max(column), func.count())).one()
+            for name, column in (("clients", Client.client_id), ("projects", Project.project_id), ("users", User.user_id),
+                                 ("tickets", Ticket.ticket_id), ("time_entries", TimeEntry.entry_id))
+        }
+        # Un usuario generado (contraseña conocida) para /users/login
+        username = db.scalar(select(User.username).where(User.username.like("gen-user-%")).limit(1))
+    finally:
+        db.close()
+    missing = [name for name, (_, _, count) in ranges.items() if not count]
+    if missing:
+        sys.exit(f"empty tables {missing}: run python -m scripts.generate_dataset first")
+    return ranges, username
+
+
+def scenarios(ranges, username, run_id, jira=True):
+    """Escenario -> request_for(i, session, base_url); el id i-ésimo se reparte por todo el rango."""
+    def pick(name, i):
+        low, high, _ = ranges[name]
+        return low + i * 7919 % (high - low + 1)
+
+    from scripts.generate_dataset import PASSWORD
+
+    cases = {
+        "clients.list": lambda i, s, b: s.get(f"{b}/clients/?limit=50"),
+        "clients.detail": lambda i, s, b: s.get(f"{b}/clients/{pick('clients', i)}"),
+        "clients.create": lambda i, s, b: s.post(f"{b}/clients/", json={"name": f"load-{run_id}-{i}"}),
+        "projects.list": lambda i, s, b: s.get(f"{b}/projects/?limit=50"),
+        "projects.list_expand": lambda i, s, b: s.get(f"{b}/projects/?limit=50&expand=client"),
+        "projects.detail": lambda i, s, b: s.get(f"{b}/projects/{pick('projects', i)}"),
+        "users.list": lambda i, s, b: s.get(f"{b}/users/?limit=50"),
+        "users.detail": lambda i, s, b: s.get(f"{b}/users/{pick('users', i)}"),
+        "users.login": lambda i, s, b: s.post(f"{b}/users/login", json={"username": username, "password": PASSWORD}),
+        "tickets.list": lambda i, s, b: s.get(f"{b}/tickets/?limit=50"),
+        "tickets.list_expand": lambda i, s, b: s.get(f"{b}/tickets/?limit=50&expand=project,client,assigned_to_user"),
+        "tickets.filter": lambda i, s, b: s.get(f"{b}/tickets/?limit=50&status=Open&assigned_to_user_id={pick('users', i)}"),
+        "tickets.search": lambda i, s, b: s.get(f"{b}/tickets/search?q=deploy&limit=20"),
+        "tickets.detail": lambda i, s, b: s.get(f"{b}/tickets/{pick('tickets', i)}"),
+        "time_entries.list": lambda i, s, b: s.get(f"{b}/time-entries/?limit=50"),
+        "time_entries.filter": lambda i, s, b: s.get(
+            f"{b}/time-entries/?limit=50&user_id={pick('users', i)}&date_from=2022-01-01&date_to=2022-12-31"),
+        "time_entries.detail": lambda i, s, b: s.get(f"{b}/time-entries/{pick('time_entries', i)}"),
+        "reports.hours": lambda i, s, b: s.get(f"{b}/reports/hours?group_by=project&period=month&user_id={pick('users', i)}"),
+    }
+    if jira:
+        cases.update({
+            "jira.projects": lambda i, s, b: s.get(f"{b}/jira/projects", headers=JIRA_COOKIE),
+            "jira.issues": lambda i, s, b: s.get(f"{b}/jira/issues/P{i % 10}"),
+            "jira.issues_uncached": lambda i, s, b: s.get(f"{b}/jira/issues/P{i % 10}?refresh=true"),
+            "jira.boards": lambda i, s, b: s.get(f"{b}/jira/boards"),
+            "jira.sync_status": lambda i, s, b: s.get(f"{b}/jira/sync/status"),
+        })
+    return cases
+
+
+def statements_per_request(cases, samples):
+    """Sentencias SQL por petición, con la aplicación en este mismo proceso."""
+    from fastapi.testclient import TestClient
+    from app.core import database
+    from app.main import app
+
+    engines = [database.engine, database.replica_engine]
+    engines += [engine.sync_engine for engine in (database.async_engine, database.async_replica_engine) if engine]
+    engines = [engine for engine in engines if engine is not None]
+    statements = []
+    listener = lambda *args: statements.append(1)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        client = TestClient(app)
+        counts = {}
+        for name, request_for in cases.items():
+            request_for(0, client, "")  # calentamiento (cachés)
+            statements.clear()
+            for i in range(1, samples + 1):
+                request_for(i, client, "")
+            counts[name] = round(len(statements) / samples, 2)
+        return counts
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", listener)
+
+
+def compare(report, previous):
+    before = {(row["scenario"], row["concurrency"]): row for row in previous["results"]}
+    diff = []
+    for row in report["results"]:
+        old = before.get((row["scenario"], row["concurrency"]))
+        if old:
+            diff.append({
+                "scenario": row["scenario"],
+                "concurrency": row["concurrency"],
+                "p95_ms": [old["p95_ms"], row["p95_ms"]],
+                "throughput_rps": [old["throughput_rps"], row["throughput_rps"]],
+                "statements_per_request": [old["statements_per_request"], row["statements_per_request"]],
+                "throughput_change": round(row["throughput_rps"] / old["throughput_rps"] - 1, 3) if old["throughput_rps"] else None,
+            })
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia, throughput y sentencias por petición de todas las rutas")
+    parser.add_argument("--concurrency", default="1,10,50", help="niveles separados por comas")
+    parser.add_argument("--requests", type=int, default=500, help="peticiones por escenario y nivel")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=5, help="peticiones para contar sentencias")
+    parser.add_argument("--only", help="solo escenarios que empiecen por este prefijo (p. ej. tickets.)")
+    parser.add_argument("--no-jira", action="store_true")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--jira-port", type=int, default=8771)
+    parser.add_argument("--output", help="además de imprimirlo, guarda el JSON en este archivo")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    # La API (en proceso y en uvicorn) habla con el Jira simulado; sin latencia
+    # artificial para que se mida la API y no el mock
+    jira_url = f"http://127.0.0.1:{args.jira_port}"
+    os.environ.update(JIRA_API_URL=jira_url, JIRA_BASE_URL=f"{jira_url}/rest/api/3", MOCK_JIRA_LATENCY="0")
+
+    ranges, username = id_ranges()
+    cases = scenarios(ranges, username, uuid.uuid4().hex[:8], jira=not args.no_jira)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name.startswith(args.only)}
+
+    with running_server(args.jira_port, app="benchmarks.mock_jira:app"):
+        counts = statements_per_request(cases, args.samples)
+        with running_server(args.port) as base_url:
+            results = []
+            for name, request_for in cases.items():
+                request = lambda i, session: request_for(i, session, base_url)
+                for level in levels:
+                    hammer(request, args.warmup, level)
+                    results.append({"scenario": name, **hammer(request, args.requests, level),
+                                    "statements_per_request": counts[name]})
+
+    from app.core.config import DATABASE
+    report = {
+        "meta": {"dialect": DATABASE.url.split(":", 1)[0], "db_async": DATABASE.use_async,
+                 "rows": {name: count for name, (_, _, count) in ranges.items()}},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as previous:
+            report["compare"] = compare(report, json.load(previous))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/mock_jira.py
+# Servidor Jira simulado para pruebas locales y benchmarks de /jira/*.
+#
+#   MOCK_JIRA_PROJECTS=40 MOCK_JIRA_ISSUES=250 MOCK_JIRA_LATENCY=0.05 MOCK_JIRA_429_RATE=0.05 \
+#       uvicorn benchmarks.mock_jira:app --port 9000
+#   JIRA_API_URL=http://127.0.0.1:9000 JIRA_BASE_URL=http://127.0.0.1:9000/rest/api/3 uvicorn app.main:app
+import asyncio
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PROJECTS = int(os.getenv("MOCK_JIRA_PROJECTS", "40"))
+ISSUES_PER_PROJECT = int(os.getenv("MOCK_JIRA_ISSUES", "250"))
+LATENCY = float(os.getenv("MOCK_JIRA_LATENCY", "0.05"))
+RATE_LIMIT_RATIO = float(os.getenv("MOCK_JIRA_429_RATE", "0"))
+MAX_RESULTS = 100
+
+app = FastAPI(title="Mock Jira")
+stats = {"requests": 0, "rate_limited": 0}
+touched = {}  # clave de issue -> fecha `updated` modificada con POST /_touch/{key}
+BASE_UPDATED = datetime(2025, 1, 2, 10, 0, tzinfo=timezone.utc)
+
+
+def _project(index):
+    return {"id": str(10000 + index), "key": f"P{index}", "name": f"Project {index}"}
+
+
+def _updated(issue_key):
+    number = int(issue_key.rsplit("-", 1)[1])
+    return touched.get(issue_key, BASE_UPDATED + timedelta(minutes=10 * number))
+
+
+def _jira_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
+def _issue(key, number):
+    issue_key = f"{key}-{number}"
+    return {
+        "id": issue_key,
+        "key": issue_key,
+        "fields": {
+            "summary": f"Issue {number} of {key}",
+            "description": {"type": "doc", "content": [
+                {"type": "paragraph", "content": [{"type": "text", "text": f"Description of {issue_key}"}]},
+            ]},
+            "status": {"name": ["To Do", "In Progress", "Done"][number % 3]},
+            "priority": {"name": ["Low", "Medium", "High"][number % 3]},
+            "issuetype": {"name": "Task"},
+            "labels": [],
+            "assignee": {"displayName": f"user{number % 7}", "emailAddress": f"user{number % 7}@example.com"},
+            "reporter": {"displayName": "reporter", "emailAddress": "reporter@example.com"},
+            "created": "2025-01-01T10:00:00.000+0000",
+            "updated": _jira_time(_updated(issue_key)),
+            "resolutiondate": None,
+            "duedate": None,
+            "startdate": None,
+        },
+    }
+
+
+def _page(items, request, key):
+    start_at = int(request.query_params.get("startAt", 0))
+    max_results = min(int(request.query_params.get("maxResults", 50)), MAX_RESULTS)
+    page = items[start_at:start_at + max_results]
+    return {key: page, "startAt": start_at, "maxResults": max_results, "total": len(items),
+            "isLast": start_at + max_results >= len(items)}
+
+
+@app.middleware("http")
+async def simulate_network(request: Request, call_next):
+    stats["requests"] += 1
+    await asyncio.sleep(LATENCY)
+    if RATE_LIMIT_RATIO and random.random() < RATE_LIMIT_RATIO:
+        stats["rate_limited"] += 1
+        return JSONResponse({"errorMessages": ["Rate limited"]}, status_code=429, headers={"Retry-After": "0.1"})
+    return await call_next(request)
+
+
+@app.get("/oauth/token/accessible-resources")
+def accessible_resources():
+    return [{"id": "mock-cloud", "name": "mock", "url": "http://mock.atlassian.net"}]
+
+
+@app.get("/ex/jira/{cloud_id}/rest/api/3/project/search")
+@app.get("/rest/api/3/project/search")
+def project_search(request: Request, cloud_id: str = ""):
+    return _page([_project(i) for i in range(PROJECTS)], request, "values")
+
+
+@app.get("/ex/jira/{cloud_id}/rest/api/3/search")
+@app.get("/rest/api/3/search")
+def search(request: Request, cloud_id: str = ""):
+    match = re.search(r'project="?([A-Za-z0-9_]+)"?', request.query_params.get("jql", ""))
+    key = match.group(1) if match else "P0"
+    issues = [_issue(key, n) for n in range(ISSUES_PER_PROJECT)]
+    window = re.search(r"updated >= -(\d+)m", request.query_params.get("jql", ""))
+    if window:
+        since = datetime.now(timezone.utc) - timedelta(minutes=int(window.group(1)))
+        issues = [issue for issue in issues if _updated(issue["key"]) >= since]
+    if "ORDER BY updated" in request.query_params.get("jql", ""):
+        issues.sort(key=lambda issue: _updated(issue["key"]))
+    return _page(issues, request, "issues")
+
+
+@app.post("/_touch/{issue_key}")
+def touch(issue_key: str):
+    # Simula una edición en Jira para probar la sincronización incremental
+    touched[issue_key] = datetime.now(timezone.utc)
+    return {"key": issue_key, "updated": _jira_time(touched[issue_key])}
+
+
+@app.get("/rest/agile/1.0/board")
+def boards():
+    return {"values": [{"id": i, "name": f"Board {i}", "type": "scrum"} for i in range(5)]}
+
+
+@app.get("/rest/agile/1.0/board/{board_id}/sprint")
+def sprints(board_id: int):
+    return {"values": [{"id": board_id * 100 + i, "name": f"Sprint {i}", "state": "closed"} for i in range(10)]}
+
+
+@app.get("/_stats")
+def get_stats():
+    return stats
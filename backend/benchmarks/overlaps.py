@@ -0,0 +1,83 @@
+# benchmarks/overlaps.py
+# Validación de solapes de un lote (core/intervals.py): tiempo del barrido
+# ordenado para un lote grande contra registros ya guardados, y comprobación de
+# que rechaza las mismas filas que la comparación de todos los pares en una
+# muestra pequeña.
+#
+#   python -m benchmarks.overlaps --entries 100000
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+from app.core.intervals import find_overlaps
+
+
+def random_entries(rng, count, users, days):
+    # Inicios en cuartos de hora entre las 8:00 y las 18:00, de 15 min a 3 h
+    for _ in range(count):
+        group = (rng.randrange(users), date(2024, 1, 1) + timedelta(days=rng.randrange(days)))
+        start = 8 * 60 + 15 * rng.randrange(40)
+        end = min(start + 15 * rng.randrange(1, 13), 23 * 60 + 59)
+        yield group, dtime(start // 60, start % 60), dtime(end // 60, end % 60)
+
+
+def brute_force(new, existing):
+    # Misma regla que find_overlaps, comparando cada par
+    conflicts = {}
+    for position, (group, start, end) in enumerate(new):
+        for other_group, other_start, other_end, entry_id in existing:
+            if group == other_group and start < other_end and other_start < end:
+                conflicts[position] = ("existing", entry_id)
+                break
+    kept = []
+    for position in sorted((p for p in range(len(new)) if p not in conflicts), key=lambda p: (new[p][0], new[p][1], p)):
+        group, start, end = new[position]
+        if any(group == new[k][0] and start < new[k][2] and new[k][1] < end for k in kept):
+            conflicts[position] = ("new", None)
+        else:
+            kept.append(position)
+    return set(conflicts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de solapes de registros de horas frente a comparar pares")
+    parser.add_argument("--entries", type=int, default=100_000, help="filas del lote")
+    parser.add_argument("--existing", type=int, default=100_000, help="registros ya guardados")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=2_000, help="filas de la comprobación contra fuerza bruta")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    new = list(random_entries(rng, args.entries, args.users, args.days))
+    existing = [(group, start, end, entry_id)
+                for entry_id, (group, start, end) in enumerate(random_entries(rng, args.existing, args.users, args.days), 1)]
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        conflicts = find_overlaps(new, existing)
+        timings.append(time.perf_counter() - started)
+
+    sample_new = list(random_entries(rng, args.sample, args.users // 50 or 1, 3))
+    sample_existing = [(group, start, end, entry_id) for entry_id, (group, start, end)
+                       in enumerate(random_entries(rng, args.sample // 4, args.users // 50 or 1, 3), 1)]
+    same = set(find_overlaps(sample_new, sample_existing)) == brute_force(sample_new, sample_existing)
+    print(json.dumps({
+        "entries": args.entries,
+        "existing": args.existing,
+        "rejected": len(conflicts),
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "brute_force_sample": args.sample,
+        "same_as_brute_force": same,
+    }, indent=2))
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/password_burst.py
+# Mide la latencia de una ruta ajena (por defecto GET /clients/) mientras se
+# crean usuarios en ráfaga, con el hash de bcrypt en línea (PASSWORD_HASH_WORKERS=0)
+# y en el pool de procesos. Con el pool, el p99 de la ruta sondeada debe mantenerse plano.
+#
+#   python -m benchmarks.password_burst --users 200 --concurrency 40
+import argparse
+import json
+import threading
+import time
+import uuid
+
+import requests
+
+from benchmarks.common import hammer, latency_summary, running_server
+
+
+def probe(url, stop, latencies, interval=0.01):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        session.get(url)
+        latencies.append(time.perf_counter() - started)
+        time.sleep(interval)
+
+
+def run_mode(workers, args):
+    with running_server(args.port, PASSWORD_HASH_WORKERS=workers) as base_url:
+        baseline = []
+        stop = threading.Event()
+        thread = threading.Thread(target=probe, args=(base_url + args.probe, stop, baseline))
+        thread.start()
+        time.sleep(args.baseline_seconds)
+        stop.set()
+        thread.join()
+
+        during = []
+        stop = threading.Event()
+        thread = threading.Thread(target=probe, args=(base_url + args.probe, stop, during))
+        thread.start()
+        run_id = uuid.uuid4().hex[:8]
+
+        def create(index, session):
+            name = f"bench-{run_id}-{index}"
+            return session.post(f"{base_url}/users/", json={
+                "username": name, "email": f"{name}@example.com", "role": "dev", "password_hash": "secret",
+            })
+
+        burst = hammer(create, args.users, args.concurrency)
+        stop.set()
+        thread.join()
+        return {
+            "hash_workers": workers,
+            "burst": burst,
+            "probe_idle": latency_summary(baseline),
+            "probe_during_burst": latency_summary(during),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de otras rutas durante una ráfaga de hashes bcrypt")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--probe", default="/clients/?limit=1")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    print(json.dumps({"inline": run_mode(0, args), "process_pool": run_mode(args.workers, args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
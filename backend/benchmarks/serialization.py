@@ -0,0 +1,125 @@
+# benchmarks/serialization.py
+# Coste de serializar una página de filas ORM por esquema *Out: la ruta estándar
+# de FastAPI (validar con pydantic + json) frente al modo rápido
+# (FAST_SERIALIZATION: dict directo de los atributos + orjson). No necesita base
+# de datos: las filas se construyen en memoria. Si alguna salida difiere entre
+# las dos rutas, el comando termina con código 1.
+#
+#   python -m benchmarks.serialization --rows 1000
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, time as dtime
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.serialization import fast_response, orjson
+from app.models import time_entry_models  # noqa: F401  (relaciones)
+from app.models.client_models import Client
+from app.models.project_models import Project
+from app.models.ticket_models import Ticket
+from app.models.time_entry_models import TimeEntry
+from app.models.user_models import User
+from app.schemas.client_schema import ClientOut
+from app.schemas.project_schema import ProjectOut
+from app.schemas.ticket_schema import TicketExpandedOut, TicketOut
+from app.schemas.time_entry_schema import TimeEntryOut
+from app.schemas.user_schema import UserOut
+
+
+def fake_value(column, i):
+    if "email" in column.key:
+        return f"row{i}@example.com"
+    python_type = column.type.python_type
+    if python_type is bool:
+        return True
+    if python_type is int:
+        return i + 1
+    if python_type is Decimal:
+        return Decimal(i % 800) / 100
+    if python_type is float:
+        return i / 7
+    if python_type is datetime:
+        return datetime(2024, 1, 1, 8, 30, i % 60, 123456)
+    if python_type is date:
+        return date(2024, 1, 1 + i % 28)
+    if python_type is dtime:
+        return dtime(9 + i % 8, 15)
+    return f"{column.key}-{i} ñandú"
+
+
+def fake_rows(model, count):
+    return [model(**{column.key: fake_value(column, i) for column in model.__table__.columns}) for i in range(count)]
+
+
+def expanded_tickets(count):
+    tickets = fake_rows(Ticket, count)
+    projects, clients, users = fake_rows(Project, count), fake_rows(Client, count), fake_rows(User, count)
+    for i, ticket in enumerate(tickets):
+        ticket.project, ticket.client = projects[i], clients[i]
+        ticket.assigned_to_user, ticket.reported_by_user = users[i], users[-1 - i]
+    return tickets
+
+
+def standard(rows, schema):
+    # Lo que hace FastAPI con response_model=List[schema] y JSONResponse
+    adapter = TypeAdapter(List[schema])
+    return JSONResponse(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")).body
+
+
+def fast(rows, schema):
+    return fast_response(rows, schema).body
+
+
+def timed(fn, rows, schema, repeat):
+    fn(rows, schema)  # calentamiento (compila adaptadores / getters)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(rows, schema)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialización por esquema: pydantic + json frente a orjson directo")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if orjson is None:
+        sys.exit("orjson is not installed")
+
+    cases = [
+        ("ClientOut", ClientOut, fake_rows(Client, args.rows)),
+        ("ProjectOut", ProjectOut, fake_rows(Project, args.rows)),
+        ("UserOut", UserOut, fake_rows(User, args.rows)),
+        ("TicketOut", TicketOut, fake_rows(Ticket, args.rows)),
+        ("TicketExpandedOut", TicketExpandedOut, expanded_tickets(args.rows)),
+        ("TimeEntryOut", TimeEntryOut, fake_rows(TimeEntry, args.rows)),
+    ]
+    report, identical = [], True
+    for name, schema, rows in cases:
+        standard_time, standard_body = timed(standard, rows, schema, args.repeat)
+        fast_time, fast_body = timed(fast, rows, schema, args.repeat)
+        same = json.loads(standard_body) == json.loads(fast_body)
+        identical &= same
+        report.append({
+            "schema": name,
+            "rows": args.rows,
+            "standard_ms": round(standard_time * 1000, 2),
+            "fast_ms": round(fast_time * 1000, 2),
+            "speedup": round(standard_time / fast_time, 1),
+            "bytes": len(fast_body),
+            "identical_output": same,
+        })
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/startup.py
+# Coste de arranque de un worker: tiempo de `import app.main` en un proceso
+# nuevo (mediana de varias ejecuciones, más los módulos que más tardan según
+# -X importtime) y arranque en frío de uvicorn hasta la primera respuesta de
+# /health/live y hasta que /health/ready da 200.
+#
+#   python -m benchmarks.startup --runs 5
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def import_seconds():
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top):
+    # -X importtime escribe en stderr: "import time: self [us] | cumulative | paquete"
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], check=True, capture_output=True, text=True)
+    # la sangría del nombre indica la profundidad: se listan app.main y lo que importa directamente
+    modules = []
+    for line in output.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[0].strip().isdigit():
+            depth = (len(parts[2]) - len(parts[2].lstrip()) - 1) // 2
+            if depth <= 1:
+                modules.append((int(parts[1]), parts[2].strip()))
+    modules.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(cumulative / 1000, 1)} for cumulative, name in modules[:top]]
+
+
+def poll(url, deadline, status=200):
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == status:
+                return time.monotonic()
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer {status}")
+
+
+def cold_start(port, timeout):
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        live = poll(f"{base_url}/health/live", started + timeout)
+        ready = poll(f"{base_url}/health/ready", started + timeout)
+        return live - started, ready - started
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación y arranque en frío de la API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--skip-server", action="store_true", help="solo mide la importación")
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    report = {
+        "import_ms": {"median": round(statistics.median(imports) * 1000, 1), "min": round(min(imports) * 1000, 1)},
+        "slowest_imports": slowest_imports(args.top),
+    }
+    if not args.skip_server:
+        starts = [cold_start(args.port, args.timeout) for _ in range(args.runs)]
+        report["first_response_ms"] = round(statistics.median(live for live, _ in starts) * 1000, 1)
+        report["ready_ms"] = round(statistics.median(ready for _, ready in starts) * 1000, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
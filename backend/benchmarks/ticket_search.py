@@ -0,0 +1,100 @@
+# benchmarks/ticket_search.py
+# Latencia de la búsqueda de texto completo de tickets (crud.search_tickets)
+# sobre DATABASE_URL. Completa la tabla hasta --rows tickets sintéticos si
+# hace falta (en PostgreSQL con generate_series) y mide consultas con términos
+# raros, frecuentes y combinados, más la segunda página por cursor.
+#
+#   python -m benchmarks.ticket_search --rows 1000000
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import SessionLocal
+from app.crud import ticket_crud
+from app.models import client_models, project_models, time_entry_models, user_models  # noqa: F401  (relaciones)
+from app.models.ticket_models import Ticket
+from benchmarks.common import latency_summary
+
+WORDS = [
+    "login", "error", "reporte", "horas", "factura", "cliente", "proyecto", "lento", "timeout", "exportar",
+    "usuario", "permiso", "correo", "jira", "sprint", "pantalla", "boton", "fecha", "calculo", "servidor",
+    "base", "datos", "sesion", "token", "pago", "pdf", "csv", "filtro", "busqueda", "rendimiento",
+]
+RARE_WORD = "kubernetes"
+QUERIES = ["login", "error servidor", "factura pdf", RARE_WORD, "rendimiento lento exportar csv"]
+
+
+def _seed_postgres(db, start, rows, batch=100_000):
+    words = "ARRAY[" + ",".join(f"'{word}'" for word in WORDS) + "]"
+    pick = f"({words})[1 + floor(random() * {len(WORDS)})::int]"
+    for offset in range(start, start + rows, batch):
+        stop = min(offset + batch, start + rows) - 1
+        db.execute(text(f"""
+            INSERT INTO tickets (ticket_number, title, description, priority, status, category)
+            SELECT 'BENCH-' || g,
+                   concat_ws(' ', {pick}, {pick}, {pick}),
+                   concat_ws(' ', {pick}, {pick}, {pick}, {pick}, {pick}, {pick}, {pick}, {pick},
+                             CASE WHEN g % 10000 = 0 THEN '{RARE_WORD}' END),
+                   'medium', 'Open', 'bug'
+            FROM generate_series({offset}, {stop}) AS g
+        """))
+        db.commit()
+
+
+def _seed_generic(db, start, rows, batch=10_000):
+    for offset in range(start, start + rows, batch):
+        db.execute(insert(Ticket), [
+            {
+                "ticket_number": f"BENCH-{i}",
+                "title": " ".join(random.choices(WORDS, k=3)),
+                "description": " ".join(random.choices(WORDS, k=8) + ([RARE_WORD] if i % 10000 == 0 else [])),
+                "priority": "medium", "status": "Open", "category": "bug",
+            }
+            for i in range(offset, min(offset + batch, start + rows))
+        ])
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de GET /tickets/search")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        existing = db.scalar(select(func.count()).select_from(Ticket))
+        if existing < args.rows:
+            started = time.perf_counter()
+            seed = _seed_postgres if db.get_bind().dialect.name == "postgresql" else _seed_generic
+            seed(db, existing, args.rows - existing)
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("ANALYZE tickets"))
+                db.commit()
+            print(f"seeded {args.rows - existing} tickets in {time.perf_counter() - started:.1f}s")
+
+        report = []
+        for q in QUERIES:
+            first, second = [], []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                hits = ticket_crud.search_tickets(db, q, args.limit)
+                first.append(time.perf_counter() - started)
+                if len(hits) >= args.limit:
+                    cursor = ticket_crud.TICKET_SEARCH_SORTS["rank"].encode(hits[-1])
+                    started = time.perf_counter()
+                    ticket_crud.search_tickets(db, q, args.limit, cursor=cursor)
+                    second.append(time.perf_counter() - started)
+            report.append({"q": q, "hits": len(hits), "page_1": latency_summary(first),
+                           "page_2": latency_summary(second) if second else None})
+        print(json.dumps({"tickets": max(existing, args.rows), "results": report}, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
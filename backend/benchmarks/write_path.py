@@ -0,0 +1,86 @@
+# benchmarks/write_path.py
+# Escrituras por segundo del camino anterior (SELECT + setattr + commit + refresh)
+# frente a UPDATE/DELETE ... RETURNING en una sola sentencia, sobre DATABASE_URL.
+#
+#   python -m benchmarks.write_path --rows 2000
+import argparse
+import json
+import time
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.crud import client_crud
+from app.models import project_models, ticket_models, time_entry_models, user_models  # noqa: F401  (relaciones)
+from app.models.client_models import Client
+from app.schemas.client_schema import ClientCreate, ClientUpdate
+
+
+def legacy_update(db, client_id, updates):
+    db_client = db.query(Client).filter(Client.client_id == client_id).first()
+    if not db_client:
+        return None
+    for key, value in updates.dict(exclude_unset=True).items():
+        setattr(db_client, key, value)
+    db.commit()
+    db.refresh(db_client)
+    return db_client
+
+
+def legacy_delete(db, client_id):
+    db_client = db.query(Client).filter(Client.client_id == client_id).first()
+    if not db_client:
+        return None
+    db.delete(db_client)
+    db.commit()
+    return db_client
+
+
+def measure(label, ids, write):
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", listener)
+    started = time.perf_counter()
+    for client_id in ids:
+        # Sesión nueva por escritura, como en una petición HTTP
+        db = SessionLocal()
+        try:
+            write(db, client_id)
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", listener)
+    return {
+        "path": label,
+        "writes": len(ids),
+        "writes_per_second": round(len(ids) / elapsed, 1),
+        "statements_per_write": round(len(statements) / len(ids), 2),
+    }
+
+
+def seed(rows):
+    db = SessionLocal()
+    try:
+        return [client_crud.create_client(db, ClientCreate(name=f"bench-{i}")).client_id for i in range(rows)]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escrituras por segundo: ORM clásico vs RETURNING")
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    update = ClientUpdate(name="renamed")
+    legacy_ids, returning_ids = seed(args.rows), seed(args.rows)
+    report = [
+        measure("legacy_update", legacy_ids, lambda db, i: legacy_update(db, i, update)),
+        measure("returning_update", returning_ids, lambda db, i: client_crud.update_client(db, i, update)),
+        measure("legacy_delete", legacy_ids, legacy_delete),
+        measure("returning_delete", returning_ids, client_crud.delete_client),
+    ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
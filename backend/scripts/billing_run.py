@@ -0,0 +1,47 @@
+# scripts/billing_run.py
+# Cierre de facturación (p. ej. desde cron a primeros de mes): genera los
+# borradores de factura del periodo, igual que POST /payments/billing-runs.
+#
+#   python -m scripts.billing_run                    # mes anterior
+#   python -m scripts.billing_run --month 2024-01 --client-id 3
+#   python -m scripts.billing_run --period-start 2024-01-01 --period-end 2024-03-31
+import argparse
+import json
+from datetime import date, timedelta
+
+from app.core.database import SessionLocal
+from app.crud.payment_crud import run_billing
+from app.models import client_models, ticket_models, user_models  # noqa: F401  (relaciones)
+from app.schemas.payment_schema import BillingRunCreate
+
+
+def month_period(month: str = None):
+    if month:
+        first = date.fromisoformat(f"{month}-01")
+    else:
+        first = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera los borradores de factura de un periodo")
+    parser.add_argument("--month", help="YYYY-MM (por defecto, el mes anterior)")
+    parser.add_argument("--period-start", type=date.fromisoformat)
+    parser.add_argument("--period-end", type=date.fromisoformat)
+    parser.add_argument("--client-id", type=int)
+    args = parser.parse_args()
+    period_start, period_end = month_period(args.month)
+    run = BillingRunCreate(period_start=args.period_start or period_start, period_end=args.period_end or period_end,
+                           client_id=args.client_id)
+
+    db = SessionLocal()
+    try:
+        result = run_billing(db, run.period_start, run.period_end, run.client_id)
+    finally:
+        db.close()
+    print(json.dumps(result, default=str, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# scripts/bootstrap_db.py
+# Crea el esquema (tablas, índices, búsqueda de texto completo) antes de
+# arrancar la API; la aplicación ya no ejecuta create_all al importarse.
+# Es idempotente: en una base existente solo añade lo que falte, y recalcula
+# time_entry_rollups si no cuadra con time_entries (p. ej. bases anteriores a la tabla).
+#
+#   python -m scripts.bootstrap_db
+from app.core.database import Base, SessionLocal, engine
+from app.crud.report_crud import rebuild_rollups, rollups_out_of_date
+from app.models import client_models, jira_sync_models, payment_models, project_models, report_models, ticket_models, time_entry_models, user_models  # noqa: F401  (todas las tablas)
+from scripts import create_indexes
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    print(f"tables ready: {', '.join(table.name for table in Base.metadata.sorted_tables)}")
+    # create_all no toca tablas existentes: los índices nuevos se crean aparte
+    create_indexes.main()
+    with SessionLocal() as db:
+        if rollups_out_of_date(db):
+            print(f"time_entry_rollups rebuilt: {rebuild_rollups(db)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# scripts/create_indexes.py
+# create_all no añade índices a tablas que ya existen: este comando crea los
+# índices declarados en los modelos que falten en la base de datos, el
+# índice de búsqueda de texto completo de tickets y las restricciones de solapes
+# y de hora de fin posterior a la de inicio de los registros de horas.
+#
+#   python -m scripts.create_indexes
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import Base, engine
+from app.models import client_models, payment_models, project_models, ticket_models, time_entry_models, user_models  # noqa: F401  (relaciones)
+from app.models.ticket_models import create_ticket_search
+from app.models.time_entry_models import create_time_entry_check, create_time_entry_overlap
+
+
+def main():
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(engine)
+                print(f"{table.name}: created {index.name}")
+    if "tickets" in tables:
+        with engine.begin() as connection:
+            create_ticket_search(connection)
+        print("tickets: full-text search index ready")
+    if "time_entries" in tables:
+        try:
+            with engine.begin() as connection:
+                create_time_entry_overlap(connection)
+            print("time_entries: overlap constraint ready")
+        except DBAPIError as exc:
+            # PostgreSQL no crea la restricción si ya hay registros solapados: hay que corregirlos antes
+            print(f"time_entries: overlap constraint not created, fix the overlapping entries first: {exc.orig}")
+        checks = {check["name"] for check in inspector.get_check_constraints("time_entries")}
+        try:
+            with engine.begin() as connection:
+                ready = "ck_time_entries_end_after_start" in checks or create_time_entry_check(connection)
+            if ready:
+                print("time_entries: end-after-start constraint ready")
+            else:
+                print(f"time_entries: end-after-start constraint missing, {engine.dialect.name} cannot add it to an existing table")
+        except DBAPIError as exc:
+            # Igual que los solapes: con registros que acaban antes de empezar no se crea
+            print(f"time_entries: end-after-start constraint not created, fix the entries ending before they start first: {exc.orig}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# scripts/explain_filters.py
+# Comprueba con EXPLAIN que cada filtro de GET /tickets/ y GET /time-entries/
+# se resuelve con su índice y no con un recorrido completo de la tabla.
+#
+#   python -m scripts.explain_filters
+#
+# En PostgreSQL con tablas pequeñas el planificador prefiere un Seq Scan aunque
+# exista el índice; por debajo de --min-rows se desactiva enable_seqscan para
+# comprobar que el índice es utilizable por la consulta.
+import argparse
+import json
+import sys
+from datetime import date
+
+from sqlalchemy import func, select, text
+
+from app.core.database import SessionLocal
+from app.crud.ticket_crud import ticket_filters
+from app.crud.time_entry_crud import time_entry_filters
+from app.models import client_models, project_models, ticket_models, time_entry_models, user_models  # noqa: F401  (relaciones)
+from app.models.ticket_models import Ticket
+from app.models.time_entry_models import TimeEntry
+from app.schemas.ticket_schema import TicketFilter
+from app.schemas.time_entry_schema import TimeEntryFilter
+
+# (modelo, columna de orden, filtro, índices aceptables)
+CASES = [
+    (Ticket, Ticket.ticket_id, TicketFilter(assigned_to_user_id=1), {"ix_tickets_assignee_status", "ix_tickets_open_assignee_due"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(assigned_to_user_id=1, status=["Open"]), {"ix_tickets_assignee_status"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(reported_by_user_id=1), {"ix_tickets_reporter"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(project_id=1), {"ix_tickets_project_status"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(project_id=1, status=["Open", "In Progress"]), {"ix_tickets_project_status"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(client_id=1), {"ix_tickets_client"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(due_from=date(2025, 1, 1), due_to=date(2025, 1, 31)), {"ix_tickets_due_date"}),
+    (Ticket, Ticket.ticket_id, TicketFilter(assigned_to_user_id=1, open=True), {"ix_tickets_open_assignee_due", "ix_tickets_assignee_status"}),
+    (TimeEntry, TimeEntry.entry_id, TimeEntryFilter(user_id=1), {"ix_time_entries_user_date"}),
+    (TimeEntry, TimeEntry.entry_id, TimeEntryFilter(user_id=1, date_from=date(2025, 1, 1), date_to=date(2025, 1, 31)), {"ix_time_entries_user_date"}),
+    (TimeEntry, TimeEntry.entry_id, TimeEntryFilter(project_id=1, date_from=date(2025, 1, 1)), {"ix_time_entries_project_date"}),
+    (TimeEntry, TimeEntry.entry_id, TimeEntryFilter(date_from=date(2025, 1, 1), date_to=date(2025, 1, 7)), {"ix_time_entries_date", "ix_time_entries_status_date"}),
+    (TimeEntry, TimeEntry.entry_id, TimeEntryFilter(status=["pending"], date_from=date(2025, 1, 1)), {"ix_time_entries_status_date", "ix_time_entries_date"}),
+]
+
+
+def _filters(model, filters):
+    return ticket_filters(filters) if model is Ticket else time_entry_filters(filters)
+
+
+def _pg_indexes(plan):
+    found = set()
+    if "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= _pg_indexes(child)
+    return found
+
+
+def explain(db, stmt):
+    sql = str(stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    if db.get_bind().dialect.name == "postgresql":
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+        return _pg_indexes(plan), json.dumps(plan)
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    details = [row[-1] for row in rows]
+    found = {detail.split(" INDEX ")[1].split(" ")[0] for detail in details if " INDEX " in detail}
+    return found, "; ".join(details)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN de los filtros de listados")
+    parser.add_argument("--min-rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("ANALYZE tickets"))
+            db.execute(text("ANALYZE time_entries"))
+            rows = min(db.scalar(select(func.count()).select_from(model)) for model in (Ticket, TimeEntry))
+            if rows < args.min_rows:
+                db.execute(text("SET LOCAL enable_seqscan = off"))
+        for model, order_column, filters, expected in CASES:
+            stmt = select(model).where(*_filters(model, filters)).order_by(order_column).limit(100)
+            used, plan = explain(db, stmt)
+            ok = bool(used & expected)
+            failures += not ok
+            label = filters.model_dump(exclude_none=True)
+            print(f"{'ok  ' if ok else 'FAIL'} {model.__tablename__} {label} -> {', '.join(sorted(used)) or 'no index'}")
+            if not ok:
+                print(f"     {plan}")
+    finally:
+        db.rollback()
+        db.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# scripts/generate_dataset.py
+# Genera un dataset sintético de SmartPlanner (clientes, proyectos, usuarios,
+# tickets y registros de horas) para benchmarks y pruebas de carga. Los ids se
+# asignan en el script a continuación de los existentes, así que las claves
+# foráneas se conocen sin leer nada de vuelta y el resultado es reproducible con
+# la misma --seed. En PostgreSQL se carga con COPY; en otros backends con
+# inserciones por lotes. Los registros de horas de un usuario nunca se solapan.
+#
+#   python -m scripts.bootstrap_db
+#   python -m scripts.generate_dataset --scale small
+#   python -m scripts.generate_dataset --scale production     # 1k/20k/2k/1M/10M
+#   python -m scripts.generate_dataset --scale small --tickets 200000
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import SessionLocal, engine
+from app.core.security import _hash
+from app.crud.report_crud import rebuild_rollups
+from app.models import time_entry_models  # noqa: F401  (relaciones)
+from app.models.client_models import Client
+from app.models.project_models import Project
+from app.models.ticket_models import Ticket
+from app.models.time_entry_models import TimeEntry
+from app.models.user_models import User
+
+SCALES = {
+    "tiny": {"clients": 10, "projects": 50, "users": 20, "tickets": 1_000, "time_entries": 10_000},
+    "small": {"clients": 100, "projects": 2_000, "users": 200, "tickets": 50_000, "time_entries": 500_000},
+    "production": {"clients": 1_000, "projects": 20_000, "users": 2_000, "tickets": 1_000_000, "time_entries": 10_000_000},
+}
+# Contraseña de todos los usuarios generados (para POST /users/login en los benchmarks)
+PASSWORD = "benchmark"
+
+PROJECT_TYPES = ["development", "support", "meeting", "training", "other"]
+PROJECT_STATUSES = ["active", "paused", "completed", "archived"]
+ROLES = ["dev", "dev", "dev", "lead", "admin"]
+TICKET_STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+PRIORITIES = ["low", "medium", "high", "critical"]
+CATEGORIES = ["bug", "feature", "support", "task"]
+ACTIVITY_TYPES = ["development", "meeting", "support", "review", "training"]
+ENTRY_STATUSES = ["draft", "submitted", "approved"]
+WORDS = ("deploy error cliente factura informe sprint login lento exportar pantalla pago usuario "
+         "proyecto migración base datos reporte horas jira integración correo permiso").split()
+# Cuatro franjas de dos horas por día laborable: los registros de un usuario no se solapan
+SLOTS = [(dtime(9), dtime(11)), (dtime(11), dtime(13)), (dtime(14), dtime(16)), (dtime(16), dtime(18))]
+FIRST_MONDAY = date(2022, 1, 3)
+EPOCH = datetime(2022, 1, 3, 8, 0)
+
+
+def business_day(index):
+    weeks, weekday = divmod(index, 5)
+    return FIRST_MONDAY + timedelta(days=weeks * 7 + weekday)
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def next_id(db, column):
+    return (db.scalar(select(func.max(column))) or 0) + 1
+
+
+def clients(rng, first, count):
+    for client_id in range(first, first + count):
+        yield {"client_id": client_id, "name": f"Cliente {client_id}", "is_active": rng.random() > 0.05}
+
+
+def users(rng, first, count, password_hash):
+    for user_id in range(first, first + count):
+        yield {
+            "user_id": user_id, "username": f"gen-user-{user_id}", "full_name": f"Usuario {user_id}",
+            "email": f"gen-user-{user_id}@example.com", "password_hash": password_hash,
+            "role": rng.choice(ROLES), "is_active": rng.random() > 0.03,
+        }
+
+
+def projects(rng, first, count, client_ids):
+    for project_id in range(first, first + count):
+        start = business_day(rng.randrange(1000))
+        yield {
+            "project_id": project_id, "client_id": client_ids[0] + project_id % len(client_ids),
+            "name": f"Proyecto {project_id}", "code": f"G{project_id}", "description": sentence(rng, 12),
+            "project_type": rng.choice(PROJECT_TYPES), "status": rng.choice(PROJECT_STATUSES),
+            "start_date": start, "end_date": start + timedelta(days=rng.randrange(30, 400)),
+        }
+
+
+def tickets(rng, first, count, project_ids, client_ids, user_ids):
+    for ticket_id in range(first, first + count):
+        project_id = rng.choice(project_ids)
+        created = EPOCH + timedelta(minutes=rng.randrange(2_000_000))
+        status = rng.choices(TICKET_STATUSES, weights=(30, 20, 20, 30))[0]
+        closed = created + timedelta(hours=rng.randrange(1, 2000)) if status in ("Resolved", "Closed") else None
+        yield {
+            "ticket_id": ticket_id, "ticket_number": f"GEN-{ticket_id}", "project_id": project_id,
+            # mismo reparto que projects(): el cliente del ticket es el del proyecto
+            "client_id": client_ids[0] + project_id % len(client_ids),
+            "reported_by_user_id": rng.choice(user_ids), "assigned_to_user_id": rng.choice(user_ids),
+            "title": sentence(rng, 6), "description": sentence(rng, 40),
+            "priority": rng.choice(PRIORITIES), "status": status, "category": rng.choice(CATEGORIES),
+            "due_date": (created + timedelta(days=rng.randrange(1, 60))).date(),
+            "resolution_description": sentence(rng, 15) if closed else None,
+            "created_at": created, "updated_at": closed or created,
+            "resolved_at": closed, "closed_at": closed if status == "Closed" else None,
+        }
+
+
+def time_entries(rng, first, count, project_ids, user_ids):
+    for index in range(count):
+        # El i-ésimo registro es del usuario i % n, en la franja siguiente a la de su registro anterior
+        day, slot = divmod(index // len(user_ids), len(SLOTS))
+        start, end = SLOTS[slot]
+        entry_date = business_day(day)
+        created = datetime.combine(entry_date, end)
+        yield {
+            "entry_id": first + index, "user_id": user_ids[index % len(user_ids)], "project_id": rng.choice(project_ids),
+            "entry_date": entry_date, "activity_type": rng.choice(ACTIVITY_TYPES),
+            "start_time": start, "end_time": end, "description": sentence(rng, 8),
+            "status": rng.choices(ENTRY_STATUSES, weights=(10, 30, 60))[0],
+            "created_at": created, "updated_at": created,
+        }
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy(connection, table, batch):
+    # COPY ... FROM STDIN en CSV: un viaje por lote y sin parsear SQL por fila
+    columns = list(batch[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow(["" if value is None else value for value in row.values()])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def load(table, rows, batch_size):
+    started, total = time.perf_counter(), 0
+    with engine.begin() as connection:
+        use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+        for batch in batches(rows, batch_size):
+            if use_copy:
+                _copy(connection, table, batch)
+            else:
+                connection.execute(insert(table), batch)
+            total += len(batch)
+        if connection.dialect.name == "postgresql":
+            # Los ids se asignaron aquí: la secuencia tiene que seguir desde el máximo
+            pk = table.primary_key.columns.values()[0].name
+            connection.execute(text(f"SELECT setval(pg_get_serial_sequence('{table.name}', '{pk}'), (SELECT MAX({pk}) FROM {table.name}))"))
+    elapsed = time.perf_counter() - started
+    print(f"{table.name}: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset sintético para benchmarks")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help="sustituye el valor de --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    counts = {name: getattr(args, name) or default for name, default in SCALES[args.scale].items()}
+
+    db = SessionLocal()
+    try:
+        first = {
+            "clients": next_id(db, Client.client_id), "users": next_id(db, User.user_id),
+            "projects": next_id(db, Project.project_id), "tickets": next_id(db, Ticket.ticket_id),
+            "time_entries": next_id(db, TimeEntry.entry_id),
+        }
+    finally:
+        db.close()
+    ids = {name: range(first[name], first[name] + counts[name]) for name in ("clients", "users", "projects")}
+    # Un generador por tabla: cambiar el tamaño de una no altera el contenido de las demás
+    rng = lambda offset: random.Random(args.seed * 100 + offset)
+
+    load(Client.__table__, clients(rng(1), first["clients"], counts["clients"]), args.batch_size)
+    load(User.__table__, users(rng(2), first["users"], counts["users"], _hash(PASSWORD)), args.batch_size)
+    load(Project.__table__, projects(rng(3), first["projects"], counts["projects"], ids["clients"]), args.batch_size)
+    load(Ticket.__table__, tickets(rng(4), first["tickets"], counts["tickets"], ids["projects"], ids["clients"], ids["users"]), args.batch_size)
+    load(TimeEntry.__table__, time_entries(rng(5), first["time_entries"], counts["time_entries"], ids["projects"], ids["users"]), args.batch_size)
+
+    db = SessionLocal()
+    try:
+        print(f"time_entry_rollups rebuilt: {rebuild_rollups(db)} rows")
+    finally:
+        db.close()
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+# scripts/rebuild_rollups.py
+# Recalcula time_entry_rollups desde cero a partir de time_entries.
+#
+#   python -m scripts.rebuild_rollups
+from app.core.database import SessionLocal
+from app.crud.report_crud import rebuild_rollups
+
+
+def main():
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db)
+    finally:
+        db.close()
+    print(f"time_entry_rollups rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# tests/conftest.py
+# La configuración se lee al importar app.core.config: el entorno se fija antes
+# de importar la aplicación. Cada sesión de pytest usa una base SQLite nueva y
+# QUERY_BUDGET_MODE=strict, así que una ruta que supera su presupuesto de
+# sentencias (o con N+1) responde 500 y su test falla.
+import os
+import socket
+import tempfile
+import threading
+import time
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="smartplanner-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_path}"
+os.environ.setdefault("DB_ASYNC", "0")
+os.environ["QUERY_BUDGET_MODE"] = "strict"
+os.environ.setdefault("N_PLUS_ONE_THRESHOLD", "5")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("JIRA_SYNC_INTERVAL", "0")
+
+# Jira apunta a benchmarks/mock_jira.py (fixture mock_jira), en un puerto libre
+with socket.socket() as _socket:
+    _socket.bind(("127.0.0.1", 0))
+    MOCK_JIRA_URL = f"http://127.0.0.1:{_socket.getsockname()[1]}"
+os.environ["JIRA_API_URL"] = MOCK_JIRA_URL
+os.environ["JIRA_BASE_URL"] = f"{MOCK_JIRA_URL}/rest/api/3"
+os.environ["JIRA_PAGE_SIZE"] = "10"
+os.environ["MOCK_JIRA_PROJECTS"] = "3"
+os.environ["MOCK_JIRA_ISSUES"] = "25"
+os.environ["MOCK_JIRA_LATENCY"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+CLIENTS = 3
+TICKETS = 6
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.main import app
+    from scripts import bootstrap_db
+
+    bootstrap_db.main()
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _post(client, path, payload):
+    response = client.post(path, json=payload)
+    assert response.status_code == 200, (path, response.status_code, response.text)
+    return response.json()
+
+
+@pytest.fixture(scope="session")
+def seeded(client):
+    """Varias filas por tabla, cada una con relaciones distintas: un N+1 se nota en el recuento."""
+    ids = {"clients": [], "projects": [], "users": [], "tickets": [], "time_entries": []}
+    for i in range(CLIENTS):
+        client_id = _post(client, "/clients/", {"name": f"client-{i}"})["client_id"]
+        ids["clients"].append(client_id)
+        ids["projects"].append(_post(client, "/projects/", {
+            "client_id": client_id, "name": f"project-{i}", "project_type": "development", "status": "active",
+        })["project_id"])
+        ids["users"].append(_post(client, "/users/", {
+            "username": f"user-{i}", "email": f"user-{i}@example.com", "role": "dev", "password_hash": "secret",
+        })["user_id"])
+    for i in range(TICKETS):
+        n = i % CLIENTS
+        ids["tickets"].append(_post(client, "/tickets/", {
+            "ticket_number": f"T-{i}", "project_id": ids["projects"][n], "client_id": ids["clients"][n],
+            "reported_by_user_id": ids["users"][n], "assigned_to_user_id": ids["users"][-1 - n],
+            "title": f"Ticket {i}", "description": "login page fails", "priority": "low", "status": "Open", "category": "bug",
+        })["ticket_id"])
+        ids["time_entries"].append(_post(client, "/time-entries/", {
+            "user_id": ids["users"][n], "project_id": ids["projects"][n], "entry_date": f"2026-01-{5 + i:02d}",
+            "activity_type": "development", "start_time": "09:00", "end_time": "11:30", "status": "approved",
+        })["entry_id"])
+    _post(client, "/payments/rate-cards", {"hourly_rate": "100.00"})
+    run = _post(client, "/payments/billing-runs", {"period_start": "2026-01-01", "period_end": "2026-01-31"})
+    ids["invoices"] = run["invoice_ids"]
+    _post(client, f"/payments/invoices/{ids['invoices'][0]}/issue", {})
+    _post(client, f"/payments/invoices/{ids['invoices'][0]}/payments", {"amount": "50", "paid_on": "2026-02-01", "method": "wire"})
+    return ids
+
+
+@pytest.fixture(scope="session")
+def mock_jira():
+    """Servidor Jira simulado en un hilo; devuelve el módulo (stats, touched)."""
+    import uvicorn
+    from benchmarks import mock_jira as module
+
+    port = int(MOCK_JIRA_URL.rsplit(":", 1)[1])
+    server = uvicorn.Server(uvicorn.Config(module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield module
+    server.should_exit = True
+    thread.join()
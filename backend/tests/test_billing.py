@@ -0,0 +1,110 @@
+# Resolución de tarifas de core/billing.py
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.billing import NO_RATE, RATE_LEVELS, _card_level, epoch_days, resolve_rates
+
+PROJECT, CLIENT = 7, 3
+ACTIVITIES = {"development": 1, "meeting": 2}
+DAY = date(2026, 1, 15)
+
+
+def rates_for(rate_cards, days, project=PROJECT, client=CLIENT, activity="development"):
+    n = len(days)
+    return resolve_rates(
+        rate_cards, ACTIVITIES, np.full(n, project, dtype=np.int64), np.full(n, client, dtype=np.int64),
+        np.full(n, ACTIVITIES[activity], dtype=np.int64), np.array([epoch_days(day) for day in days], dtype=np.int64),
+    ).tolist()
+
+
+def card(cents, client_id=None, project_id=None, activity_type=None, valid_from=None, valid_to=None):
+    return (client_id, project_id, activity_type, cents, valid_from, valid_to)
+
+
+def test_expired_override_falls_back_to_older_card_of_same_level():
+    cards = [card(10000), card(20000, valid_from=DAY, valid_to=DAY)]
+    days = [DAY - timedelta(days=1), DAY, DAY + timedelta(days=1)]
+    assert rates_for(cards, days) == [10000, 20000, 10000]
+
+
+def test_latest_start_wins_and_ties_go_to_the_later_card():
+    cards = [card(10000, valid_from=date(2026, 1, 1)), card(12000, valid_from=date(2026, 1, 10)),
+             card(11000, valid_from=date(2026, 1, 1), valid_to=date(2026, 1, 31)), card(13000, valid_from=date(2026, 1, 10))]
+    assert rates_for(cards, [date(2026, 1, 5), date(2026, 1, 10), date(2026, 2, 5)]) == [11000, 13000, 13000]
+
+
+def test_no_valid_card_is_unrated():
+    cards = [card(10000, valid_from=date(2026, 2, 1)), card(20000, valid_to=date(2025, 12, 31))]
+    assert rates_for(cards, [DAY]) == [NO_RATE]
+
+
+LEVEL_CARDS = [
+    card(600, project_id=PROJECT, activity_type="development"),
+    card(500, project_id=PROJECT),
+    card(400, client_id=CLIENT, activity_type="development"),
+    card(300, client_id=CLIENT),
+    card(200, activity_type="development"),
+    card(100),
+]
+
+
+def test_level_cards_cover_every_level_in_order():
+    assert [_card_level(rate_card) for rate_card in LEVEL_CARDS] == list(RATE_LEVELS)
+
+
+@pytest.mark.parametrize("level", range(len(LEVEL_CARDS)))
+def test_most_specific_level_wins(level):
+    # Las tarifas de los niveles más específicos que `level` no existen; las demás sí
+    cards = LEVEL_CARDS[level:]
+    assert rates_for(cards, [DAY]) == [LEVEL_CARDS[level][3]]
+    # El orden de creación no cambia la precedencia entre niveles
+    assert rates_for(cards[::-1], [DAY]) == [LEVEL_CARDS[level][3]]
+
+
+@pytest.mark.parametrize("level", range(len(LEVEL_CARDS) - 1))
+def test_expired_level_falls_back_to_the_next(level):
+    client_id, project_id, activity_type, cents = LEVEL_CARDS[level][:4]
+    expired = card(cents, client_id, project_id, activity_type, valid_to=DAY - timedelta(days=1))
+    assert rates_for([expired, *LEVEL_CARDS[level + 1:]], [DAY]) == [LEVEL_CARDS[level + 1][3]]
+
+
+def test_cards_of_other_owners_and_activities_do_not_apply():
+    cards = [card(900, project_id=PROJECT + 1), card(800, client_id=CLIENT + 1), card(700, project_id=PROJECT, activity_type="meeting"),
+             card(100)]
+    assert rates_for(cards, [DAY]) == [100]
+    assert rates_for(cards, [DAY], activity="meeting") == [700]
+
+
+def _reference_rate(rate_cards, project, client, activity, day):
+    for level in RATE_LEVELS:
+        owner, by_activity = level
+        valid = [
+            (c[4] or date.min, position, c[3]) for position, c in enumerate(rate_cards)
+            if _card_level(c) == level
+            and (owner is None or (c[1] if owner == "project" else c[0]) == (project if owner == "project" else client))
+            and (not by_activity or c[2] == activity)
+            and (c[4] is None or c[4] <= day) and (c[5] is None or c[5] >= day)
+        ]
+        if valid:
+            return max(valid)[2]
+    return NO_RATE
+
+
+def test_matches_reference_implementation():
+    generator = random.Random(25)
+    base = date(2026, 1, 1)
+    for _ in range(200):
+        cards = []
+        for _ in range(generator.randint(1, 12)):
+            start = base + timedelta(days=generator.randint(0, 30)) if generator.random() < 0.7 else None
+            end = (start or base) + timedelta(days=generator.randint(0, 20)) if generator.random() < 0.5 else None
+            cards.append(card(generator.randint(1, 50) * 100, client_id=generator.choice([None, CLIENT, CLIENT + 1]),
+                              project_id=generator.choice([None, None, PROJECT, PROJECT + 1]),
+                              activity_type=generator.choice([None, "development", "meeting"]), valid_from=start, valid_to=end))
+        days = [base + timedelta(days=offset) for offset in range(0, 45)]
+        for activity in ACTIVITIES:
+            expected = [_reference_rate(cards, PROJECT, CLIENT, activity, day) for day in days]
+            assert rates_for(cards, days, activity=activity) == expected, cards
@@ -0,0 +1,100 @@
+# POST /time-entries/bulk: JSON o CSV por partes, bloques con un INSERT multi-fila
+# y reintento fila a fila en SAVEPOINTs cuando un bloque falla
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.time_entry_models import TimeEntry
+from app.routers import time_entry_router
+
+
+@pytest.fixture
+def user_id(client, seeded):
+    # Un usuario por test: sus registros no se solapan con los de otros tests
+    n = len(client.get("/users/?limit=1000").json())
+    return client.post("/users/", json={"username": f"bulk-{n}", "email": f"bulk-{n}@example.com", "role": "dev",
+                                        "password_hash": "secret"}).json()["user_id"]
+
+
+def entry(user_id, project_id, day="2026-04-01", start="09:00", end="10:00", **values):
+    return {"user_id": user_id, "project_id": project_id, "entry_date": day, "activity_type": "development",
+            "start_time": start, "end_time": end, "status": "draft", **values}
+
+
+def stored(user_id):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(TimeEntry).where(TimeEntry.user_id == user_id))
+
+
+def chunked(data: bytes, size=7):
+    # Cuerpo enviado por partes pequeñas: ningún elemento llega entero en un trozo
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.parametrize("method", ["insert", "copy"])
+def test_bulk_inserts_every_row(client, seeded, user_id, method):
+    rows = [entry(user_id, seeded["projects"][0], day=f"2026-04-{day:02d}") for day in range(1, 6)]
+    result = client.post(f"/time-entries/bulk?method={method}", json=rows).json()
+    # En SQLite no hay COPY: method=copy cae al INSERT multi-fila y devuelve los ids
+    assert result["inserted"] == 5
+    assert len(result["entry_ids"]) == 5
+    assert result["errors"] == []
+    assert stored(user_id) == 5
+
+
+def test_bulk_json_is_parsed_incrementally(client, seeded, user_id):
+    import json
+
+    rows = [entry(user_id, seeded["projects"][0], day=f"2026-04-{day:02d}", description="a, b ] {c}") for day in (1, 2)]
+    response = client.post("/time-entries/bulk", content=chunked(json.dumps(rows).encode()),
+                           headers={"content-type": "application/json"})
+    assert response.json()["inserted"] == 2
+
+
+def test_bulk_csv_with_bom(client, seeded, user_id):
+    project_id = seeded["projects"][0]
+    body = ("﻿user_id,project_id,entry_date,activity_type,start_time,end_time,status,description\n"
+            f"{user_id},{project_id},2026-04-01,development,09:00,10:00,draft,\"multi\nline\"\n"
+            f"{user_id},{project_id},2026-04-02,development,09:00,10:00,draft,\n").encode("utf-8")
+    response = client.post("/time-entries/bulk", content=chunked(body), headers={"content-type": "text/csv"})
+    assert response.json() == {"inserted": 2, "entry_ids": response.json()["entry_ids"], "errors": []}
+
+
+def test_bulk_partial_failure_keeps_the_valid_rows(client, seeded, user_id):
+    rows = [entry(user_id, seeded["projects"][0], day="2026-04-01"),
+            entry(user_id, 999999, day="2026-04-02"),
+            entry(user_id, seeded["projects"][0], day="2026-04-03", end="08:00"),
+            entry(user_id, seeded["projects"][0], day="2026-04-04")]
+    result = client.post("/time-entries/bulk", json=rows).json()
+    # La FK rechaza la fila 1 en su SAVEPOINT; la 2 no pasa la validación del esquema
+    assert result["inserted"] == 2
+    assert stored(user_id) == 2
+    errors = {error["index"]: error["errors"] for error in result["errors"]}
+    assert set(errors) == {1, 2}
+    # Mensaje genérico por SQLSTATE, sin el texto del driver
+    assert errors[1] == ["The record references a missing record or is still referenced"]
+
+
+def test_bulk_rejects_overlapping_rows(client, seeded, user_id, monkeypatch):
+    project_id = seeded["projects"][0]
+    existing = client.post("/time-entries/", json=entry(user_id, project_id, start="08:00", end="09:00")).json()
+    # Bloques de 2 filas: el solape con un bloque anterior se ve porque ya está guardado
+    monkeypatch.setattr(time_entry_router, "BULK_CHUNK_SIZE", 2)
+    rows = [entry(user_id, project_id, start="08:30", end="09:30"),
+            entry(user_id, project_id, start="10:00", end="11:00"),
+            entry(user_id, project_id, start="10:30", end="12:00"),
+            entry(user_id, project_id, start="09:00", end="10:00")]
+    result = client.post("/time-entries/bulk", json=rows).json()
+    assert result["inserted"] == 2
+    assert {error["index"]: error["errors"] for error in result["errors"]} == {
+        0: [f"overlaps existing time entry {existing['entry_id']}"],
+        2: ["overlaps existing time entry " + str(result["entry_ids"][0])],
+    }
+    assert stored(user_id) == 3
+
+
+@pytest.mark.parametrize(("body", "status_code"), [(b'{"user_id": 1}', 422), (b"[{}", 400), (b"not json", 422), (b"", 400)])
+def test_bulk_rejects_a_body_that_is_not_a_json_array(client, body, status_code):
+    response = client.post("/time-entries/bulk", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == status_code
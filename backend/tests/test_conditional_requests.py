@@ -0,0 +1,72 @@
+# Peticiones condicionales: ETag / If-None-Match y Last-Modified / If-Modified-Since
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+
+from app.core.etag import coded_etag
+
+ITEM_PATHS = ["/projects/{projects[0]}", "/tickets/{tickets[0]}", "/users/{users[0]}", "/time-entries/{time_entries[0]}"]
+
+
+@pytest.mark.parametrize("path", ITEM_PATHS)
+def test_item_last_modified(client, seeded, path):
+    path = path.format(**seeded)
+    response = client.get(path)
+    assert response.status_code == 200
+    last_modified = response.headers["Last-Modified"]
+    assert last_modified.endswith(" GMT")
+
+    not_modified = client.get(path, headers={"If-Modified-Since": last_modified})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["Last-Modified"] == last_modified and not_modified.content == b""
+
+    earlier = format_datetime(parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True)
+    assert client.get(path, headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get(path, headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+
+@pytest.mark.parametrize("path", ITEM_PATHS)
+def test_if_none_match_takes_precedence_over_if_modified_since(client, seeded, path):
+    path = path.format(**seeded)
+    response = client.get(path)
+    headers = {"If-Modified-Since": response.headers["Last-Modified"], "If-None-Match": '"other"'}
+    assert client.get(path, headers=headers).status_code == 200
+    assert client.get(path, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_update_returns_last_modified(client, seeded):
+    project_id = seeded["projects"][0]
+    project = client.get(f"/projects/{project_id}").json()
+    payload = {key: project[key] for key in ("client_id", "name", "project_type", "status")}
+    response = client.put(f"/projects/{project_id}", json=payload)
+    assert response.status_code == 200
+    assert response.headers["Last-Modified"] == client.get(f"/projects/{project_id}").headers["Last-Modified"]
+
+
+@pytest.mark.parametrize("path", ["/tickets/", "/tickets/?expand=project,client,assigned_to_user,reported_by_user"])
+def test_compressed_responses_have_their_own_etag(client, seeded, path):
+    identity = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    etag = identity.headers["ETag"]
+
+    gzipped = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] == coded_etag(etag, "gzip") != etag
+    assert gzipped.json() == identity.json()
+
+    revalidated = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == gzipped.headers["ETag"]
+    # El mismo contenido sin comprimir también está vigente
+    revalidated = client.get(path, headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["ETag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == etag
+
+
+def test_if_match_accepts_coded_etag(client, seeded):
+    project_id = seeded["projects"][1]
+    response = client.get(f"/projects/{project_id}")
+    payload = {key: response.json()[key] for key in ("client_id", "name", "project_type", "status")}
+    updated = client.put(f"/projects/{project_id}", json=payload, headers={"If-Match": coded_etag(response.headers["ETag"], "br")})
+    assert updated.status_code == 200
+    stale = client.put(f"/projects/{project_id}", json=payload, headers={"If-Match": coded_etag(f'"{project_id}.20000101T000000000000"', "gzip")})
+    assert stale.status_code == 412
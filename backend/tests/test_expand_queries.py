@@ -0,0 +1,40 @@
+# Con ?expand= el número de sentencias por página no depende del tamaño de página
+# (ver benchmarks/expand_queries.py, que además lo compara con resolver cada id aparte)
+import pytest
+
+from app.core.database import SessionLocal
+from app.crud import project_crud, ticket_crud
+from app.schemas.project_schema import ProjectExpandedOut
+from app.schemas.ticket_schema import TicketExpandedOut
+from benchmarks.expand_queries import count_statements, seed
+
+PAGE_SIZES = (1, 5, 20)
+
+CASES = [
+    ("tickets", TicketExpandedOut, lambda limit, expand: lambda db: ticket_crud.get_tickets(db, limit=limit, expand=expand),
+     ticket_crud.TICKET_EXPANDS),
+    ("projects", ProjectExpandedOut, lambda limit, expand: lambda db: project_crud.get_projects(db, limit=limit, expand=expand),
+     project_crud.PROJECT_EXPANDS),
+]
+
+
+@pytest.fixture(scope="module")
+def expand_rows(seeded):
+    # Cada ticket nuevo con proyecto, cliente y usuarios distintos: el peor caso para el N+1.
+    # seed() completa hasta N tickets y crea un proyecto por ticket que añade
+    with SessionLocal() as db:
+        seed(db, len(seeded["tickets"]) + max(PAGE_SIZES))
+
+
+@pytest.mark.parametrize("name, schema, loader, expand", CASES, ids=[case[0] for case in CASES])
+@pytest.mark.parametrize("expanded", [False, True], ids=["plain", "expand"])
+def test_statements_do_not_depend_on_page_size(expand_rows, name, schema, loader, expand, expanded):
+    expand = list(expand) if expanded else []
+    counts = {}
+    for limit in PAGE_SIZES:
+        statements, payload = count_statements(loader(limit, expand), schema)
+        assert len(payload) == limit
+        counts[limit] = statements
+    assert len(set(counts.values())) == 1, counts
+    # Como mucho una sentencia para la página y una por cada relación expandida
+    assert counts[PAGE_SIZES[0]] <= 1 + len(expand)
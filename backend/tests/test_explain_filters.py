@@ -0,0 +1,26 @@
+# Cada filtro de GET /tickets/ y GET /time-entries/ se resuelve con su índice
+# (EXPLAIN QUERY PLAN en SQLite; ver scripts/explain_filters.py)
+import pytest
+from sqlalchemy import select, text
+
+from app.core.database import SessionLocal
+from scripts.explain_filters import CASES, _filters, explain
+
+
+@pytest.fixture
+def db(app):
+    session = SessionLocal()
+    if session.get_bind().dialect.name == "postgresql":
+        # Con tablas pequeñas el planificador prefiere un Seq Scan aunque el índice sirva
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.mark.parametrize("model, order_column, filters, expected", CASES,
+                         ids=[f"{case[0].__tablename__}-{case[2].model_dump_json(exclude_none=True)}" for case in CASES])
+def test_filter_uses_index(db, model, order_column, filters, expected):
+    stmt = select(model).where(*_filters(model, filters)).order_by(order_column).limit(100)
+    used, plan = explain(db, stmt)
+    assert used & expected, plan
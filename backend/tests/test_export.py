@@ -0,0 +1,87 @@
+# GET /time-entries/export y /tickets/export: contenido del CSV y del NDJSON
+# (cabecera una sola vez, columnas de la tabla y valores tal como se guardaron)
+import csv
+import io
+import json
+
+import pytest
+
+from app.core import export
+from app.models.ticket_models import Ticket
+from app.models.time_entry_models import TimeEntry
+
+
+@pytest.fixture(scope="module")
+def exported_user(client, seeded):
+    user_id = client.post("/users/", json={"username": "export", "email": "export@example.com", "role": "dev",
+                                           "password_hash": "secret"}).json()["user_id"]
+    entries = [
+        {"entry_date": "2026-06-02", "start_time": "09:00", "end_time": "10:30", "description": 'Quotes "x", commas\nand lines'},
+        {"entry_date": "2026-06-01", "start_time": "14:15", "end_time": "15:00", "description": None},
+        {"entry_date": "2026-06-03", "start_time": "08:00", "end_time": "12:00", "description": "Ñandú"},
+    ]
+    for values in entries:
+        response = client.post("/time-entries/", json={"user_id": user_id, "project_id": seeded["projects"][1],
+                                                       "activity_type": "development", "status": "draft", **values})
+        assert response.status_code == 200
+    return user_id
+
+
+@pytest.fixture(autouse=True)
+def small_partitions(monkeypatch):
+    # Lotes de 2 filas: el contenido debe ser el mismo que en un solo lote
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+
+
+def test_time_entries_csv(client, seeded, exported_user):
+    response = client.get(f"/time-entries/export?format=csv&user_id={exported_user}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="time_entries.csv"'
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == [column.key for column in TimeEntry.__table__.columns]
+    rows = list(reader)
+    # Ordenadas por fecha; None se exporta como campo vacío
+    assert [(row["entry_date"], row["start_time"], row["end_time"], row["duration_hours"], row["description"]) for row in rows] == [
+        ("2026-06-01", "14:15:00", "15:00:00", "0.75", ""),
+        ("2026-06-02", "09:00:00", "10:30:00", "1.5", 'Quotes "x", commas\nand lines'),
+        ("2026-06-03", "08:00:00", "12:00:00", "4.0", "Ñandú"),
+    ]
+    assert {row["user_id"] for row in rows} == {str(exported_user)}
+    assert {row["project_id"] for row in rows} == {str(seeded["projects"][1])}
+
+
+def test_time_entries_ndjson_matches_the_api(client, exported_user):
+    response = client.get(f"/time-entries/export?user_id={exported_user}")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    listed = {entry["entry_id"]: entry for entry in client.get(f"/time-entries/?user_id={exported_user}").json()}
+    assert [line["entry_id"] for line in lines] == sorted(listed, key=lambda entry_id: listed[entry_id]["entry_date"])
+    for line in lines:
+        entry = listed[line["entry_id"]]
+        for key in ("entry_date", "description", "duration_hours", "status", "activity_type"):
+            assert line[key] == entry[key]
+        assert line["start_time"] == entry["start_time"]
+
+
+def test_time_entries_csv_date_range(client, exported_user):
+    response = client.get(f"/time-entries/export?format=csv&user_id={exported_user}&date_from=2026-06-02&date_to=2026-06-02")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["entry_date"] for row in rows] == ["2026-06-02"]
+
+
+def test_empty_csv_export_has_only_the_header(client):
+    response = client.get("/time-entries/export?format=csv&user_id=999999")
+    assert response.text == ",".join(column.key for column in TimeEntry.__table__.columns) + "\n"
+
+
+def test_tickets_csv(client, seeded):
+    project_id = seeded["projects"][0]
+    response = client.get(f"/tickets/export?format=csv&project_id={project_id}")
+    assert response.headers["content-disposition"] == 'attachment; filename="tickets.csv"'
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == [column.key for column in Ticket.__table__.columns]
+    rows = list(reader)
+    listed = client.get(f"/tickets/?project_id={project_id}").json()
+    assert [row["ticket_number"] for row in rows] == [ticket["ticket_number"] for ticket in sorted(listed, key=lambda t: t["ticket_id"])]
+    assert all(row["project_id"] == str(project_id) and row["description"] == "login page fails" for row in rows)
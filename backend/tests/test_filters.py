@@ -0,0 +1,48 @@
+# Un filtro con valor 0 (o cualquier valor falso) filtra; solo None significa "sin filtro"
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/tickets/export?user_id=0", "/tickets/export?project_id=0"])
+def test_export_with_zero_id_filters_everything_out(client, seeded, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_export_without_filters_streams_all_rows(client, seeded):
+    assert len(client.get("/tickets/export").text.splitlines()) >= len(seeded["tickets"])
+
+
+@pytest.mark.parametrize("path", ["/time-entries/?user_id=0", "/time-entries/?project_id=0", "/tickets/?project_id=0"])
+def test_list_with_zero_id_is_empty(client, seeded, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.parametrize("path", ["/time-entries/export?user_id=0", "/time-entries/export?project_id=0"])
+def test_time_entry_export_with_zero_id_filters_everything_out(client, seeded, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+@pytest.mark.parametrize("query", ["user_id=0", "project_id=0"])
+def test_hours_report_with_zero_id_is_empty(client, seeded, query):
+    assert client.get("/reports/hours").json()
+    response = client.get(f"/reports/hours?{query}")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.parametrize("path", ["/payments/invoices?client_id=0", "/payments/rate-cards?client_id=0", "/payments/rate-cards?project_id=0"])
+def test_payment_lists_with_zero_id_are_empty(client, seeded, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_billing_run_for_client_zero_bills_nothing(client, seeded):
+    response = client.post("/payments/billing-runs", json={"period_start": "2026-01-01", "period_end": "2026-01-31", "client_id": 0})
+    assert response.status_code == 200
+    assert response.json()["invoice_ids"] == [] and response.json()["entries"] == 0
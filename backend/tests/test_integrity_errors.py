@@ -0,0 +1,39 @@
+# Violaciones de restricciones de la base de datos: código por SQLSTATE y mensaje
+# genérico, sin el texto del driver
+import pytest
+
+
+def project(seeded, **values):
+    return {"client_id": seeded["clients"][0], "name": "constraints", "project_type": "development", "status": "active", **values}
+
+
+def assert_generic(response, status_code):
+    assert response.status_code == status_code, response.text
+    detail = response.json()["detail"]
+    assert isinstance(detail, str)
+    for driver_text in ("constraint failed", "projects.", "violates", "IntegrityError"):
+        assert driver_text not in detail
+
+
+def test_unique_violation_is_409(client, seeded):
+    assert client.post("/projects/", json=project(seeded, code="UNIQUE-1")).status_code == 200
+    assert_generic(client.post("/projects/", json=project(seeded, code="UNIQUE-1")), 409)
+
+
+def test_check_violation_is_422(client, seeded):
+    assert_generic(client.post("/projects/", json=project(seeded, project_type="unknown")), 422)
+
+
+def test_foreign_key_violation_is_409(client, seeded):
+    assert_generic(client.post("/projects/", json=project(seeded, client_id=999999)), 409)
+
+
+@pytest.mark.parametrize("start, end, status_code", [("09:30", "10:00", 409), ("11:30", "12:00", 200)])
+def test_time_entry_overlap(client, seeded, start, end, status_code):
+    entry = {"user_id": seeded["users"][0], "project_id": seeded["projects"][0], "entry_date": "2026-01-05",
+             "activity_type": "development", "start_time": start, "end_time": end, "status": "draft"}
+    response = client.post("/time-entries/", json=entry)
+    if status_code == 200:
+        assert response.status_code == 200
+    else:
+        assert_generic(response, status_code)
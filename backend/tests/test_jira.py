@@ -0,0 +1,146 @@
+# Cliente, caché del proxy y sincronización de Jira contra benchmarks/mock_jira.py
+# (3 proyectos P0..P2 de 25 issues; páginas de 10, ver conftest)
+import time
+from datetime import datetime, timezone
+
+import pytest
+import requests
+from sqlalchemy import select, update
+
+from app.core import jira_client, jira_sync
+from app.core.config import JIRA_API_URL as MOCK_JIRA_URL
+from app.core.database import SessionLocal
+from app.core.jira_client import JiraClient, JiraError, jira_cache
+from app.models.jira_sync_models import JiraSyncState
+from app.models.ticket_models import Ticket
+from app.routers import jira_router
+
+
+def oauth(token):
+    return {"Cookie": f"jira_access_token={token}"}
+
+
+def upstream_requests(mock_jira):
+    return mock_jira.stats["requests"]
+
+
+def test_projects_with_issues_follows_every_page(client, mock_jira):
+    response = client.get("/jira/projects-with-issues", headers=oauth("pages"))
+    assert response.status_code == 200
+    projects = response.json()["projects"]
+    assert [project["key"] for project in projects] == ["P0", "P1", "P2"]
+    for project in projects:
+        assert sorted(issue["key"] for issue in project["issues"]) == sorted(f"{project['key']}-{n}" for n in range(25))
+
+
+def test_proxy_cache_hit_bypass_and_expiry(client, mock_jira, monkeypatch):
+    monkeypatch.setattr(jira_router, "JIRA_CACHE_TTL_PROJECTS", 0.3)
+    hits = jira_cache.hits
+
+    first = client.get("/jira/projects", headers=oauth("cache"))
+    assert first.status_code == 200
+    before = upstream_requests(mock_jira)
+    # Acierto: ni el cloud id ni los proyectos vuelven a Jira
+    assert client.get("/jira/projects", headers=oauth("cache")).json() == first.json()
+    assert upstream_requests(mock_jira) == before
+    assert jira_cache.hits == hits + 1
+    # Otro token no comparte la entrada
+    client.get("/jira/projects", headers=oauth("other-cache"))
+    before = upstream_requests(mock_jira)
+    # ?refresh=true fuerza la consulta (el cloud id y la búsqueda de proyectos)
+    client.get("/jira/projects?refresh=true", headers=oauth("cache"))
+    assert upstream_requests(mock_jira) > before
+
+    # Caducada, se vuelve a pedir la lista de proyectos (el cloud id sigue memoizado)
+    time.sleep(0.35)
+    before = upstream_requests(mock_jira)
+    assert client.get("/jira/projects", headers=oauth("cache")).json() == first.json()
+    assert upstream_requests(mock_jira) == before + 1
+
+
+@pytest.fixture
+def linked_project(client, seeded):
+    """Proyecto local enlazado con un proyecto de Jira por su code."""
+    def link(key):
+        response = client.post("/projects/", json={"client_id": seeded["clients"][0], "name": f"jira-{key}", "code": key,
+                                                   "project_type": "development", "status": "active"})
+        assert response.status_code == 200
+        return response.json()["project_id"]
+    return link
+
+
+def tickets(key):
+    with SessionLocal() as db:
+        return {ticket.ticket_number: ticket for ticket in
+                db.scalars(select(Ticket).where(Ticket.ticket_number.like(f"{key}-%"))).all()}
+
+
+def sync_state(key):
+    with SessionLocal() as db:
+        return db.get(JiraSyncState, key)
+
+
+def test_sync_advances_the_cursor_and_upserts(mock_jira, linked_project):
+    linked_project("P1")
+    summary = jira_sync.sync_all(client=JiraClient.with_api_token())
+    assert summary["projects"]["P1"] == 25
+    assert "P1" not in summary["unmapped"]
+    assert len(tickets("P1")) == 25
+    state = sync_state("P1")
+    assert state.issues_synced == 25
+    assert state.last_updated == mock_jira._updated("P1-24").replace(tzinfo=None)
+
+    # Cambio local que la siguiente sincronización debe pisar, y una edición en Jira
+    with SessionLocal() as db:
+        db.execute(update(Ticket).where(Ticket.ticket_number == "P1-3").values(title="edited locally"))
+        db.commit()
+    touched = requests.post(f"{MOCK_JIRA_URL}/_touch/P1-3").json()
+
+    summary = jira_sync.sync_all(client=JiraClient.with_api_token())
+    # Solo la ventana desde la marca de agua: la issue editada y la última del margen
+    assert summary["projects"]["P1"] == 2
+    synced = tickets("P1")
+    assert len(synced) == 25
+    assert synced["P1-3"].title == "Issue 3 of P1"
+    state = sync_state("P1")
+    assert state.issues_synced == 27
+    expected = datetime.strptime(touched["updated"], "%Y-%m-%dT%H:%M:%S.%f%z").astimezone(timezone.utc).replace(tzinfo=None)
+    assert state.last_updated == expected
+
+
+def test_sync_keeps_committed_batches_when_jira_fails(mock_jira, linked_project, monkeypatch):
+    linked_project("P2")
+    monkeypatch.setattr(jira_sync, "JIRA_SYNC_BATCH_SIZE", 10)
+    request_json = jira_client.request_json
+
+    def failing(method, url, headers, **kwargs):
+        params = kwargs.get("params") or {}
+        if 'project="P2"' in params.get("jql", "") and params["startAt"] == 20:
+            raise JiraError(502, "Bad gateway")
+        return request_json(method, url, headers, **kwargs)
+
+    monkeypatch.setattr(jira_client, "request_json", failing)
+    with pytest.raises(JiraError):
+        jira_sync.sync_all(client=JiraClient.with_api_token())
+    # Los dos lotes confirmados se quedan y la marca de agua no pasa del último
+    assert sorted(tickets("P2"), key=lambda key: int(key.split("-")[1])) == [f"P2-{n}" for n in range(20)]
+    state = sync_state("P2")
+    assert state.issues_synced == 20
+    assert state.last_updated == mock_jira._updated("P2-19").replace(tzinfo=None)
+
+    # El bloqueo se libera y la siguiente sincronización completa el resto
+    monkeypatch.setattr(jira_client, "request_json", request_json)
+    summary = jira_sync.sync_all(client=JiraClient.with_api_token())
+    assert summary is not None
+    assert len(tickets("P2")) == 25
+    assert sync_state("P2").last_updated == mock_jira._updated("P2-24").replace(tzinfo=None)
+
+
+def test_sync_defaults_created_at_when_jira_omits_it(mock_jira, linked_project):
+    project_id = linked_project("PX")
+    with SessionLocal() as db:
+        project = db.get(jira_sync.Project, project_id)
+        rows = [jira_sync.issue_to_ticket({"key": "PX-1", "fields": {"summary": "No created"}}, project, {})]
+        jira_sync._upsert_tickets(db, rows)
+        db.commit()
+    assert tickets("PX")["PX-1"].created_at is not None
@@ -0,0 +1,30 @@
+# Instrumentación SQL por petición (core/metrics.py, core/query_diagnostics.py)
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import engine
+
+
+def statements(response) -> int:
+    return int(re.search(r'db;[^,]*desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+
+
+def test_failed_statement_is_counted(client, seeded):
+    project = {"client_id": seeded["clients"][0], "name": "metrics", "project_type": "development", "status": "active",
+               "code": "METRICS-1"}
+    assert statements(client.post("/projects/", json=project)) >= 1
+    response = client.post("/projects/", json=project)
+    assert response.status_code == 409
+    assert statements(response) == 1
+
+
+def test_failed_statement_leaves_no_pending_timer(app):
+    with engine.connect() as conn:
+        with pytest.raises(IntegrityError):
+            conn.execute(text("INSERT INTO clients (client_id, name) VALUES (:id, 'x'), (:id, 'y')"), {"id": 10**6})
+        assert conn.info["metrics_started"] == []
+        assert conn.info["diagnostics_started"] == []
+        conn.rollback()
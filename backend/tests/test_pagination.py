@@ -0,0 +1,68 @@
+# Paginación por keyset: recorrer X-Next-Cursor devuelve cada fila una sola vez,
+# también con empates en la columna de orden (se desempata por la clave primaria)
+from urllib.parse import urlencode
+
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture(scope="module")
+def tied_entries(client, seeded):
+    """Un usuario con varios registros el mismo día: empates en entry_date."""
+    user_id = client.post("/users/", json={"username": "pages", "email": "pages@example.com", "role": "dev",
+                                           "password_hash": "secret"}).json()["user_id"]
+    ids = []
+    for day, hour in [(3, 8), (1, 9), (3, 10), (2, 11), (3, 12), (1, 13), (3, 14)]:
+        ids.append(client.post("/time-entries/", json={
+            "user_id": user_id, "project_id": seeded["projects"][0], "entry_date": f"2026-05-{day:02d}",
+            "activity_type": "development", "start_time": f"{hour:02d}:00", "end_time": f"{hour:02d}:30", "status": "draft",
+        }).json()["entry_id"])
+    return user_id, ids
+
+
+def walk(client, path, **params):
+    rows, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"{path}?{urlencode(query)}")
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return rows
+
+
+@pytest.mark.parametrize("sort", ["entry_date", "-entry_date", "entry_id"])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_walking_cursors_returns_every_row_once(client, tied_entries, sort, limit):
+    user_id, ids = tied_entries
+    rows = walk(client, "/time-entries/", user_id=user_id, sort=sort, limit=limit)
+    assert sorted(row["entry_id"] for row in rows) == sorted(ids)
+    assert len(rows) == len(ids)
+    columns = ("entry_date", "entry_id") if sort.lstrip("-") == "entry_date" else ("entry_id",)
+    key = [tuple(row[column] for column in columns) for row in rows]
+    assert key == sorted(key, reverse=sort.startswith("-"))
+
+
+def test_walking_cursors_with_ties_on_invoices(client, seeded):
+    # Todas las facturas de la misma ejecución comparten period_start
+    rows = walk(client, "/payments/invoices", sort="period_start", limit=1)
+    assert len(rows) == len({row["invoice_id"] for row in rows})
+    assert set(seeded["invoices"]) <= {row["invoice_id"] for row in rows}
+
+
+@pytest.mark.parametrize("path", ["/time-entries/", "/projects/", "/clients/", "/users/", "/tickets/", "/payments/invoices"])
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJrIjoibmFtZSJ9", "%%%"])
+def test_malformed_cursor_is_422(client, seeded, path, cursor):
+    response = client.get(f"{path}?{urlencode({'cursor': cursor})}")
+    assert response.status_code == 422, response.text
+
+
+def test_cursor_from_another_sort_is_422(client, tied_entries):
+    user_id, _ = tied_entries
+    first = client.get(f"/time-entries/?user_id={user_id}&sort=entry_date&limit=1")
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    response = client.get(f"/time-entries/?{urlencode({'user_id': user_id, 'sort': 'entry_id', 'cursor': cursor})}")
+    assert response.status_code == 422
+    assert client.get("/time-entries/?sort=unknown").status_code == 422
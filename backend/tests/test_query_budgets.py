@@ -0,0 +1,93 @@
+# Cada ruta con query_budget(n), con sus variantes (expand, fields, cursor), dentro
+# de su presupuesto. conftest.py fija QUERY_BUDGET_MODE=strict: si una ruta lo
+# supera o repite una sentencia (N+1), responde 500 con el diagnóstico.
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import Depends
+from sqlalchemy import select
+
+from app.core.database import get_database
+from app.core.metrics import instrument_routes
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_diagnostics import query_budget
+
+BUDGETED_PATHS = [
+    "/clients/",
+    "/clients/?fields=client_id,name",
+    "/clients/{clients[0]}",
+    "/clients/{clients[1]}?fields=name",
+    "/projects/",
+    "/projects/?expand=client",
+    "/projects/?expand=client&fields=project_id,name,client",
+    "/projects/?fields=project_id,name",
+    "/projects/{projects[0]}",
+    "/projects/{projects[1]}?expand=client",
+    "/projects/{projects[2]}?fields=name",
+    "/users/",
+    "/users/?fields=user_id,username",
+    "/users/{users[0]}",
+    "/users/{users[1]}?fields=username",
+    "/tickets/",
+    "/tickets/?expand=project,client,assigned_to_user,reported_by_user",
+    "/tickets/?expand=project&fields=ticket_id,title,project",
+    "/tickets/?fields=ticket_id,status",
+    "/tickets/?status=Open&project_id={projects[0]}",
+    "/tickets/{tickets[0]}",
+    "/tickets/{tickets[1]}?expand=project,client,assigned_to_user,reported_by_user",
+    "/tickets/{tickets[2]}?fields=title",
+    "/tickets/search?q=login",
+    "/time-entries/",
+    "/time-entries/?fields=entry_id,duration_hours",
+    "/time-entries/?user_id={users[0]}&date_from=2026-01-01",
+    "/time-entries/{time_entries[0]}",
+    "/time-entries/{time_entries[1]}?fields=entry_date",
+    "/reports/hours",
+    "/reports/hours?group_by=project&period=month",
+    "/jira/sync/status",
+    "/payments/rate-cards",
+    "/payments/invoices",
+    "/payments/invoices?status=issued",
+    "/payments/invoices/{invoices[0]}",
+    "/payments/invoices/{invoices[0]}/payments",
+]
+
+CURSOR_PATHS = [
+    "/clients/", "/projects/", "/projects/?expand=client", "/users/", "/tickets/",
+    "/tickets/?expand=project,client,assigned_to_user,reported_by_user", "/tickets/search?q=login",
+    "/time-entries/", "/payments/invoices",
+]
+
+
+@pytest.mark.parametrize("path", BUDGETED_PATHS)
+def test_route_within_budget(client, seeded, path):
+    response = client.get(path.format(**seeded))
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("path", CURSOR_PATHS)
+def test_cursor_pages_within_budget(client, seeded, path):
+    separator = "&" if "?" in path else "?"
+    first = client.get(f"{path}{separator}limit=1")
+    assert first.status_code == 200, first.text
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    second = client.get(f"{path}{separator}limit=1&{urlencode({'cursor': cursor})}")
+    assert second.status_code == 200, second.text
+    assert second.json() and second.json() != first.json()
+
+
+@pytest.fixture
+def over_budget_route(app):
+    async def two_statements(db=Depends(get_database)):
+        return await db.run(lambda session: [session.execute(select(1)).scalar() for _ in range(2)])
+
+    app.add_api_route("/_tests/over-budget", two_statements, dependencies=[Depends(query_budget(1))])
+    instrument_routes(app)
+    yield "/_tests/over-budget"
+    app.router.routes.pop()
+
+
+def test_route_over_budget_fails(client, over_budget_route):
+    response = client.get(over_budget_route)
+    assert response.status_code == 500
+    assert "ran 2 SQL statements (budget 1)" in response.json()["detail"][0]
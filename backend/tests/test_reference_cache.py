@@ -0,0 +1,41 @@
+# La caché de filas de referencia solo se llena desde el primario: una réplica
+# con retraso no deja filas antiguas en ella (ni las lee de ella)
+import pytest
+from sqlalchemy import update
+
+from app.core.database import SessionLocal, engine
+from app.crud import client_crud, project_crud, user_crud
+from app.models.client_models import Client
+from app.models.project_models import Project
+from app.models.user_models import User
+
+CASES = [
+    (client_crud.client_cache, client_crud.get_client, Client, Client.client_id, "clients", "name"),
+    (project_crud.project_cache, project_crud.get_project, Project, Project.project_id, "projects", "name"),
+    (user_crud.user_cache, user_crud.get_user, User, User.user_id, "users", "full_name"),
+]
+
+
+def replica_session():
+    # Misma base de datos, pero marcada como réplica (como ReplicaSessionLocal)
+    return SessionLocal(bind=engine, info={"replica": True})
+
+
+@pytest.mark.parametrize("cache, get, model, pk, table, column", CASES, ids=[case[4] for case in CASES])
+def test_replica_reads_bypass_the_cache(seeded, cache, get, model, pk, table, column):
+    row_id = seeded[table][-1]
+    cache.invalidate(row_id)
+    with replica_session() as db:
+        assert get(db, row_id) is not None
+    assert cache._cache.peek(row_id) is None
+
+    with SessionLocal() as db:
+        cached = getattr(get(db, row_id), column)
+        # Cambio que la caché no ve (p. ej. aún no replicado ni invalidado)
+        db.execute(update(model).where(pk == row_id).values({column: "changed"}))
+        db.commit()
+    with replica_session() as db:
+        assert getattr(get(db, row_id), column) == "changed"
+    with SessionLocal() as db:
+        assert getattr(get(db, row_id), column) == cached
+    cache.invalidate(row_id)
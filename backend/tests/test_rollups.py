@@ -0,0 +1,84 @@
+# time_entry_rollups se mantiene por deltas en la misma transacción que time_entries
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.database import SessionLocal
+from app.crud.report_crud import rollups_out_of_date
+from app.models.report_models import TimeEntryRollup
+
+
+@pytest.fixture
+def owner(client, seeded):
+    """Usuario y proyecto nuevos, sin más filas que los referencien."""
+    n = len(client.get("/projects/?limit=1000").json())
+    project = client.post("/projects/", json={"client_id": seeded["clients"][0], "name": f"rollup-{n}",
+                                              "project_type": "development", "status": "active"}).json()
+    other = client.post("/projects/", json={"client_id": seeded["clients"][0], "name": f"rollup-{n}-b",
+                                            "project_type": "development", "status": "active"}).json()
+    user = client.post("/users/", json={"username": f"rollup-{n}", "email": f"rollup-{n}@example.com", "role": "dev",
+                                        "password_hash": "secret"}).json()
+    return user["user_id"], project["project_id"], other["project_id"]
+
+
+def entry(user_id, project_id, day="2026-03-02", start="09:00", end="10:30"):
+    return {"user_id": user_id, "project_id": project_id, "entry_date": day, "activity_type": "development",
+            "start_time": start, "end_time": end, "status": "draft"}
+
+
+def rollups(user_id):
+    with SessionLocal() as db:
+        rows = db.execute(select(TimeEntryRollup.project_id, TimeEntryRollup.entry_date, TimeEntryRollup.hours,
+                                 TimeEntryRollup.entries).where(TimeEntryRollup.user_id == user_id)).all()
+    return {(project_id, str(day)): (float(hours), entries) for project_id, day, hours, entries in rows}
+
+
+def test_create_adds_to_the_rollup(client, owner):
+    user_id, project_id, _ = owner
+    assert client.post("/time-entries/", json=entry(user_id, project_id)).status_code == 200
+    assert client.post("/time-entries/", json=entry(user_id, project_id, start="11:00", end="11:15")).status_code == 200
+    assert rollups(user_id) == {(project_id, "2026-03-02"): (1.75, 2)}
+
+
+def test_update_moves_hours_between_projects_and_dates(client, owner):
+    user_id, project_id, other_id = owner
+    first = client.post("/time-entries/", json=entry(user_id, project_id)).json()
+    client.post("/time-entries/", json=entry(user_id, project_id, start="11:00", end="12:00"))
+
+    response = client.put(f"/time-entries/{first['entry_id']}", json=entry(user_id, other_id, day="2026-03-03", end="11:00"))
+    assert response.status_code == 200
+    assert rollups(user_id) == {(project_id, "2026-03-02"): (1.0, 1), (other_id, "2026-03-03"): (2.0, 1)}
+
+
+def test_delete_removes_empty_rollups_and_unblocks_parents(client, owner):
+    user_id, project_id, other_id = owner
+    created = client.post("/time-entries/", json=entry(user_id, project_id)).json()
+    assert client.delete(f"/time-entries/{created['entry_id']}").status_code == 200
+    assert rollups(user_id) == {}
+    # Sin filas de agregados vacías, las claves foráneas no bloquean el borrado
+    assert client.delete(f"/projects/{project_id}").status_code == 200
+    assert client.delete(f"/projects/{other_id}").status_code == 200
+    assert client.delete(f"/users/{user_id}").status_code == 200
+
+
+def test_bulk_insert_adds_to_the_rollup(client, owner):
+    user_id, project_id, _ = owner
+    rows = [entry(user_id, project_id, day=f"2026-03-{day:02d}") for day in (9, 10, 10)]
+    rows[2].update(start_time="13:00", end_time="14:00")
+    assert client.post("/time-entries/bulk", json=rows).json()["inserted"] == 3
+    assert rollups(user_id) == {(project_id, "2026-03-09"): (1.5, 1), (project_id, "2026-03-10"): (2.5, 2)}
+
+
+def test_bootstrap_rebuilds_out_of_date_rollups(app, client, owner):
+    from scripts import bootstrap_db
+
+    user_id, project_id, _ = owner
+    client.post("/time-entries/", json=entry(user_id, project_id))
+    # Base anterior a la tabla de agregados: time_entries con datos y agregados vacíos
+    with SessionLocal() as db:
+        db.execute(delete(TimeEntryRollup))
+        db.commit()
+        assert rollups_out_of_date(db)
+    bootstrap_db.main()
+    assert rollups(user_id) == {(project_id, "2026-03-02"): (1.5, 1)}
+    with SessionLocal() as db:
+        assert not rollups_out_of_date(db)
@@ -0,0 +1,80 @@
+# GET /tickets/search con el backend FTS5 de SQLite: coincidencias, relevancia
+# (el título pesa más que la descripción), fragmento resaltado y paginación
+from urllib.parse import urlencode
+
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture(scope="module")
+def searchable(client, seeded):
+    def ticket(number, title, description):
+        response = client.post("/tickets/", json={
+            "ticket_number": number, "project_id": seeded["projects"][0], "client_id": seeded["clients"][0],
+            "reported_by_user_id": seeded["users"][0], "assigned_to_user_id": seeded["users"][0],
+            "title": title, "description": description, "priority": "low", "status": "Open", "category": "bug",
+        })
+        assert response.status_code == 200
+        return response.json()["ticket_id"]
+
+    return {
+        "title": ticket("S-1", "Zephyr importer crashes", "The nightly job stops"),
+        "description": ticket("S-2", "Nightly job", "Fails when the zephyr feed is empty"),
+        "both": ticket("S-3", "Quasar dashboard", "zephyr and quasar widgets overlap"),
+        "other": ticket("S-4", "Unrelated", "Nothing to see here"),
+    }
+
+
+def search(client, **params):
+    response = client.get(f"/tickets/search?{urlencode(params)}")
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_search_finds_matches_ranked_by_field(client, searchable):
+    hits = search(client, q="zephyr").json()
+    ids = [hit["ticket_id"] for hit in hits]
+    assert set(ids) == {searchable["title"], searchable["description"], searchable["both"]}
+    # Coincidencia en el título antes que en la descripción
+    assert ids.index(searchable["title"]) < ids.index(searchable["description"])
+    assert [hit["rank"] for hit in hits] == sorted((hit["rank"] for hit in hits), reverse=True)
+    snippet = {hit["ticket_id"]: hit["snippet"] for hit in hits}[searchable["description"]]
+    assert "<mark>zephyr</mark>" in snippet
+
+
+def test_search_requires_every_term(client, searchable):
+    assert [hit["ticket_id"] for hit in search(client, q="zephyr quasar").json()] == [searchable["both"]]
+    assert search(client, q="zephyr nonexistentword").json() == []
+
+
+def test_search_is_case_insensitive_and_ignores_query_syntax(client, searchable):
+    assert {hit["ticket_id"] for hit in search(client, q="ZEPHYR").json()} == {
+        searchable["title"], searchable["description"], searchable["both"]}
+    # Comillas, operadores y asteriscos no llegan a FTS5 como sintaxis
+    for q in ['zephyr"', "zephyr OR unrelated", "NOT zephyr", "zeph*", "-", '"']:
+        search(client, q=q)
+    assert search(client, q="+-*").json() == []
+
+
+def test_search_pages_with_cursor(client, searchable):
+    seen, cursor = [], None
+    while True:
+        response = search(client, q="zephyr", limit=1, **({"cursor": cursor} if cursor else {}))
+        seen.extend(hit["ticket_id"] for hit in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == [hit["ticket_id"] for hit in search(client, q="zephyr").json()]
+
+
+def test_search_follows_updates_and_deletes(client, seeded, searchable):
+    ticket = client.get(f"/tickets/{searchable['other']}").json()
+    updated = {key: ticket[key] for key in ("title", "description", "priority", "status", "category")}
+    updated["description"] = "Now mentions a nebula"
+    assert client.put(f"/tickets/{searchable['other']}", json=updated).status_code == 200
+    assert [hit["ticket_id"] for hit in search(client, q="nebula").json()] == [searchable["other"]]
+    assert search(client, q="nothing to see").json() == []
+
+    assert client.delete(f"/tickets/{searchable['other']}").status_code == 200
+    assert search(client, q="nebula").json() == []
@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.crud.user_crud import user_cache
+from app.models.user_models import User
+
+
+def _set_password_hash(user_id, password_hash):
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.user_id == user_id).values(password_hash=password_hash))
+        db.commit()
+    # Escritura fuera de los CRUD: la caché no se entera sola
+    user_cache.invalidate(user_id)
+
+
+def test_login(client, seeded):
+    response = client.post("/users/login", json={"username": "user-0", "password": "secret"})
+    assert response.status_code == 200
+    assert client.post("/users/login", json={"username": "user-0", "password": "wrong"}).status_code == 401
+    assert client.post("/users/login", json={"username": "nobody", "password": "secret"}).status_code == 401
+
+
+@pytest.mark.parametrize("stored", ["secret", "$2b$12$tooshort", "md5:5ebe2294ecd0e0f08eab7690d2a6ee69"])
+def test_login_with_unrecognised_hash_is_rejected(client, seeded, caplog, stored):
+    user = client.post("/users/", json={"username": f"legacy-{len(stored)}", "email": f"legacy-{len(stored)}@example.com",
+                                        "role": "dev", "password_hash": "secret"}).json()
+    _set_password_hash(user["user_id"], stored)
+    with caplog.at_level(logging.WARNING, logger="app.core.security"):
+        response = client.post("/users/login", json={"username": user["username"], "password": "secret"})
+    assert response.status_code == 401
+    assert "password hash" in caplog.text
+
+
+def _write_behind_cache(user_id, **values):
+    # Escritura de otro worker: la caché de este proceso no se invalida
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.user_id == user_id).values(**values))
+        db.commit()
+
+
+def test_login_does_not_use_cached_credentials(client, seeded):
+    from app.core.security import pwd_context
+
+    user = client.post("/users/", json={"username": "stale-login", "email": "stale-login@example.com",
+                                        "role": "dev", "password_hash": "secret"}).json()
+    assert client.get(f"/users/{user['user_id']}").status_code == 200
+    assert "password_hash" not in user_cache._cache.peek(user["user_id"])
+
+    _write_behind_cache(user["user_id"], password_hash=pwd_context.hash("changed"))
+    assert client.post("/users/login", json={"username": "stale-login", "password": "secret"}).status_code == 401
+    assert client.post("/users/login", json={"username": "stale-login", "password": "changed"}).status_code == 200
+
+    _write_behind_cache(user["user_id"], is_active=False)
+    assert client.post("/users/login", json={"username": "stale-login", "password": "changed"}).status_code == 401